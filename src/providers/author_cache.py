@@ -0,0 +1,128 @@
+"""GitHub 用户 ID 与用户名的缓存
+
+用户名可能被修改，超过有效期的缓存需要重新获取
+无法获取的用户也会缓存较短的时间，避免每次运行都逐个请求
+设置缓存文件后，可在多次运行之间复用
+"""
+
+import json
+import os
+import threading
+import time
+from collections.abc import Iterable
+from functools import cache
+from pathlib import Path
+from typing import TypedDict
+
+from src.providers.constants import (
+    AUTHOR_CACHE_FAILURE_TTL,
+    AUTHOR_CACHE_PATH,
+    AUTHOR_CACHE_TTL,
+)
+from src.providers.logger import logger
+
+
+class AuthorEntry(TypedDict):
+    """缓存的用户名"""
+
+    login: str
+    """用户名，无法获取时为空字符串"""
+    stored_at: float
+
+
+class AuthorCache:
+    def __init__(
+        self, path: Path | None = None, ttl: float = 0, failure_ttl: float = 0
+    ) -> None:
+        """
+        Args:
+            path (Path | None, optional): 缓存文件，为 None 时只缓存在内存中. Defaults to None.
+            ttl (float, optional): 缓存有效期（秒），为 0 时不过期. Defaults to 0.
+            failure_ttl (float, optional): 无法获取的用户的缓存有效期（秒），为 0 时不缓存. Defaults to 0.
+        """
+        self.path = path
+        self.ttl = ttl
+        self.failure_ttl = failure_ttl
+        self._entries: dict[str, AuthorEntry] = {}
+        self._dirty = False
+        # 同步商店数据时会在多个线程中读写缓存
+        self._lock = threading.Lock()
+
+        if path is not None and path.exists():
+            try:
+                self._entries = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError) as e:
+                logger.warning(f"读取作者缓存失败，将重新获取：{e}")
+
+    def _is_fresh(self, entry: AuthorEntry) -> bool:
+        age = time.time() - entry["stored_at"]
+        if not entry["login"]:
+            return age < self.failure_ttl
+        return self.ttl <= 0 or age < self.ttl
+
+    def _get_fresh(self, author_id: int) -> AuthorEntry | None:
+        with self._lock:
+            entry = self._entries.get(str(author_id))
+        if entry is None or not self._is_fresh(entry):
+            return None
+        return entry
+
+    def get(self, author_id: int) -> str | None:
+        """获取有效期内的用户名"""
+        entry = self._get_fresh(author_id)
+        if entry is None or not entry["login"]:
+            return None
+        return entry["login"]
+
+    def is_failed(self, author_id: int) -> bool:
+        """是否在有效期内获取失败过"""
+        entry = self._get_fresh(author_id)
+        return entry is not None and not entry["login"]
+
+    def set(self, author_id: int, login: str) -> None:
+        """保存用户名"""
+        with self._lock:
+            self._entries[str(author_id)] = AuthorEntry(
+                login=login, stored_at=time.time()
+            )
+            self._dirty = True
+
+    def set_failed(self, author_id: int) -> None:
+        """记录无法获取的用户，有效期内不再请求"""
+        self.set(author_id, "")
+
+    def missing(self, author_ids: Iterable[int]) -> list[int]:
+        """获取缓存中没有或已过期的用户 ID，结果已去重
+
+        有效期内获取失败过的用户不包含在内
+        """
+        return [
+            author_id
+            for author_id in dict.fromkeys(author_ids)
+            if self._get_fresh(author_id) is None
+        ]
+
+    def save(self) -> None:
+        """有新的用户名时写入缓存文件"""
+        if self.path is None:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            content = json.dumps(self._entries, ensure_ascii=False)
+            self._dirty = False
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # 先写入临时文件再替换，避免中断时留下写了一半的缓存
+        tmp_path = self.path.with_name(
+            f"{self.path.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+        )
+        tmp_path.write_text(content, encoding="utf-8")
+        tmp_path.replace(self.path)
+
+
+@cache
+def get_author_cache() -> AuthorCache:
+    """获取作者缓存，未设置缓存文件时只缓存在内存中"""
+    path = Path(AUTHOR_CACHE_PATH) if AUTHOR_CACHE_PATH else None
+    return AuthorCache(path, AUTHOR_CACHE_TTL, AUTHOR_CACHE_FAILURE_TTL)
@@ -23,6 +23,11 @@ REGISTRY_BOTS_URL = f"{REGISTRY_BASE_URL}/bots.json"
 REGISTRY_DRIVERS_URL = f"{REGISTRY_BASE_URL}/drivers.json"
 REGISTRY_PLUGINS_URL = f"{REGISTRY_BASE_URL}/plugins.json"
 REGISTRY_PLUGIN_CONFIG_URL = f"{REGISTRY_BASE_URL}/plugin_configs.json"
+REGISTRY_PYPI_SERIAL_URL = f"{REGISTRY_BASE_URL}/pypi_serial.json"
+
+# PyPI XML-RPC 接口，用于获取项目变更记录
+# 可指向本地的模拟接口以便离线测试
+PYPI_XMLRPC_URL = os.environ.get("PYPI_XMLRPC_URL") or "https://pypi.org/pypi"
 
 # NoneBot 插件商店
 # https://github.com/nonebot/nonebot2/tree/master/assets
@@ -39,10 +44,61 @@ STORE_PLUGINS_URL = f"{STORE_BASE_URL}/plugins.json5"
 # https://github.com/orgs/nonebot/packages/container/package/nonetest
 DOCKER_IMAGES_VERSION = os.environ.get("DOCKER_IMAGES_VERSION") or "latest"
 DOCKER_IMAGES = f"ghcr.io/nonebot/nonetest:{DOCKER_IMAGES_VERSION}"
+# 测试镜像的摘要，如 sha256:...，设置后拉取镜像时校验
+DOCKER_IMAGES_DIGEST = os.environ.get("DOCKER_IMAGES_DIGEST")
 DOCKER_BIND_RESULT_PATH = "/app/test_result.json"
+# Docker 客户端连接池大小，同时测试的插件共用同一个客户端
+DOCKER_MAX_POOL_SIZE = int(os.environ.get("DOCKER_MAX_POOL_SIZE") or 32)
+# 宿主机上等待测试容器的最长时间（秒）
+# 容器内创建项目、获取信息与加载插件的超时之和为 1200 秒，再留出启动与安装的余量
+DOCKER_TIMEOUT = float(os.environ.get("DOCKER_TIMEOUT") or 1260)
+# 根据历史耗时设置等待时间时的最短时间（秒）与相对历史耗时的倍数
+DOCKER_MIN_TIMEOUT = float(os.environ.get("DOCKER_MIN_TIMEOUT") or 300)
+DOCKER_TIMEOUT_FACTOR = float(os.environ.get("DOCKER_TIMEOUT_FACTOR") or 3)
+# 每个测试容器的 CPU 数量与内存（MiB）限制，默认为 0 表示不限制
+# 同时运行的容器预留的资源总和不超过宿主机的资源，超过时等待其他容器结束
+DOCKER_CPUS = float(os.environ.get("DOCKER_CPUS") or 0)
+DOCKER_MEMORY = int(os.environ.get("DOCKER_MEMORY") or 0)
+# 实时读取容器输出时保留的行数，测试异常结束时作为测试输出
+DOCKER_LOG_TAIL = 50
+# 容器输出中出现这些错误时，之后的步骤也不会成功，直接停止容器
+DOCKER_FATAL_PATTERNS = (
+    r"version solving failed",
+    r"Could not find a version",
+    r"No matching distribution found",
+)
+# 出现这些错误后容器内之后的步骤会跳过，通常很快会自行结束并写入测试结果
+# 等待宽限时间（秒）后仍未结束才强制停止
+DOCKER_FATAL_GRACE = float(os.environ.get("DOCKER_FATAL_GRACE") or 30)
+# 标记测试容器，用于清理中断的测试遗留的容器
+DOCKER_LABEL = "noneflow.plugin-test"
+# 检查容器是否结束的间隔（秒）
+DOCKER_POLL_INTERVAL = float(os.environ.get("DOCKER_POLL_INTERVAL") or 1)
 
 PLUGIN_TEST_DIR = Path("plugin_test")
 
+# HTTP 缓存
+# 设置目录后，下载的文件会缓存到磁盘，并通过条件请求重新验证
+# 可将该目录放入 Actions 缓存，以便在多次运行之间复用
+HTTP_CACHE_DIR = os.environ.get("HTTP_CACHE_DIR")
+HTTP_CACHE_TTL = float(os.environ.get("HTTP_CACHE_TTL") or 0)
+"""缓存有效期（秒），有效期内直接使用缓存，不发送请求"""
+HTTP_CACHE_MAX_SIZE = int(os.environ.get("HTTP_CACHE_MAX_SIZE") or 512 * 1024 * 1024)
+"""缓存最大占用空间（字节），超出时删除最久未使用的缓存"""
+
+# GitHub 用户名
+# 设置 Token 后通过 GraphQL 接口批量获取用户名，否则逐个通过 REST 接口获取
+GITHUB_TOKEN = os.environ.get("GITHUB_TOKEN")
+GITHUB_GRAPHQL_URL = "https://api.github.com/graphql"
+# 设置文件后，用户 ID 与用户名的对应关系会保存到该文件，以便在多次运行之间复用
+AUTHOR_CACHE_PATH = os.environ.get("AUTHOR_CACHE_PATH")
+AUTHOR_CACHE_TTL = float(os.environ.get("AUTHOR_CACHE_TTL") or 7 * 24 * 60 * 60)
+# 无法获取的用户（如已注销的账号）在该时间（秒）内不再请求
+AUTHOR_CACHE_FAILURE_TTL = float(
+    os.environ.get("AUTHOR_CACHE_FAILURE_TTL") or 24 * 60 * 60
+)
+"""用户名缓存有效期（秒），过期后重新获取以发现改名的用户"""
+
 # Artifact 相关常量
 REGISTRY_DATA_NAME = "registry_data.json"
 """传递给 Registry 的数据文件名，会上传至 Artifact 存储"""
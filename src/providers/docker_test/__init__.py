@@ -1,18 +1,50 @@
+import asyncio
 import json
+import os
+import re
+import socket
+import threading
+import time
 import traceback
-from typing import TypedDict
+from collections import deque
+from datetime import datetime
+from functools import cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Literal, NamedTuple, TypedDict
 
 import docker
+from docker.errors import APIError, ContainerError
 from pydantic import BaseModel, SkipValidation, field_validator
 
 from src.providers.constants import (
     DOCKER_BIND_RESULT_PATH,
+    DOCKER_CPUS,
+    DOCKER_FATAL_GRACE,
+    DOCKER_FATAL_PATTERNS,
     DOCKER_IMAGES,
+    DOCKER_IMAGES_DIGEST,
+    DOCKER_LABEL,
+    DOCKER_LOG_TAIL,
+    DOCKER_MAX_POOL_SIZE,
+    DOCKER_MEMORY,
+    DOCKER_POLL_INTERVAL,
+    DOCKER_TIMEOUT,
     PLUGIN_TEST_DIR,
     PYPI_KEY_TEMPLATE,
+    TIME_ZONE,
 )
+from src.providers.logger import logger
+from src.providers.metrics import metrics
 from src.providers.utils import pypi_key_to_path
 
+from .plugin_test import extract_version
+from .scheduler import get_scheduler
+
+if TYPE_CHECKING:
+    from docker.models.containers import Container
+
+BOOT_ID_PATH = Path("/proc/sys/kernel/random/boot_id")
+
 
 class Metadata(TypedDict):
     """插件元数据"""
@@ -44,6 +76,26 @@ class DockerTestResult(BaseModel):
     """
     metadata: SkipValidation[Metadata] | None = None
     """ 插件元数据 """
+    deps: dict[str, str] = {}
+    """ 依赖的商店插件
+
+    键为规范化后的项目名，值为测试时安装的版本
+    """
+    image: str | None = None
+    """ 测试镜像，包含摘要，如 ghcr.io/nonebot/nonetest@sha256:... """
+    outcome: Literal["timeout", "fatal", "oom"] | None = None
+    """ 测试异常结束的原因
+
+    timeout: 超过宿主机上设置的等待时间，容器被强制停止
+    fatal: 容器输出中出现无法恢复的错误，且在宽限时间内没有结束，容器被提前停止
+    oom: 容器内存超过限制，被系统强制停止
+    """
+    timings: dict[str, float] = {}
+    """ 各阶段耗时（秒）
+
+    container: 容器运行，create: 创建项目，show: 获取插件信息，
+    export: 获取插件依赖，load: 加载插件，parse: 解析测试结果
+    """
 
     @field_validator("config", mode="before")
     @classmethod
@@ -51,26 +103,260 @@ class DockerTestResult(BaseModel):
         return v or ""
 
 
+class DockerImage(NamedTuple):
+    """拉取的测试镜像"""
+
+    name: str
+    """ 镜像名称 """
+    digest: str | None
+    """ 包含摘要的镜像名称，本地构建的镜像没有摘要 """
+    pull_duration: float
+    """ 拉取耗时（秒） """
+
+
+@cache
+def get_docker_client() -> docker.DockerClient:
+    """获取进程内共享的 Docker 客户端
+
+    同时测试的插件共用客户端的连接池
+    """
+    return docker.DockerClient(
+        base_url="unix://var/run/docker.sock", max_pool_size=DOCKER_MAX_POOL_SIZE
+    )
+
+
+_pull_lock = threading.Lock()
+
+
+def pull_image() -> DockerImage:
+    """拉取测试镜像并校验摘要
+
+    整个进程只拉取一次，应在开始测试前调用，拉取耗时不计入插件的测试耗时
+
+    Raises:
+        ValueError: 镜像摘要与 DOCKER_IMAGES_DIGEST 不一致
+    """
+    with _pull_lock:
+        return _pull_image()
+
+
+@cache
+def _pull_image() -> DockerImage:
+    client = get_docker_client()
+    start = time.perf_counter()
+    try:
+        image = client.images.pull(DOCKER_IMAGES)
+    except APIError as e:
+        # 无法访问镜像仓库时，尝试使用本地已有的镜像
+        logger.warning(f"拉取测试镜像 {DOCKER_IMAGES} 失败：{e}，尝试使用本地镜像")
+        image = client.images.get(DOCKER_IMAGES)
+    pull_duration = round(time.perf_counter() - start, 3)
+
+    digests: list[str] = image.attrs.get("RepoDigests") or []
+    if DOCKER_IMAGES_DIGEST and not any(
+        digest.endswith(f"@{DOCKER_IMAGES_DIGEST}") for digest in digests
+    ):
+        raise ValueError(
+            f"测试镜像 {DOCKER_IMAGES} 的摘要 {digests} 与 {DOCKER_IMAGES_DIGEST} 不一致"
+        )
+    digest = digests[0] if digests else None
+
+    logger.info(f"已准备测试镜像 {digest or DOCKER_IMAGES}，耗时 {pull_duration} 秒")
+    metrics.set(
+        "docker_image_pull_seconds",
+        "测试镜像拉取耗时（秒）",
+        pull_duration,
+        image=digest or DOCKER_IMAGES,
+    )
+    return DockerImage(DOCKER_IMAGES, digest, pull_duration)
+
+
+class ContainerStopped(Exception):
+    """容器在测试结束前被强制停止"""
+
+    outcome: Literal["timeout", "fatal", "oom"]
+
+    def __init__(self, message: str, output: str) -> None:
+        super().__init__(message)
+        self.output = output
+
+
+class ContainerTimeout(ContainerStopped):
+    """容器运行超时"""
+
+    outcome = "timeout"
+
+    def __init__(self, timeout: float, output: str) -> None:
+        super().__init__(f"容器运行超过 {timeout} 秒", output)
+        self.timeout = timeout
+
+
+class ContainerFatal(ContainerStopped):
+    """容器输出中出现无法恢复的错误"""
+
+    outcome = "fatal"
+
+    def __init__(self, line: str, output: str) -> None:
+        super().__init__(f"容器输出中出现无法恢复的错误：{line}", output)
+        self.line = line
+
+
+class ContainerOOM(ContainerStopped):
+    """容器内存超过限制"""
+
+    outcome = "oom"
+
+    def __init__(self, output: str) -> None:
+        super().__init__("容器内存超过限制", output)
+
+
+_FATAL_PATTERN = re.compile("|".join(DOCKER_FATAL_PATTERNS))
+
+
+class ContainerLogs:
+    """实时读取容器输出
+
+    在后台线程中逐行读取，写入日志并只保留最后 DOCKER_LOG_TAIL 行，
+    读到 DOCKER_FATAL_PATTERNS 中的错误时记录下来
+    """
+
+    def __init__(self, container: "Container", name: str) -> None:
+        self.name = name
+        self.lines: deque[str] = deque(maxlen=DOCKER_LOG_TAIL)
+        self.fatal: str | None = None
+        """ 第一行出现无法恢复的错误的输出 """
+        self._thread = threading.Thread(
+            target=self._follow, args=(container,), daemon=True
+        )
+        self._thread.start()
+
+    def _follow(self, container: "Container") -> None:
+        buffer = b""
+        try:
+            for chunk in container.logs(
+                stdout=True, stderr=True, stream=True, follow=True
+            ):
+                buffer += chunk
+                # 按字节分行，避免截断多字节字符
+                *lines, buffer = buffer.split(b"\n")
+                for line in lines:
+                    self._append(line)
+        except Exception as e:
+            # 容器已被删除等情况，不影响测试结果
+            logger.debug(f"读取 {self.name} 的容器输出中断：{e}")
+        if buffer:
+            self._append(buffer)
+
+    def _append(self, line: bytes) -> None:
+        text = line.decode(errors="replace").rstrip("\r")
+        self.lines.append(text)
+        logger.debug(f"[{self.name}] {text}")
+        if self.fatal is None and _FATAL_PATTERN.search(text):
+            self.fatal = text
+
+    def join(self, timeout: float | None = None) -> None:
+        """等待读取结束，容器结束后输出流随之结束"""
+        self._thread.join(timeout)
+
+    def tail(self) -> str:
+        """最后的输出"""
+        return "\n".join(self.lines)
+
+
+def cleanup_containers() -> int:
+    """清理中断的测试遗留的容器与测试结果文件
+
+    只清理当前宿主机上启动进程已经退出的容器，不影响同时运行的其他测试
+    共用 Docker 守护进程的其他宿主机启动的容器不会被清理
+
+    Returns:
+        int: 清理的容器数量
+    """
+    client = get_docker_client()
+    hostname, boot_id = host_id()
+    removed = 0
+    for container in client.containers.list(
+        all=True, filters={"label": f"{DOCKER_LABEL}.host={hostname}"}
+    ):
+        labels = container.labels
+        pid = int(labels.get(f"{DOCKER_LABEL}.pid") or 0)
+        # 宿主机重启后之前的进程都已结束，进程号可能已被其他进程复用
+        if (
+            labels.get(f"{DOCKER_LABEL}.boot") == boot_id
+            and pid != os.getpid()
+            and _is_running(pid)
+        ):
+            continue
+        container.remove(force=True)
+        if result_path := labels.get(f"{DOCKER_LABEL}.result"):
+            Path(result_path).unlink(missing_ok=True)
+        removed += 1
+    if removed:
+        logger.info(f"已清理 {removed} 个遗留的测试容器")
+    return removed
+
+
+@cache
+def host_id() -> tuple[str, str]:
+    """当前宿主机的主机名与启动 ID
+
+    进程号只在同一宿主机的同一次启动内有效，无法获取启动 ID 时为空字符串
+    """
+    try:
+        boot_id = BOOT_ID_PATH.read_text(encoding="utf-8").strip()
+    except OSError:
+        boot_id = ""
+    return socket.gethostname(), boot_id
+
+
+def _is_running(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # 进程存在但属于其他用户
+        return True
+    return True
+
+
 class DockerPluginTest:
-    def __init__(self, project_link: str, module_name: str, config: str = ""):
+    def __init__(
+        self,
+        project_link: str,
+        module_name: str,
+        config: str = "",
+        cpus: float = DOCKER_CPUS,
+        memory: int = DOCKER_MEMORY,
+    ):
+        """
+        Args:
+            cpus (float): 容器可以使用的 CPU 数量，0 表示不限制
+            memory (int): 容器可以使用的内存（MiB），0 表示不限制
+        """
         self.project_link = project_link
         self.module_name = module_name
         self.config = config
+        self.cpus = cpus
+        self.memory = memory
 
         if not PLUGIN_TEST_DIR.exists():
             PLUGIN_TEST_DIR.mkdir(parents=True, exist_ok=True)
 
-    async def run(self, version: str) -> DockerTestResult:
+    async def run(
+        self,
+        version: str,
+        timeout: float = DOCKER_TIMEOUT,  # noqa: ASYNC109
+    ) -> DockerTestResult:
         """运行 Docker 容器测试插件
 
         Args:
             version (str): 对应的 Python 版本
+            timeout (float): 等待容器结束的最长时间（秒），超时后强制停止并删除容器
 
         Returns:
             DockerTestResult: 测试结果
         """
-        # 连接 Docker 环境
-        client = docker.DockerClient(base_url="unix://var/run/docker.sock")
         key = PYPI_KEY_TEMPLATE.format(
             project_link=self.project_link, module_name=self.module_name
         )
@@ -79,27 +365,54 @@ class DockerPluginTest:
         # 创建文件，以确保 Docker 容器内可以写入
         plugin_test_result.touch(exist_ok=True)
 
+        timings: dict[str, float] = {}
+        image: DockerImage | None = None
         try:
-            # 运行 Docker 容器，捕获输出。 容器内运行的代码拥有超时设限，此处无需设置超时
-            output = client.containers.run(
-                DOCKER_IMAGES,
-                environment={
-                    # 运行测试的 Python 版本
-                    "PYTHON_VERSION": version,
-                    # 插件信息
-                    "PROJECT_LINK": self.project_link,
-                    "MODULE_NAME": self.module_name,
-                    "PLUGIN_CONFIG": self.config,
-                },
-                detach=False,
-                remove=True,
-                volumes={
-                    plugin_test_result.resolve(strict=False).as_posix(): {
-                        "bind": DOCKER_BIND_RESULT_PATH,
-                        "mode": "rw",
-                    }
-                },
-            )
+            # 拉取镜像的耗时不计入测试耗时
+            image = await asyncio.to_thread(pull_image)
+            client = get_docker_client()
+            hostname, boot_id = host_id()
+            # 等待宿主机有足够的资源，等待时间不计入测试耗时
+            async with get_scheduler().reserve(self.cpus, self.memory):
+                start = datetime.now(TIME_ZONE)
+                # 容器内的各步骤也有超时设限，但插件可能卡在无法中断的地方，宿主机上仍需设置超时
+                # 后台启动容器后异步等待其结束，等待时不占用线程，使多个插件可以同时测试
+                container = await asyncio.to_thread(
+                    client.containers.run,
+                    # 使用校验过摘要的镜像，保证所有插件在同一镜像中测试
+                    image.digest or DOCKER_IMAGES,
+                    environment={
+                        # 运行测试的 Python 版本
+                        "PYTHON_VERSION": version,
+                        # 插件信息
+                        "PROJECT_LINK": self.project_link,
+                        "MODULE_NAME": self.module_name,
+                        "PLUGIN_CONFIG": self.config,
+                    },
+                    detach=True,
+                    **self.resource_limits(),
+                    labels={
+                        # 记录启动容器的宿主机与进程，用于清理中断的测试遗留的容器
+                        f"{DOCKER_LABEL}.host": hostname,
+                        f"{DOCKER_LABEL}.boot": boot_id,
+                        f"{DOCKER_LABEL}.pid": str(os.getpid()),
+                        f"{DOCKER_LABEL}.result": plugin_test_result.resolve(
+                            strict=False
+                        ).as_posix(),
+                    },
+                    volumes={
+                        plugin_test_result.resolve(strict=False).as_posix(): {
+                            "bind": DOCKER_BIND_RESULT_PATH,
+                            "mode": "rw",
+                        }
+                    },
+                )
+                try:
+                    output = await self._wait(container, timeout, key)
+                finally:
+                    await asyncio.to_thread(container.remove, force=True)
+            timings["container"] = _elapsed(start)
+            start = datetime.now(TIME_ZONE)
 
             try:
                 # 若测试结果文件存在且可解析，则优先使用测试结果文件
@@ -119,6 +432,21 @@ class DockerPluginTest:
                         输出内容：{output}
                         """,
                     }
+            timings["parse"] = _elapsed(start)
+        except ContainerStopped as e:
+            timings["container"] = _elapsed(start)
+            try:
+                # 容器可能在停止前已经写入测试结果
+                data = json.loads(plugin_test_result.read_text(encoding="utf-8"))
+            except Exception:
+                data = {
+                    "run": True,
+                    "load": False,
+                    "output": f"{e}，已强制停止。最后的输出：\n{e.output}",
+                    # 测试结果文件没有写入，尝试从输出中获取插件版本号
+                    "version": extract_version(e.output, self.project_link),
+                }
+            data["outcome"] = e.outcome
         except Exception as e:
             # 格式化异常堆栈信息
             trackback = "".join(traceback.format_exception(type(e), e, e.__traceback__))
@@ -131,4 +459,79 @@ class DockerPluginTest:
                 "load": False,
                 "output": trackback,
             }
+        finally:
+            # 测试结果文件只属于本次测试，读取后删除，避免下次测试读到旧结果
+            plugin_test_result.unlink(missing_ok=True)
+        # 容器内记录的各阶段耗时与宿主机上记录的耗时合并
+        data["timings"] = {**timings, **data.get("timings", {})}
+        if image is not None:
+            data["image"] = image.digest
         return DockerTestResult(**data)
+
+    def resource_limits(self) -> dict[str, int | str]:
+        """容器的 CPU 与内存限制"""
+        limits: dict[str, int | str] = {}
+        if self.cpus:
+            limits["nano_cpus"] = int(self.cpus * 1e9)
+        if self.memory:
+            limits["mem_limit"] = f"{self.memory}m"
+            # 禁用交换空间，内存超过限制时直接结束，而不是变得非常缓慢
+            limits["memswap_limit"] = f"{self.memory}m"
+        return limits
+
+    @staticmethod
+    async def _wait(
+        container: "Container",
+        timeout: float,  # noqa: ASYNC109
+        name: str,
+    ) -> bytes:
+        """等待容器结束并获取输出
+
+        定时刷新容器状态，每次只短暂占用线程，容器输出在后台线程中实时读取
+
+        Raises:
+            ContainerError: 容器退出码不为 0
+            ContainerTimeout: 超过等待时间，此时容器已被强制停止
+            ContainerFatal: 输出中出现无法恢复的错误后超过宽限时间仍未结束，此时容器已被强制停止
+            ContainerOOM: 容器内存超过限制，被系统强制停止
+        """
+        logs = ContainerLogs(container, name)
+        deadline = time.monotonic() + timeout
+        fatal: str | None = None
+        while True:
+            await asyncio.to_thread(container.reload)
+            if container.status in ("exited", "dead"):
+                break
+            now = time.monotonic()
+            if fatal is None and logs.fatal is not None:
+                # 出现错误后之后的步骤通常会跳过，先等待容器自行结束并写入测试结果
+                fatal = logs.fatal
+                deadline = min(deadline, now + DOCKER_FATAL_GRACE)
+            remaining = deadline - now
+            if remaining <= 0:
+                try:
+                    await asyncio.to_thread(container.kill)
+                except APIError:
+                    # 容器恰好在此时结束
+                    pass
+                await asyncio.to_thread(logs.join, DOCKER_POLL_INTERVAL)
+                if fatal is not None:
+                    raise ContainerFatal(fatal, logs.tail())
+                raise ContainerTimeout(timeout, logs.tail())
+            await asyncio.sleep(min(DOCKER_POLL_INTERVAL, remaining))
+        await asyncio.to_thread(logs.join, DOCKER_POLL_INTERVAL)
+
+        if container.attrs["State"].get("OOMKilled"):
+            raise ContainerOOM(logs.tail())
+        exit_status = container.attrs["State"]["ExitCode"]
+        if exit_status != 0:
+            # 与 containers.run 同步运行时的行为一致
+            stderr = await asyncio.to_thread(container.logs, stdout=False, stderr=True)
+            raise ContainerError(
+                container, exit_status, None, DOCKER_IMAGES, stderr.decode()
+            )
+        return await asyncio.to_thread(container.logs, stdout=True, stderr=False)
+
+
+def _elapsed(start: datetime) -> float:
+    return round((datetime.now(TIME_ZONE) - start).total_seconds(), 3)
@@ -8,7 +8,10 @@ import asyncio
 import json
 import os
 import re
+import sys
 from asyncio import create_subprocess_shell, subprocess
+from collections.abc import Awaitable
+from datetime import datetime
 from pathlib import Path
 
 import httpx
@@ -17,7 +20,9 @@ from src.providers.constants import (
     DOCKER_BIND_RESULT_PATH,
     PLUGIN_TEST_DIR,
     REGISTRY_PLUGINS_URL,
+    TIME_ZONE,
 )
+from src.providers.utils import canonicalize_name
 
 from .render import render_fake, render_runner
 
@@ -43,17 +48,6 @@ def get_plugin_list() -> dict[str, str]:
     }
 
 
-_canonicalize_regex = re.compile(r"[-_.]+")
-
-
-def canonicalize_name(name: str) -> str:
-    """规范化名称
-
-    packaging.utils 中的 canonicalize_name 实现
-    """
-    return _canonicalize_regex.sub("-", name).lower()
-
-
 def extract_version(output: str, project_link: str) -> str | None:
     """提取插件版本"""
     output = strip_ansi(output)
@@ -84,6 +78,18 @@ def extract_version(output: str, project_link: str) -> str | None:
         return match.group(1).strip()
 
 
+async def _tee(stream: asyncio.StreamReader | None, lines: list[bytes]) -> None:
+    """逐行读取命令输出，同时写入标准错误流
+
+    容器的标准输出流只用于输出测试结果，所以实时输出写入标准错误流
+    """
+    if stream is None:
+        return
+    async for line in stream:
+        lines.append(line)
+        print(line.decode(errors="replace"), end="", file=sys.stderr, flush=True)
+
+
 def parse_requirements(requirements: str) -> dict[str, str]:
     """解析 requirements.txt 文件"""
     # anyio==3.6.2 ; python_version >= "3.11" and python_version < "4.0"
@@ -129,8 +135,11 @@ class PluginTest:
         self._lines_output = []
         # 插件测试环境
         self._deps = []
+        self._dep_versions = {}
         self._test_env = []
         self._test_python_version = "unknown"
+        # 各阶段耗时
+        self._timings: dict[str, float] = {}
 
     @property
     def key(self) -> str:
@@ -160,17 +169,25 @@ class PluginTest:
         # print(msg)
         self._lines_output.append(msg)
 
+    async def _timed(self, phase: str, step: Awaitable[None]) -> None:
+        """执行测试步骤并记录耗时"""
+        start = datetime.now(TIME_ZONE)
+        await step
+        self._timings[phase] = round(
+            (datetime.now(TIME_ZONE) - start).total_seconds(), 3
+        )
+
     async def run(self):
         """插件测试入口"""
         # 创建插件测试项目
-        await self.create_poetry_project()
+        await self._timed("create", self.create_poetry_project())
         if self._create:
             await asyncio.gather(
-                self.show_package_info(),
-                self.show_plugin_dependencies(),
+                self._timed("show", self.show_package_info()),
+                self._timed("export", self.show_plugin_dependencies()),
                 self.get_python_version(),
             )
-            await self.run_poetry_project()
+            await self._timed("load", self.run_poetry_project())
 
         # 补上获取到 Python 版本
         self._test_env.insert(0, f"python=={self._test_python_version}")
@@ -193,6 +210,8 @@ class PluginTest:
             "version": self._version,
             "config": self.config,
             "test_env": " ".join(self._test_env),
+            "deps": self._dep_versions,
+            "timings": self._timings,
         }
         # 写入测试结果文件
         try:
@@ -222,18 +241,20 @@ class PluginTest:
             cwd=self._test_dir,
             env=self.env,
         )
+        stdout: list[bytes] = []
+        stderr: list[bytes] = []
+        # 边运行边读取输出，使宿主机可以实时看到测试进度
+        readers = asyncio.gather(_tee(proc.stdout, stdout), _tee(proc.stderr, stderr))
         try:
-            stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout)
-            code = proc.returncode
+            code = await asyncio.wait_for(proc.wait(), timeout)
         except TimeoutError:
             proc.terminate()
             # 超时后仍需读取 stdout 与 stderr 的内容
-            stdout = "执行命令超时\n".encode()
-            stdout += await proc.stdout.read() if proc.stdout else b""
-            stderr = await proc.stderr.read() if proc.stderr else b""
+            stdout.insert(0, "执行命令超时\n".encode())
             code = 1
+        await readers
 
-        return not code, stdout.decode(), stderr.decode()
+        return not code, b"".join(stdout).decode(), b"".join(stderr).decode()
 
     async def create_poetry_project(self):
         """创建 poetry 项目用来测试插件"""
@@ -318,6 +339,7 @@ class PluginTest:
                 self._log_output(f"插件 {self.project_link} 依赖的插件如下：")
                 requirements = parse_requirements(stdout)
                 self._deps = self._get_deps(requirements)
+                self._dep_versions = self._get_dep_versions(requirements)
                 self._test_env = self._get_test_env(requirements)
                 self._log_output(f"    {', '.join(self._deps)}")
             else:
@@ -355,16 +377,20 @@ class PluginTest:
 
     def _get_deps(self, requirements: dict[str, str]) -> list[str]:
         """获取插件依赖"""
-        deps = []
-        for package_name in requirements:
-            if (
-                package_name in self.plugin_list
-                # 不用包括插件自己
-                and package_name != canonicalize_name(self.project_link)
-            ):
-                module_name = self.plugin_list[package_name]
-                deps.append(module_name)
-        return deps
+        return [
+            self.plugin_list[package_name]
+            for package_name in self._get_dep_versions(requirements)
+        ]
+
+    def _get_dep_versions(self, requirements: dict[str, str]) -> dict[str, str]:
+        """获取依赖的商店插件的项目名与版本"""
+        return {
+            package_name: version
+            for package_name, version in requirements.items()
+            if package_name in self.plugin_list
+            # 不用包括插件自己
+            and package_name != canonicalize_name(self.project_link)
+        }
 
     def _get_test_env(self, requirements: dict[str, str]) -> list[str]:
         """获取测试环境"""
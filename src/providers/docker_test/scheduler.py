@@ -0,0 +1,119 @@
+"""测试容器调度
+
+按宿主机的空闲 CPU 与内存启动测试容器，避免同时运行的容器互相争抢资源
+"""
+
+import asyncio
+import os
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from functools import cache
+from pathlib import Path
+
+from src.providers.constants import DOCKER_POLL_INTERVAL
+from src.providers.logger import logger
+from src.providers.metrics import metrics
+
+MEMINFO_PATH = Path("/proc/meminfo")
+
+
+def host_cpus() -> float:
+    """当前进程可以使用的 CPU 数量"""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def host_memory() -> int:
+    """宿主机的内存总量（MiB）"""
+    return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") // 1024**2
+
+
+def available_memory() -> int | None:
+    """宿主机当前可用的内存（MiB），无法获取时返回 None"""
+    try:
+        with MEMINFO_PATH.open(encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    # MemAvailable:   12345678 kB
+                    return int(line.split()[1]) // 1024
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+class ResourceScheduler:
+    """按宿主机资源启动测试容器
+
+    每个容器按限制预留 CPU 与内存，预留的总量不超过宿主机的资源，
+    同时要求宿主机当前的可用内存足够，避免与容器外的进程争抢内存
+
+    没有容器运行时总会允许启动，即使限制超过了宿主机的资源
+    """
+
+    def __init__(self, cpus: float, memory: int) -> None:
+        """
+        Args:
+            cpus (float): 可供容器使用的 CPU 数量
+            memory (int): 可供容器使用的内存（MiB）
+        """
+        self.cpus = cpus
+        self.memory = memory
+        self.running = 0
+        self.reserved_cpus: float = 0
+        self.reserved_memory = 0
+        self._condition = asyncio.Condition()
+
+    def fits(self, cpus: float, memory: int) -> bool:
+        """是否有足够的资源启动容器"""
+        if not self.running:
+            return True
+        if (
+            self.reserved_cpus + cpus > self.cpus
+            or self.reserved_memory + memory > self.memory
+        ):
+            return False
+        available = available_memory()
+        return available is None or available >= memory
+
+    @asynccontextmanager
+    async def reserve(self, cpus: float, memory: int) -> AsyncIterator[None]:
+        """等待资源足够后预留，退出时释放
+
+        Args:
+            cpus (float): 容器的 CPU 限制，0 表示不限制
+            memory (int): 容器的内存限制（MiB），0 表示不限制
+        """
+        start = time.perf_counter()
+        async with self._condition:
+            if not self.fits(cpus, memory):
+                logger.info(f"宿主机资源不足，等待已运行的 {self.running} 个容器结束")
+            while not self.fits(cpus, memory):
+                # 容器外的进程释放内存时不会通知，所以需要定时重新检查
+                try:
+                    await asyncio.wait_for(self._condition.wait(), DOCKER_POLL_INTERVAL)
+                except TimeoutError:
+                    pass
+            self.running += 1
+            self.reserved_cpus += cpus
+            self.reserved_memory += memory
+        metrics.observe(
+            "container_admission_wait_seconds",
+            "等待宿主机资源的耗时（秒）",
+            round(time.perf_counter() - start, 3),
+        )
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self.running -= 1
+                self.reserved_cpus -= cpus
+                self.reserved_memory -= memory
+                self._condition.notify_all()
+
+
+@cache
+def get_scheduler() -> ResourceScheduler:
+    """获取进程内共享的调度器，可用资源为宿主机的全部 CPU 与内存"""
+    return ResourceScheduler(host_cpus(), host_memory())
@@ -0,0 +1,216 @@
+"""基于条件请求的 HTTP 磁盘缓存
+
+缓存响应内容及其 ETag 与 Last-Modified，之后通过 If-None-Match 与
+If-Modified-Since 重新验证，服务器返回 304 时直接使用缓存内容
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import TypedDict
+
+import httpx
+
+from src.providers.constants import (
+    HTTP_CACHE_DIR,
+    HTTP_CACHE_MAX_SIZE,
+    HTTP_CACHE_TTL,
+)
+from src.providers.logger import logger
+from src.providers.metrics import metrics
+
+
+class CacheEntry(TypedDict):
+    """缓存元数据"""
+
+    url: str
+    etag: str | None
+    last_modified: str | None
+    content_type: str | None
+    stored_at: float
+
+
+class HttpCache:
+    def __init__(self, path: Path, ttl: float = 0, max_size: int = 0) -> None:
+        """
+        Args:
+            path (Path): 缓存目录
+            ttl (float, optional): 缓存有效期（秒）. Defaults to 0.
+            max_size (int, optional): 缓存最大占用空间（字节），为 0 时不限制. Defaults to 0.
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_size = max_size
+
+    def _paths(self, url: str) -> tuple[Path, Path]:
+        name = hashlib.sha256(url.encode()).hexdigest()
+        return self.path / f"{name}.json", self.path / f"{name}.body"
+
+    def get(self, url: str) -> tuple[CacheEntry, bytes] | None:
+        """读取缓存"""
+        meta_path, body_path = self._paths(url)
+        try:
+            entry: CacheEntry = json.loads(meta_path.read_text(encoding="utf-8"))
+            body = body_path.read_bytes()
+        except (OSError, ValueError):
+            return None
+        # 记录访问时间，淘汰缓存时使用
+        os.utime(body_path)
+        return entry, body
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        """缓存是否仍在有效期内"""
+        return time.time() - entry["stored_at"] < self.ttl
+
+    @staticmethod
+    def validators(entry: CacheEntry) -> dict[str, str]:
+        """重新验证缓存所需的请求头"""
+        headers = {}
+        if entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, url: str, response: httpx.Response) -> None:
+        """保存响应
+
+        既无法重新验证又没有有效期的响应不会被缓存
+        """
+        entry = CacheEntry(
+            url=url,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+            content_type=response.headers.get("Content-Type"),
+            stored_at=time.time(),
+        )
+        if not (entry["etag"] or entry["last_modified"] or self.ttl > 0):
+            return
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        meta_path, body_path = self._paths(url)
+        # 先写入临时文件再替换，避免并发读取到写了一半的缓存
+        _atomic_write(body_path, response.content)
+        _atomic_write(meta_path, json.dumps(entry).encode())
+        self.evict()
+
+    def refresh(self, url: str, entry: CacheEntry) -> None:
+        """服务器确认缓存未变化后，重新计算有效期"""
+        meta_path, _ = self._paths(url)
+        entry["stored_at"] = time.time()
+        _atomic_write(meta_path, json.dumps(entry).encode())
+
+    def evict(self) -> None:
+        """缓存超出最大占用空间时，删除最久未使用的缓存"""
+        if self.max_size <= 0:
+            return
+
+        bodies = [(p, p.stat()) for p in self.path.glob("*.body")]
+        total = sum(stat.st_size for _, stat in bodies)
+        for body_path, stat in sorted(bodies, key=lambda x: x[1].st_mtime):
+            if total <= self.max_size:
+                break
+            body_path.with_suffix(".json").unlink(missing_ok=True)
+            body_path.unlink(missing_ok=True)
+            total -= stat.st_size
+            logger.debug(f"已删除缓存 {body_path.name}")
+
+    @staticmethod
+    def response(entry: CacheEntry, body: bytes) -> httpx.Response:
+        """使用缓存内容构造响应"""
+        headers = (
+            {"Content-Type": entry["content_type"]} if entry["content_type"] else {}
+        )
+        return httpx.Response(
+            200,
+            content=body,
+            headers=headers,
+            request=httpx.Request("GET", entry["url"]),
+        )
+
+
+def _atomic_write(path: Path, content: bytes) -> None:
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{time.monotonic_ns()}.tmp")
+    tmp_path.write_bytes(content)
+    tmp_path.replace(path)
+
+
+def get_http_cache() -> HttpCache | None:
+    """获取 HTTP 缓存，未设置缓存目录时返回 None"""
+    if not HTTP_CACHE_DIR:
+        return None
+    return HttpCache(Path(HTTP_CACHE_DIR), HTTP_CACHE_TTL, HTTP_CACHE_MAX_SIZE)
+
+
+def cached_get(url: str, headers: dict[str, str] | None = None) -> httpx.Response:
+    """发送 GET 请求，并尽可能使用磁盘缓存"""
+    cache = get_http_cache()
+    if cache is None:
+        return _timed_get(url, headers)
+
+    cached = cache.get(url)
+    if cached and cache.is_fresh(cached[0]):
+        metrics.record_http(url, "cache", 0)
+        return cache.response(*cached)
+
+    request_headers = dict(headers or {})
+    if cached:
+        request_headers.update(cache.validators(cached[0]))
+    r = _timed_get(url, request_headers)
+    return _handle_response(cache, url, cached, r)
+
+
+async def cached_get_async(
+    client: httpx.AsyncClient,
+    url: str,
+    timeout: float = 30,  # noqa: ASYNC109
+) -> httpx.Response:
+    """发送异步 GET 请求，并尽可能使用磁盘缓存"""
+    cache = get_http_cache()
+    if cache is None:
+        return await _timed_get_async(client, url, timeout)
+
+    cached = cache.get(url)
+    if cached and cache.is_fresh(cached[0]):
+        metrics.record_http(url, "cache", 0)
+        return cache.response(*cached)
+
+    headers = cache.validators(cached[0]) if cached else {}
+    r = await _timed_get_async(client, url, timeout, headers)
+    return _handle_response(cache, url, cached, r)
+
+
+def _timed_get(url: str, headers: dict[str, str] | None) -> httpx.Response:
+    start = time.perf_counter()
+    r = httpx.get(url, follow_redirects=True, headers=headers)
+    metrics.record_http(url, r.status_code, time.perf_counter() - start)
+    return r
+
+
+async def _timed_get_async(
+    client: httpx.AsyncClient,
+    url: str,
+    timeout: float,  # noqa: ASYNC109
+    headers: dict[str, str] | None = None,
+) -> httpx.Response:
+    start = time.perf_counter()
+    r = await client.get(url, timeout=timeout, headers=headers)
+    metrics.record_http(url, r.status_code, time.perf_counter() - start)
+    return r
+
+
+def _handle_response(
+    cache: HttpCache,
+    url: str,
+    cached: tuple[CacheEntry, bytes] | None,
+    response: httpx.Response,
+) -> httpx.Response:
+    if response.status_code == 304 and cached:
+        logger.debug(f"{url} 未变化，使用缓存")
+        cache.refresh(url, cached[0])
+        return cache.response(*cached)
+    if response.status_code == 200:
+        cache.store(url, response)
+    return response
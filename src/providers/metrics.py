@@ -0,0 +1,159 @@
+"""运行指标
+
+记录商店测试过程中的计数与耗时，导出为 JSON 与 Prometheus 文本格式
+"""
+
+import json
+import threading
+from pathlib import Path
+from urllib.parse import urlsplit
+
+METRIC_PREFIX = "noneflow_"
+
+Labels = tuple[tuple[str, str], ...]
+
+
+class Metrics:
+    """指标集合
+
+    计数器只增不减，摘要记录观测值的数量、总和与最大值，仪表记录最新的值
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: dict[str, dict[Labels, float]] = {}
+        self._summaries: dict[str, dict[Labels, list[float]]] = {}
+        self._gauges: dict[str, dict[Labels, float]] = {}
+        self._help: dict[str, str] = {}
+
+    @staticmethod
+    def _labels(labels: dict[str, str]) -> Labels:
+        return tuple(sorted(labels.items()))
+
+    def inc(self, name: str, doc: str, value: float = 1, **labels: str) -> None:
+        """增加计数器"""
+        with self._lock:
+            self._help.setdefault(name, doc)
+            series = self._counters.setdefault(name, {})
+            key = self._labels(labels)
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, doc: str, value: float, **labels: str) -> None:
+        """记录一次观测值"""
+        with self._lock:
+            self._help.setdefault(name, doc)
+            series = self._summaries.setdefault(name, {})
+            count, total, maximum = series.get(self._labels(labels), [0, 0, 0])
+            series[self._labels(labels)] = [
+                count + 1,
+                total + value,
+                max(maximum, value),
+            ]
+
+    def set(self, name: str, doc: str, value: float, **labels: str) -> None:
+        """设置仪表的值"""
+        with self._lock:
+            self._help.setdefault(name, doc)
+            self._gauges.setdefault(name, {})[self._labels(labels)] = value
+
+    def reset(self) -> None:
+        """清空所有指标"""
+        with self._lock:
+            self._counters.clear()
+            self._summaries.clear()
+            self._gauges.clear()
+            self._help.clear()
+
+    def record_http(self, url: str, status: int | str, seconds: float) -> None:
+        """记录一次 HTTP 请求"""
+        host = urlsplit(url).hostname or ""
+        self.inc(
+            "http_requests_total",
+            "HTTP 请求次数",
+            host=host,
+            status=str(status),
+        )
+        self.observe(
+            "http_request_duration_seconds",
+            "HTTP 请求耗时（秒）",
+            seconds,
+            host=host,
+        )
+
+    def to_json(self) -> dict:
+        """转换为 JSON 数据
+
+        每个指标为一个列表，列表中的元素包含标签与对应的值
+        """
+        with self._lock:
+            data: dict[str, list[dict]] = {}
+            for name, series in self._counters.items():
+                data[name] = [
+                    {"labels": dict(labels), "value": value}
+                    for labels, value in series.items()
+                ]
+            for name, series in self._summaries.items():
+                data[name] = [
+                    {
+                        "labels": dict(labels),
+                        "count": count,
+                        "sum": total,
+                        "max": maximum,
+                    }
+                    for labels, (count, total, maximum) in series.items()
+                ]
+            for name, series in self._gauges.items():
+                data[name] = [
+                    {"labels": dict(labels), "value": value}
+                    for labels, value in series.items()
+                ]
+        return dict(sorted(data.items()))
+
+    def to_prometheus(self) -> str:
+        """转换为 Prometheus 文本格式"""
+        lines: list[str] = []
+
+        def sample(name: str, labels: Labels, value: float) -> str:
+            label_text = ",".join(f'{k}="{_escape_label(v)}"' for k, v in labels)
+            label_text = f"{{{label_text}}}" if label_text else ""
+            return f"{METRIC_PREFIX}{name}{label_text} {value:g}"
+
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                lines.append(f"# HELP {METRIC_PREFIX}{name} {self._help[name]}")
+                lines.append(f"# TYPE {METRIC_PREFIX}{name} counter")
+                lines.extend(sample(name, k, v) for k, v in series.items())
+            for name, series in sorted(self._summaries.items()):
+                lines.append(f"# HELP {METRIC_PREFIX}{name} {self._help[name]}")
+                lines.append(f"# TYPE {METRIC_PREFIX}{name} summary")
+                for labels, (count, total, _) in series.items():
+                    lines.append(sample(f"{name}_count", labels, count))
+                    lines.append(sample(f"{name}_sum", labels, total))
+                # Prometheus 的摘要类型不包含最大值，单独作为仪表导出
+                lines.append(f"# TYPE {METRIC_PREFIX}{name}_max gauge")
+                lines.extend(
+                    sample(f"{name}_max", labels, maximum)
+                    for labels, (_, _, maximum) in series.items()
+                )
+            for name, series in sorted(self._gauges.items()):
+                lines.append(f"# HELP {METRIC_PREFIX}{name} {self._help[name]}")
+                lines.append(f"# TYPE {METRIC_PREFIX}{name} gauge")
+                lines.extend(sample(name, k, v) for k, v in series.items())
+        return "\n".join(lines) + "\n"
+
+    def dump(self, json_path: Path, prometheus_path: Path) -> None:
+        """将指标写入文件"""
+        json_path.parent.mkdir(parents=True, exist_ok=True)
+        json_path.write_text(
+            json.dumps(self.to_json(), ensure_ascii=False, indent=2), encoding="utf-8"
+        )
+        prometheus_path.parent.mkdir(parents=True, exist_ok=True)
+        prometheus_path.write_text(self.to_prometheus(), encoding="utf-8")
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+metrics = Metrics()
+""" 当前运行的指标 """
@@ -3,6 +3,7 @@ import io
 import os
 import zipfile
 from datetime import datetime
+from functools import cache
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, Literal, Self, TypeAlias
 
@@ -18,7 +19,12 @@ from src.providers.constants import (
     TIME_ZONE,
 )
 from src.providers.docker_test import Metadata
-from src.providers.utils import get_author_name, get_pypi_upload_time, get_pypi_version
+from src.providers.utils import (
+    get_author_name,
+    get_pypi_upload_time,
+    get_pypi_version,
+    refresh_author_name,
+)
 from src.providers.validation import PublishInfoModels, validate_info
 from src.providers.validation.models import (
     AdapterPublishInfo,
@@ -43,6 +49,28 @@ class Tag(BaseModel):
         return color.as_hex(format="long")
 
 
+@cache
+def get_tag(label: str, color: str) -> Tag:
+    """获取标签
+
+    商店中大量插件使用相同的标签，相同的标签只解析一次颜色，并共享同一个实例
+    """
+    return Tag.model_validate({"label": label, "color": color})
+
+
+def share_tags(data: dict[str, Any]) -> dict[str, Any]:
+    """将数据中的标签替换为共享的标签实例，验证模型时不会再重复解析颜色"""
+    if not data.get("tags"):
+        return data
+    return {
+        **data,
+        "tags": [
+            get_tag(tag["label"], tag["color"]) if isinstance(tag, dict) else tag
+            for tag in data["tags"]
+        ],
+    }
+
+
 # region 仓库数据模型
 class StoreAdapter(BaseModel):
     """NoneBot 仓库中的适配器数据"""
@@ -270,7 +298,7 @@ class RegistryAdapter(BaseModel):
         data.update(store.model_dump())
         data.update(version=version, time=time)
 
-        return RegistryAdapter(**data)
+        return RegistryAdapter(**share_tags(data))
 
 
 class RegistryBot(BaseModel):
@@ -302,7 +330,7 @@ class RegistryBot(BaseModel):
         """根据商店数据更新注册表数据"""
         data = self.model_dump()
         data.update(store.model_dump())
-        return RegistryBot(**data)
+        return RegistryBot(**share_tags(data))
 
 
 class RegistryDriver(BaseModel):
@@ -354,7 +382,7 @@ class RegistryDriver(BaseModel):
         data.update(store.model_dump())
         data.update(version=version, time=time)
 
-        return RegistryDriver(**data)
+        return RegistryDriver(**share_tags(data))
 
 
 class RegistryPlugin(BaseModel):
@@ -411,11 +439,15 @@ class RegistryPlugin(BaseModel):
         }
 
     def update(self, store: StorePlugin) -> "RegistryPlugin":
-        """根据商店数据更新注册表数据"""
-        # TODO: 如果 author_id 变化，应该重新获取 author
+        """根据商店数据更新注册表数据
+
+        注册表中没有记录 author_id，根据商店中的 author_id 更新 author，
+        无法获取时保留原来的作者名字，不影响其他数据的更新
+        """
         data = self.model_dump()
         data.update(store.model_dump())
-        return RegistryPlugin(**data)
+        data.update(author=refresh_author_name(store.author_id, self.author))
+        return RegistryPlugin(**share_tags(data))
 
 
 RegistryModels: TypeAlias = (
@@ -455,6 +487,28 @@ class StoreTestResult(BaseModel):
     """
     results: dict[Literal["validation", "load", "metadata"], bool]
     outputs: dict[Literal["validation", "load", "metadata"], Any]
+    duration: float | None = Field(default=None, exclude_if=lambda v: v is None)
+    """测试耗时（秒）"""
+    timings: dict[str, float] | None = Field(
+        default=None, exclude_if=lambda v: v is None
+    )
+    """各阶段测试耗时（秒）"""
+    image: str | None = Field(default=None, exclude_if=lambda v: v is None)
+    """测试镜像，包含摘要"""
+    outcome: Literal["timeout", "fatal", "oom"] | None = Field(
+        default=None, exclude_if=lambda v: v is None
+    )
+    """测试异常结束的原因
+
+    timeout 表示超时后被强制停止，fatal 表示输出中出现无法恢复的错误且未在宽限时间内结束，被提前停止，
+    oom 表示内存超过限制后被强制停止
+    """
+    deps: dict[str, str] | None = Field(default=None, exclude_if=lambda v: v is None)
+    """依赖的商店插件
+
+    键为依赖插件规范化后的项目名，值为测试时安装的版本
+    依赖插件发布新版本后需要重新测试
+    """
 
     @classmethod
     def from_info(cls, info: PluginPublishInfo) -> Self:
@@ -493,6 +547,40 @@ class StoreTestResult(BaseModel):
         return v
 
 
+class StoreTestCheckpoint(BaseModel):
+    """单个插件的测试进度
+
+    每测试完一个插件就追加到进度文件中，测试中断后可以继续
+    """
+
+    key: str
+    """插件标识符"""
+    result: StoreTestResult
+    """测试结果"""
+    plugin: RegistryPlugin
+    """测试后的插件数据"""
+
+
+class StoreTestBundle(BaseModel):
+    """分片商店测试的结果
+
+    只包含该分片测试过的插件，通过 `merge-results` 合并为完整的注册表数据
+    """
+
+    shard: tuple[int, int]
+    """分片序号（从 1 开始）与分片总数"""
+    results: dict[str, StoreTestResult] = {}
+    """测试结果"""
+    plugins: dict[str, RegistryPlugin] = {}
+    """测试后的插件数据"""
+    configs: dict[str, str] = {}
+    """该分片中插件的测试配置"""
+    pypi_serial: int | None = None
+    """增量检测时获取到的 PyPI 变更序号"""
+    pending: list[str] = []
+    """该分片中仍需检查的插件"""
+
+
 class RepoInfo(BaseModel):
     """仓库信息"""
 
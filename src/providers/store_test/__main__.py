@@ -1,12 +1,44 @@
 import asyncio
+import json
 import os
+from pathlib import Path
+from typing import Literal
 
 import click
 
 from src.providers.logger import logger
-from src.providers.models import RegistryUpdatePayload
+from src.providers.models import RegistryUpdatePayload, StoreTestBundle
 
-from .store import StoreTest
+from .constants import HISTORY_PATH
+from .history import ResultHistory
+from .store import StoreTest, parse_test_env
+
+
+def parse_shard(
+    ctx: click.Context, param: click.Parameter, value: str | None
+) -> tuple[int, int] | None:
+    """解析 i/n 格式的分片参数"""
+    if value is None:
+        return None
+    try:
+        index, count = (int(x) for x in value.split("/"))
+    except ValueError:
+        raise click.BadParameter("格式应为 i/n，例如 1/4")
+    if not 1 <= index <= count:
+        raise click.BadParameter("分片序号应在 1 到分片总数之间")
+    return index, count
+
+
+def parse_target_env(
+    ctx: click.Context, param: click.Parameter, value: str | None
+) -> dict[str, str] | None:
+    """解析 name==version 格式的目标测试环境"""
+    if value is None:
+        return None
+    env = parse_test_env(value)
+    if not env:
+        raise click.BadParameter("格式应为 name==version，例如 nonebot2==2.4.1")
+    return env
 
 
 @click.group()
@@ -27,7 +59,7 @@ def registry_update():
     payload = RegistryUpdatePayload.model_validate_json(payload)
     data = payload.get_artifact_data()
 
-    test = StoreTest()
+    test = asyncio.run(StoreTest.create())
     asyncio.run(test.registry_update(data))
 
 
@@ -43,18 +75,156 @@ def registry_update():
     is_flag=True,
     help="按测试时间倒序排列，优先测试最近测试的插件",
 )
-def plugin_test(limit: int, offset: int, force: bool, key: str | None, recent: bool):
+@click.option(
+    "-j",
+    "--jobs",
+    default=1,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="同时测试的插件数量",
+)
+@click.option(
+    "--incremental",
+    default=False,
+    is_flag=True,
+    help="根据 PyPI 变更记录，只检查上次运行后有变化的插件",
+)
+@click.option(
+    "--time-budget",
+    default=None,
+    type=click.FloatRange(min=0),
+    help="测试时间预算（秒），根据历史测试耗时挑选插件，设置后忽略 limit",
+)
+@click.option(
+    "--default-duration",
+    default=300,
+    show_default=True,
+    type=click.FloatRange(min=0),
+    help="没有历史测试耗时的插件的估计耗时（秒）",
+)
+@click.option(
+    "--priority",
+    is_flag=True,
+    help="按优先级测试，优先测试新插件与有新版本的插件",
+)
+@click.option(
+    "--shard",
+    default=None,
+    callback=parse_shard,
+    help="只测试指定分片的插件并单独保存结果，格式为 i/n，例如 1/4",
+)
+@click.option(
+    "--resume",
+    is_flag=True,
+    help="继续上次中断的测试，跳过已保存进度的插件",
+)
+@click.option(
+    "--target-env",
+    default=None,
+    callback=parse_target_env,
+    help="目标测试环境，只重新测试上次测试环境与之不同的插件，例如 nonebot2==2.4.1",
+)
+def plugin_test(
+    limit: int,
+    offset: int,
+    force: bool,
+    key: str | None,
+    recent: bool,
+    jobs: int,
+    incremental: bool,
+    time_budget: float | None,
+    default_duration: float,
+    priority: bool,
+    shard: tuple[int, int] | None,
+    resume: bool,
+    target_env: dict[str, str] | None,
+):
     """插件测试"""
     from .store import StoreTest
 
-    test = StoreTest()
+    test = asyncio.run(StoreTest.create())
+    test.prepare_docker()
 
     if key:
         # 指定了 key，直接测试该插件
         asyncio.run(test.run_single_plugin(key, force))
     else:
         # 没有指定 key，根据 recent 参数决定测试顺序
-        asyncio.run(test.run(limit, offset, force, recent))
+        asyncio.run(
+            test.run(
+                limit,
+                offset,
+                force,
+                recent,
+                jobs,
+                incremental,
+                time_budget,
+                default_duration,
+                priority,
+                shard,
+                resume,
+                target_env,
+            )
+        )
+
+
+@cli.command()
+@click.argument(
+    "bundles",
+    nargs=-1,
+    required=True,
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+)
+def merge_results(bundles: tuple[Path, ...]):
+    """合并分片测试结果"""
+    test = asyncio.run(StoreTest.create())
+    asyncio.run(
+        test.merge_bundles(
+            [
+                StoreTestBundle.model_validate_json(bundle.read_bytes())
+                for bundle in bundles
+            ]
+        )
+    )
+
+
+@cli.command()
+@click.option("-k", "--key", default=None, help="插件标识符")
+@click.option("--since", default=None, help="起始测试时间（ISO 8601 格式）")
+@click.option("--until", default=None, help="截止测试时间（ISO 8601 格式）")
+@click.option(
+    "--outcome", default=None, type=click.Choice(["passed", "failed"]), help="测试结果"
+)
+def history(
+    key: str | None,
+    since: str | None,
+    until: str | None,
+    outcome: Literal["passed", "failed"] | None,
+):
+    """查询测试历史记录，每行输出一条 JSON 记录"""
+    with ResultHistory(HISTORY_PATH) as results:
+        for record in results.query(key, since, until, outcome):
+            click.echo(
+                json.dumps(
+                    {"key": record.key, **record.result.model_dump(mode="json")},
+                    ensure_ascii=False,
+                )
+            )
+
+
+@cli.command()
+@click.option(
+    "--keep",
+    default=30,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="每个插件保留的记录数量",
+)
+def compact_history(keep: int):
+    """压缩测试历史记录"""
+    with ResultHistory(HISTORY_PATH) as results:
+        removed = results.compact(keep)
+    logger.info(f"已删除 {removed} 条测试历史记录")
 
 
 if __name__ == "__main__":
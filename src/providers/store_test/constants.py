@@ -20,3 +20,21 @@ PLUGINS_PATH = TEST_DIR / "plugins.json"
 
 PLUGIN_CONFIG_PATH = TEST_DIR / "plugin_configs.json"
 """ 生成的插件配置保存路径 """
+
+PYPI_SERIAL_PATH = TEST_DIR / "pypi_serial.json"
+""" PyPI 变更记录序号保存路径 """
+
+HISTORY_PATH = TEST_DIR / "history.db"
+""" 测试历史记录保存路径，results.json 由其中每个插件最近的测试结果生成 """
+
+CHECKPOINT_PATH = TEST_DIR / "checkpoint.jsonl"
+""" 测试进度保存路径，每行为一个插件的测试结果 """
+
+SHARD_BUNDLE_NAME = "shard-{index}-of-{count}.json"
+""" 分片测试结果文件名，保存在测试文件夹中 """
+
+METRICS_JSON_PATH = TEST_DIR / "metrics.json"
+""" 运行指标保存路径（JSON 格式） """
+
+METRICS_PROMETHEUS_PATH = TEST_DIR / "metrics.prom"
+""" 运行指标保存路径（Prometheus 文本格式） """
@@ -0,0 +1,168 @@
+"""插件测试历史记录
+
+使用 SQLite 追加保存每一次的测试结果，只在压缩时删除旧记录
+"""
+
+import sqlite3
+from collections.abc import Iterable, Iterator
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Literal, NamedTuple, Self
+
+from src.providers.models import StoreTestResult
+
+Outcome = Literal["passed", "failed"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    key TEXT NOT NULL,
+    tested_at TEXT NOT NULL,
+    version TEXT,
+    outcome TEXT NOT NULL,
+    duration REAL,
+    data TEXT NOT NULL,
+    UNIQUE (key, tested_at)
+);
+CREATE INDEX IF NOT EXISTS results_key ON results (key, id);
+CREATE INDEX IF NOT EXISTS results_tested_at ON results (tested_at);
+CREATE INDEX IF NOT EXISTS results_outcome ON results (outcome, tested_at);
+"""
+
+
+class HistoryRecord(NamedTuple):
+    """一条测试历史记录"""
+
+    key: str
+    result: StoreTestResult
+
+
+def get_outcome(result: StoreTestResult) -> Outcome:
+    """测试结果，所有项目都通过时为 passed"""
+    return "passed" if all(result.results.values()) else "failed"
+
+
+def normalize_time(time: str | datetime) -> str:
+    """转换为 UTC 时间，保证不同时区的时间可以按字符串比较"""
+    if isinstance(time, str):
+        time = datetime.fromisoformat(time)
+    return time.astimezone(UTC).isoformat()
+
+
+class ResultHistory:
+    """插件测试历史记录
+
+    同一插件的同一次测试（测试时间相同）只会保存一次，所以可以重复追加
+    """
+
+    def __init__(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.executescript(SCHEMA)
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def extend(self, results: dict[str, StoreTestResult]) -> int:
+        """追加测试结果
+
+        Returns:
+            int: 新增的记录数量
+        """
+        with self._conn:
+            cursor = self._conn.executemany(
+                "INSERT OR IGNORE INTO results "
+                "(key, tested_at, version, outcome, duration, data) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    (
+                        key,
+                        normalize_time(result.time),
+                        result.version,
+                        get_outcome(result),
+                        result.duration,
+                        result.model_dump_json(),
+                    )
+                    for key, result in results.items()
+                ),
+            )
+        return cursor.rowcount
+
+    def query(
+        self,
+        key: str | None = None,
+        since: str | datetime | None = None,
+        until: str | datetime | None = None,
+        outcome: Outcome | None = None,
+    ) -> Iterator[HistoryRecord]:
+        """按追加顺序查询测试结果
+
+        结果逐条读取，不会一次性加载全部历史记录
+
+        Args:
+            key (str | None): 插件标识符
+            since (str | datetime | None): 不早于该测试时间
+            until (str | datetime | None): 早于该测试时间
+            outcome (Outcome | None): 测试结果
+        """
+        conditions: list[str] = []
+        params: list[str] = []
+        if key is not None:
+            conditions.append("key = ?")
+            params.append(key)
+        if since is not None:
+            conditions.append("tested_at >= ?")
+            params.append(normalize_time(since))
+        if until is not None:
+            conditions.append("tested_at < ?")
+            params.append(normalize_time(until))
+        if outcome is not None:
+            conditions.append("outcome = ?")
+            params.append(outcome)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        for key, data in self._conn.execute(
+            f"SELECT key, data FROM results {where} ORDER BY id", params
+        ):
+            yield HistoryRecord(key, StoreTestResult.model_validate_json(data))
+
+    def latest(self, keys: Iterable[str]) -> dict[str, StoreTestResult]:
+        """获取插件最近一次的测试结果
+
+        按测试时间而不是追加顺序选取，历史记录可能从缓存恢复后乱序追加
+        按传入的插件顺序返回，没有历史记录的插件不包含在内
+        """
+        results: dict[str, StoreTestResult] = {}
+        for key in keys:
+            row = self._conn.execute(
+                "SELECT data FROM results WHERE key = ? "
+                "ORDER BY tested_at DESC, id DESC LIMIT 1",
+                (key,),
+            ).fetchone()
+            if row is not None:
+                results[key] = StoreTestResult.model_validate_json(row[0])
+        return results
+
+    def compact(self, keep: int) -> int:
+        """压缩历史记录，每个插件只保留最近的 keep 条记录
+
+        Returns:
+            int: 删除的记录数量
+        """
+        with self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM results WHERE id IN ("
+                "SELECT id FROM ("
+                "SELECT id, ROW_NUMBER() OVER "
+                "(PARTITION BY key ORDER BY tested_at DESC, id DESC) AS n "
+                "FROM results) WHERE n > ?)",
+                (keep,),
+            )
+        self._conn.execute("VACUUM")
+        return cursor.rowcount
@@ -1,15 +1,27 @@
-from collections.abc import Callable
+import asyncio
+import hashlib
+import heapq
+import time
+from collections.abc import Callable, Iterable, Iterator
 from datetime import datetime
-from typing import TYPE_CHECKING, TypeVar
+from itertools import islice
+from typing import TYPE_CHECKING, Any, Self, TypeVar
+
+import httpx
+from docker.errors import DockerException
 
 from src.providers.constants import (
     BOT_KEY_TEMPLATE,
+    DOCKER_MIN_TIMEOUT,
+    DOCKER_TIMEOUT,
+    DOCKER_TIMEOUT_FACTOR,
     PYPI_KEY_TEMPLATE,
     REGISTRY_ADAPTERS_URL,
     REGISTRY_BOTS_URL,
     REGISTRY_DRIVERS_URL,
     REGISTRY_PLUGIN_CONFIG_URL,
     REGISTRY_PLUGINS_URL,
+    REGISTRY_PYPI_SERIAL_URL,
     REGISTRY_RESULTS_URL,
     STORE_ADAPTERS_URL,
     STORE_BOTS_URL,
@@ -17,7 +29,9 @@ from src.providers.constants import (
     STORE_PLUGINS_URL,
     TIME_ZONE,
 )
+from src.providers.docker_test import DockerImage, cleanup_containers, pull_image
 from src.providers.logger import logger
+from src.providers.metrics import metrics
 from src.providers.models import (
     RegistryAdapter,
     RegistryBot,
@@ -27,129 +41,496 @@ from src.providers.models import (
     StoreBot,
     StoreDriver,
     StorePlugin,
+    StoreTestBundle,
+    StoreTestCheckpoint,
     StoreTestResult,
+    share_tags,
 )
 from src.providers.utils import (
     add_step_summary,
+    canonicalize_name,
     dump_json,
+    get_pypi_changes,
     get_pypi_version,
-    load_json_from_web,
+    get_pypi_versions,
+    load_json_from_web_async,
+    prefetch_author_names,
 )
 
 from .constants import (
     ADAPTERS_PATH,
     BOTS_PATH,
+    CHECKPOINT_PATH,
     DRIVERS_PATH,
+    HISTORY_PATH,
+    METRICS_JSON_PATH,
+    METRICS_PROMETHEUS_PATH,
     PLUGIN_CONFIG_PATH,
     PLUGINS_PATH,
+    PYPI_SERIAL_PATH,
     RESULTS_PATH,
+    SHARD_BUNDLE_NAME,
     TEST_DIR,
 )
+from .history import ResultHistory, normalize_time
 from .validation import validate_plugin
 
 if TYPE_CHECKING:
+    from pathlib import Path
+
     from src.providers.models import RegistryArtifactData
 
 StoreModelT = TypeVar("StoreModelT")
 RegistryModelT = TypeVar("RegistryModelT")
 
 
+STORE_SOURCES: dict[str, tuple[str, float]] = {
+    "store_adapters": (STORE_ADAPTERS_URL, 30),
+    "store_bots": (STORE_BOTS_URL, 30),
+    "store_drivers": (STORE_DRIVERS_URL, 30),
+    "store_plugins": (STORE_PLUGINS_URL, 60),
+    "registry_results": (REGISTRY_RESULTS_URL, 120),
+    "registry_adapters": (REGISTRY_ADAPTERS_URL, 30),
+    "registry_bots": (REGISTRY_BOTS_URL, 30),
+    "registry_drivers": (REGISTRY_DRIVERS_URL, 30),
+    "registry_plugins": (REGISTRY_PLUGINS_URL, 60),
+    "plugin_configs": (REGISTRY_PLUGIN_CONFIG_URL, 30),
+}
+""" 商店测试需要的数据源及其超时时间（秒） """
+
+TIMING_PHASES: dict[str, str] = {
+    "container": "容器",
+    "create": "创建项目",
+    "export": "获取依赖",
+    "show": "获取信息",
+    "load": "加载插件",
+    "parse": "解析结果",
+}
+""" 测试各阶段在摘要中显示的名称，按执行顺序排列 """
+
+SYNC_CONCURRENCY = 16
+""" 同步商店数据时同时处理的数据数量 """
+
+PRIORITY_WEIGHTS: dict[str, float] = {
+    "new_plugin": 1000,
+    "new_version": 500,
+    "failed": 7,
+    "age": 1,
+}
+""" 插件测试优先级的权重
+
+new_plugin: 商店中新增、尚未测试过的插件
+new_version: PyPI 上有新版本的插件
+failed: 上次测试未通过的插件
+age: 距上次测试每过一天增加的优先级
+"""
+
+
+async def load_store_data() -> dict[str, Any]:
+    """并发获取所有商店与注册表数据
+
+    所有数据源共用一个连接池
+    """
+    async with httpx.AsyncClient(follow_redirects=True) as client:
+        values = await asyncio.gather(
+            *(
+                load_json_from_web_async(client, url, timeout=timeout)
+                for url, timeout in STORE_SOURCES.values()
+            )
+        )
+    return dict(zip(STORE_SOURCES, values, strict=True))
+
+
+def parse_test_env(test_env: str) -> dict[str, str]:
+    """解析测试环境
+
+    python==3.12.7 nonebot2==2.4.0 pydantic==2.10.0
+    """
+    env: dict[str, str] = {}
+    for item in test_env.split():
+        name, sep, version = item.partition("==")
+        if sep:
+            env[name] = version
+    return env
+
+
 class StoreTest:
     """商店测试"""
 
-    def __init__(self) -> None:
+    def __init__(self, data: dict[str, Any]) -> None:
+        """
+        Args:
+            data (dict[str, Any]): 通过 `load_store_data` 获取的商店与注册表数据
+        """
         # 商店数据
+        # 大部分插件使用相同的标签，通过 share_tags 共享标签实例以减少颜色解析与内存占用
         self._store_adapters: dict[str, StoreAdapter] = {
             PYPI_KEY_TEMPLATE.format(
                 project_link=adapter["project_link"],
                 module_name=adapter["module_name"],
-            ): StoreAdapter(**adapter)
-            for adapter in load_json_from_web(STORE_ADAPTERS_URL)
+            ): StoreAdapter(**share_tags(adapter))
+            for adapter in data["store_adapters"]
         }
         self._store_bots: dict[str, StoreBot] = {
             BOT_KEY_TEMPLATE.format(
                 name=bot["name"],
                 homepage=bot["homepage"],
-            ): StoreBot(**bot)
-            for bot in load_json_from_web(STORE_BOTS_URL)
+            ): StoreBot(**share_tags(bot))
+            for bot in data["store_bots"]
         }
         self._store_drivers: dict[str, StoreDriver] = {
             PYPI_KEY_TEMPLATE.format(
                 project_link=driver["project_link"],
                 module_name=driver["module_name"],
-            ): StoreDriver(**driver)
-            for driver in load_json_from_web(STORE_DRIVERS_URL)
+            ): StoreDriver(**share_tags(driver))
+            for driver in data["store_drivers"]
         }
         self._store_plugins: dict[str, StorePlugin] = {
             PYPI_KEY_TEMPLATE.format(
                 project_link=plugin["project_link"],
                 module_name=plugin["module_name"],
-            ): StorePlugin(**plugin)
-            for plugin in load_json_from_web(STORE_PLUGINS_URL)
+            ): StorePlugin(**share_tags(plugin))
+            for plugin in data["store_plugins"]
         }
         # 上次测试的结果
         self._previous_results: dict[str, StoreTestResult] = {
             key: StoreTestResult(**value)
-            for key, value in load_json_from_web(REGISTRY_RESULTS_URL).items()
+            for key, value in data["registry_results"].items()
         }
         self._previous_adapters: dict[str, RegistryAdapter] = {
             PYPI_KEY_TEMPLATE.format(
                 project_link=adapter["project_link"],
                 module_name=adapter["module_name"],
-            ): RegistryAdapter(**adapter)
-            for adapter in load_json_from_web(REGISTRY_ADAPTERS_URL)
+            ): RegistryAdapter(**share_tags(adapter))
+            for adapter in data["registry_adapters"]
         }
         self._previous_bots: dict[str, RegistryBot] = {
             BOT_KEY_TEMPLATE.format(
                 name=bot["name"],
                 homepage=bot["homepage"],
-            ): RegistryBot(**bot)
-            for bot in load_json_from_web(url=REGISTRY_BOTS_URL)
+            ): RegistryBot(**share_tags(bot))
+            for bot in data["registry_bots"]
         }
         self._previous_drivers: dict[str, RegistryDriver] = {
             PYPI_KEY_TEMPLATE.format(
                 project_link=driver["project_link"],
                 module_name=driver["module_name"],
-            ): RegistryDriver(**driver)
-            for driver in load_json_from_web(REGISTRY_DRIVERS_URL)
+            ): RegistryDriver(**share_tags(driver))
+            for driver in data["registry_drivers"]
         }
         self._previous_plugins: dict[str, RegistryPlugin] = {
             PYPI_KEY_TEMPLATE.format(
                 project_link=plugin["project_link"], module_name=plugin["module_name"]
-            ): RegistryPlugin(**plugin)
-            for plugin in load_json_from_web(REGISTRY_PLUGINS_URL)
+            ): RegistryPlugin(**share_tags(plugin))
+            for plugin in data["registry_plugins"]
         }
         # 插件配置文件
-        self._plugin_configs: dict[str, str] = load_json_from_web(
-            REGISTRY_PLUGIN_CONFIG_URL
-        )
+        self._plugin_configs: dict[str, str] = data["plugin_configs"]
+        # 预先获取的插件最新版本号
+        self._latest_versions: dict[str, str | None] = {}
+        # 需要比较版本号的插件，不包括只为判断依赖是否有新版本而获取版本号的插件
+        self._version_candidates: set[str] = set()
+        # 增量检测时的 PyPI 变更序号与自上次检查后有变化的插件
+        self._pypi_serial: int | None = None
+        self._changed_keys: set[str] | None = None
+        # 合并分片结果时，各分片中仍需检查的插件
+        self._pending_keys: list[str] | None = None
+        # 规范化后的项目名对应的插件，同一项目有多个插件时使用第一个
+        self._project_keys: dict[str, str] = {
+            canonicalize_name(plugin.project_link): key
+            for key, plugin in reversed(self._store_plugins.items())
+        }
+        # 依赖关系的反向索引，键为被依赖的插件，值为依赖它的插件
+        self._dependents: dict[str, set[str]] = self.build_dependents()
+        # 开始测试前拉取的测试镜像
+        self._image: DockerImage | None = None
+
+    @classmethod
+    async def create(cls) -> Self:
+        """获取商店与注册表数据并创建商店测试"""
+        return cls(await load_store_data())
+
+    def get_dependencies(
+        self, key: str, results: dict[str, StoreTestResult] | None = None
+    ) -> dict[str, str]:
+        """获取插件上次测试时依赖的商店插件
+
+        Args:
+            results (dict[str, StoreTestResult] | None): 最新的测试结果，默认为上次保存的测试结果
+
+        Returns:
+            dict[str, str]: 依赖插件的标识符与测试时安装的版本
+        """
+        if results is None:
+            results = self._previous_results
+        result = results.get(key)
+        if result is None or not result.deps:
+            return {}
+        return {
+            self._project_keys[name]: version
+            for name, version in result.deps.items()
+            if name in self._project_keys
+        }
+
+    def prepare_docker(self) -> None:
+        """清理之前中断的测试遗留的容器，并拉取测试镜像
+
+        拉取耗时不计入插件的测试耗时，记录在测试摘要中
+        无法连接 Docker 时不影响其他步骤，各插件的测试会分别记录失败
+        """
+        try:
+            cleanup_containers()
+            self._image = pull_image()
+        except DockerException as e:
+            logger.error(f"准备测试容器失败：{e}")
+
+    def build_dependents(self) -> dict[str, set[str]]:
+        """根据上次的测试结果构建依赖关系的反向索引"""
+        dependents: dict[str, set[str]] = {}
+        for key in self._previous_results:
+            for dep_key in self.get_dependencies(key):
+                dependents.setdefault(dep_key, set()).add(key)
+        return dependents
+
+    def get_outdated_dependencies(
+        self, key: str, results: dict[str, StoreTestResult] | None = None
+    ) -> list[str]:
+        """获取上次测试后发布了新版本的依赖插件
+
+        只使用预先获取的版本号，没有获取版本号的依赖视为没有变化
+        插件可能限制了依赖的版本，安装的版本不是最新版本，
+        所以最新版本在上次测试前已经测试过时，说明发布于上次测试前，不需要重新测试
+
+        Args:
+            results (dict[str, StoreTestResult] | None): 最新的测试结果，默认为上次保存的测试结果
+        """
+        if results is None:
+            results = self._previous_results
+        result = results[key]
+        outdated: list[str] = []
+        for dep_key, version in self.get_dependencies(key, results).items():
+            latest_version = self._latest_versions.get(dep_key)
+            if latest_version in (None, version):
+                continue
+            dep_result = results.get(dep_key)
+            if (
+                dep_result is not None
+                and dep_result.version == latest_version
+                and normalize_time(dep_result.time) <= normalize_time(result.time)
+            ):
+                continue
+            outdated.append(dep_key)
+        return outdated
+
+    def get_env_drift(self, key: str, target_env: dict[str, str]) -> dict[str, str]:
+        """获取上次通过测试的环境与目标环境不同的依赖
+
+        测试结果只记录最近一次的测试环境，所以只有上次测试通过时才有通过测试的环境
+        上次测试未通过的插件没有可比较的环境，不因为环境不同而重新测试
+
+        Returns:
+            dict[str, str]: 不同的依赖及其上次测试时的版本，没有记录的依赖版本为空字符串
+        """
+        result = self._previous_results.get(key)
+        if result is None or not result.test_env:
+            return dict.fromkeys(target_env, "")
+        if not all(result.results.values()):
+            return {}
+
+        last_env = parse_test_env(list(result.test_env)[-1])
+        return {
+            name: last_env.get(name, "")
+            for name, version in target_env.items()
+            if last_env.get(name) != version
+        }
 
-    def should_skip(self, key: str, force: bool = False) -> bool:
-        """是否跳过测试"""
+    def should_skip(
+        self,
+        key: str,
+        force: bool = False,
+        target_env: dict[str, str] | None = None,
+    ) -> bool:
+        """是否跳过测试
+
+        同时记录检查与跳过的插件数量
+        """
+        reason = self.skip_reason(key, force, target_env)
+        metrics.inc("plugins_considered_total", "检查是否需要测试的插件数量")
+        if reason:
+            metrics.inc("plugins_skipped_total", "跳过测试的插件数量", reason=reason)
+        return reason is not None
+
+    def skip_reason(
+        self,
+        key: str,
+        force: bool = False,
+        target_env: dict[str, str] | None = None,
+    ) -> str | None:
+        """跳过测试的原因，不跳过时返回 None
+
+        原因为 git（Git 插件）、unchanged（自上次检查后无变化）、
+        latest（已是最新版本）或 version_error（获取最新版本失败）
+
+        Args:
+            key (str): 插件标识符
+            force (bool): 是否强制测试
+            target_env (dict[str, str] | None): 目标测试环境，上次测试环境与之不同的插件需要重新测试
+        """
         if key.startswith("git+http"):
             logger.info(f"插件 {key} 为 Git 插件，无法测试，已跳过")
-            return True
+            return "git"
 
         # 如果强制测试，则不跳过
         if force:
-            return False
+            return None
 
         # 如果插件不在上次测试的结果中，则不跳过
         previous_result: StoreTestResult | None = self._previous_results.get(key)
         previous_plugin: RegistryPlugin | None = self._previous_plugins.get(key)
         if previous_result is None or previous_plugin is None:
-            return False
+            return None
+
+        # 如果测试环境与目标环境不同，则重新测试
+        if target_env and (drift := self.get_env_drift(key, target_env)):
+            logger.info(
+                f"插件 {key} 上次的测试环境与目标环境不同（"
+                + ", ".join(
+                    f"{name}=={version or '未知'}" for name, version in drift.items()
+                )
+                + "），重新测试"
+            )
+            return None
+
+        # 如果插件自上次检查后在 PyPI 上没有变化，则无需请求即可跳过
+        if self._changed_keys is not None and key not in self._changed_keys:
+            logger.info(f"插件 {key} 自上次检查后无变化，跳过测试")
+            return "unchanged"
 
         # 如果插件为最新版本，则跳过测试
-        try:
-            latest_version = get_pypi_version(previous_plugin.project_link)
-        except ValueError as e:
-            logger.warning(f"插件 {key} 获取最新版本失败：{e}，跳过测试")
-            return True
+        if key in self._latest_versions:
+            latest_version = self._latest_versions[key]
+        else:
+            try:
+                latest_version = get_pypi_version(previous_plugin.project_link)
+            except ValueError as e:
+                logger.warning(f"插件 {key} 获取最新版本失败：{e}，跳过测试")
+                return "version_error"
         if latest_version == previous_result.version:
+            # 依赖的插件发布了新版本时，需要重新测试
+            if outdated := self.get_outdated_dependencies(key):
+                logger.info(
+                    f"插件 {key} 依赖的插件 {', '.join(outdated)} 有新版本，重新测试"
+                )
+                return None
             logger.info(f"插件 {key} 为最新版本（{latest_version}），跳过测试")
-            return True
-        return False
+            return "latest"
+        return None
+
+    async def prefetch_versions(self, keys: list[str]) -> None:
+        """并发获取插件的最新版本号，供是否跳过测试时使用
+
+        只需要获取有上次测试结果的插件，其余插件无论版本如何都会测试
+        同时获取这些插件所依赖插件的版本号，以判断依赖是否有新版本
+        """
+        candidates = keys
+        keys = list(
+            dict.fromkeys(
+                [*keys, *(dep for key in keys for dep in self.get_dependencies(key))]
+            )
+        )
+        project_links = {
+            key: self._previous_plugins[key].project_link
+            for key in keys
+            if not key.startswith("git+http")
+            and key in self._previous_results
+            and key in self._previous_plugins
+            and (self._changed_keys is None or key in self._changed_keys)
+        }
+        versions = await get_pypi_versions(project_links.values())
+        self._latest_versions.update(
+            {key: versions[project_link] for key, project_link in project_links.items()}
+        )
+        self._version_candidates.update(
+            key for key in candidates if key in project_links
+        )
+
+    async def load_pypi_changes(self) -> None:
+        """根据上次记录的 PyPI 变更序号，找出之后有变化的插件
+
+        没有记录时只获取当前序号，本次仍检查所有插件的版本
+        无法获取变更记录时不记录序号，同样检查所有插件的版本
+        上次未能测试的插件也视为有变化
+        """
+        try:
+            async with httpx.AsyncClient(follow_redirects=True) as client:
+                state = await load_json_from_web_async(client, REGISTRY_PYPI_SERIAL_URL)
+        except ValueError as e:
+            logger.info(f"未找到上次的 PyPI 变更序号，将检查所有插件：{e}")
+            state = {"serial": None, "pending": []}
+
+        try:
+            changed, serial = await get_pypi_changes(state["serial"])
+        except (ValueError, httpx.HTTPError) as e:
+            # 无法获取变更记录时不影响测试，本次检查所有插件
+            logger.warning(f"获取 PyPI 变更记录失败，将检查所有插件：{e}")
+            return
+        self._pypi_serial = serial
+        if changed is None:
+            return
+
+        self._changed_keys = {
+            key
+            for key, plugin in self._store_plugins.items()
+            if canonicalize_name(plugin.project_link) in changed
+        }
+        self._changed_keys.update(state["pending"])
+        # 依赖有变化的插件也可能需要重新测试
+        self._changed_keys.update(
+            dependent
+            for key in list(self._changed_keys)
+            for dependent in self._dependents.get(key, ())
+        )
+        logger.info(
+            f"自 PyPI 变更序号 {state['serial']} 后共有 {len(self._changed_keys)} 个插件有变化"
+        )
+
+    def get_pending_keys(
+        self, results: dict[str, StoreTestResult] | None = None
+    ) -> list[str]:
+        """获取仍需检查的插件
+
+        有变化但尚未确认为最新版本的插件，下次增量检测时需要继续检查
+
+        Args:
+            results (dict[str, StoreTestResult] | None): 最新的测试结果，默认为上次保存的测试结果
+        """
+        if results is None:
+            results = self._previous_results
+        pending: list[str] = []
+        for key, result in results.items():
+            if key.startswith("git+http"):
+                continue
+            if self._changed_keys is not None and key not in self._changed_keys:
+                continue
+            if self._latest_versions.get(
+                key, ...
+            ) == result.version and not self.get_outdated_dependencies(key, results):
+                continue
+            pending.append(key)
+        return pending
+
+    @property
+    def stale_count(self) -> int:
+        """预先获取版本号的插件中，有新版本的插件数量
+
+        获取版本号失败的插件不计入
+        """
+        return sum(
+            1
+            for key in self._version_candidates
+            if (version := self._latest_versions.get(key)) is not None
+            and version != self._previous_results[key].version
+        )
 
     def get_plugins_sorted_by_test_time(self) -> list[str]:
         """获取按测试时间倒序排列的插件列表"""
@@ -176,6 +557,44 @@ class StoreTest:
 
         return sorted_plugins
 
+    def priority_score(self, key: str) -> float:
+        """计算插件的测试优先级，分数越高越先测试
+
+        需要先通过 `prefetch_versions` 获取最新版本号才能判断是否有新版本
+        """
+        result = self._previous_results.get(key)
+        if result is None:
+            return PRIORITY_WEIGHTS["new_plugin"]
+
+        score = 0.0
+        latest_version = self._latest_versions.get(key)
+        if latest_version is not None and latest_version != result.version:
+            score += PRIORITY_WEIGHTS["new_version"]
+        if not all(result.results.values()):
+            score += PRIORITY_WEIGHTS["failed"]
+        age = datetime.now(TIME_ZONE) - datetime.fromisoformat(result.time)
+        score += PRIORITY_WEIGHTS["age"] * max(age.total_seconds(), 0) / 86400
+        return score
+
+    def iter_plugins_by_priority(
+        self, scorer: Callable[[str], float] | None = None
+    ) -> Iterator[str]:
+        """按优先级从高到低依次取出插件
+
+        使用堆保存待测试的插件，只在需要时取出下一个，优先级相同时保持商店顺序
+
+        Args:
+            scorer (Callable[[str], float] | None): 计算插件优先级的函数，默认为 `priority_score`
+        """
+        scorer = scorer or self.priority_score
+        queue = [
+            (-scorer(key), index, key)
+            for index, key in enumerate(self._store_plugins.keys())
+        ]
+        heapq.heapify(queue)
+        while queue:
+            yield heapq.heappop(queue)[2]
+
     def read_plugin_config(self, key: str) -> str:
         """获取插件配置
 
@@ -203,53 +622,361 @@ class StoreTest:
             store_plugin=plugin,
             config=config,
             previous_plugin=self._previous_plugins.get(key),
+            timeout=self.get_container_timeout(key),
         )
         return new_result, new_plugin
 
+    def get_container_timeout(self, key: str) -> float:
+        """根据上次测试容器的运行耗时设置等待时间
+
+        等待时间为历史耗时的若干倍，并限制在最短时间与 DOCKER_TIMEOUT 之间，
+        没有历史耗时或上次异常结束的插件使用 DOCKER_TIMEOUT，
+        异常结束时的耗时不能代表正常测试所需的时间
+        """
+        result = self._previous_results.get(key)
+        if result is None or result.outcome is not None:
+            return DOCKER_TIMEOUT
+        duration = (result.timings or {}).get("container", result.duration)
+        if duration is None:
+            return DOCKER_TIMEOUT
+        return min(
+            DOCKER_TIMEOUT, max(DOCKER_MIN_TIMEOUT, duration * DOCKER_TIMEOUT_FACTOR)
+        )
+
+    def save_checkpoint(
+        self, key: str, result: StoreTestResult, plugin: RegistryPlugin
+    ) -> None:
+        """将插件测试结果追加到进度文件中"""
+        CHECKPOINT_PATH.parent.mkdir(parents=True, exist_ok=True)
+        checkpoint = StoreTestCheckpoint(key=key, result=result, plugin=plugin)
+        with CHECKPOINT_PATH.open("a", encoding="utf-8") as f:
+            f.write(checkpoint.model_dump_json() + "\n")
+
+    def load_checkpoint(
+        self,
+    ) -> tuple[dict[str, StoreTestResult], dict[str, RegistryPlugin]]:
+        """读取之前中断的测试进度
+
+        测试中断时最后一行可能没有写完整，无法解析的行会被忽略
+        不比已保存的测试结果新的记录已经过时，同样会被忽略
+        """
+        results: dict[str, StoreTestResult] = {}
+        plugins: dict[str, RegistryPlugin] = {}
+        if not CHECKPOINT_PATH.exists():
+            return results, plugins
+
+        with CHECKPOINT_PATH.open(encoding="utf-8") as f:
+            for line in f:
+                try:
+                    checkpoint = StoreTestCheckpoint.model_validate_json(line)
+                except ValueError:
+                    logger.warning(f"测试进度中有无法解析的记录，已忽略：{line!r}")
+                    continue
+                # 商店中已删除的插件无需恢复
+                if checkpoint.key not in self._store_plugins:
+                    continue
+                previous = self._previous_results.get(checkpoint.key)
+                if previous is not None and normalize_time(
+                    checkpoint.result.time
+                ) <= normalize_time(previous.time):
+                    continue
+                results[checkpoint.key] = checkpoint.result
+                plugins[checkpoint.key] = checkpoint.plugin
+        logger.info(f"已从测试进度中恢复 {len(results)} 个插件的测试结果")
+        return results, plugins
+
+    def clear_checkpoint(self) -> None:
+        """测试结果保存后删除进度文件"""
+        CHECKPOINT_PATH.unlink(missing_ok=True)
+
+    def estimate_duration(self, key: str, default: float) -> float:
+        """根据上次测试的耗时估计插件测试耗时
+
+        优先使用容器运行耗时，总耗时包含拉取镜像与等待宿主机资源的时间，
+        同时测试多个插件时会偏大
+
+        Args:
+            key (str): 插件标识符
+            default (float): 没有历史耗时时使用的估计值（秒）
+        """
+        result = self._previous_results.get(key)
+        if result is None:
+            return default
+        duration = (result.timings or {}).get("container", result.duration)
+        return default if duration is None else duration
+
+    def plan_time_budget(
+        self, keys: list[str], time_budget: float, jobs: int, default_duration: float
+    ) -> list[str]:
+        """在时间预算内挑选需要测试的插件并安排测试顺序
+
+        按原有顺序挑选还能放入剩余预算的插件，再按预计耗时从长到短排列，
+        让同时进行的测试尽量在预算内一起完成
+
+        Args:
+            keys (list[str]): 需要测试的插件标识符
+            time_budget (float): 时间预算（秒）
+            jobs (int): 同时测试的插件数量
+            default_duration (float): 没有历史耗时时使用的估计值（秒）
+        """
+        capacity = time_budget * jobs
+        used = 0.0
+        durations: dict[str, float] = {}
+        for key in keys:
+            duration = self.estimate_duration(key, default_duration)
+            if duration > time_budget or used + duration > capacity:
+                continue
+            durations[key] = duration
+            used += duration
+        logger.info(
+            f"时间预算 {time_budget} 秒内计划测试 {len(durations)} 个插件，"
+            f"预计共耗时 {used:.0f} 秒"
+        )
+        return sorted(durations, key=lambda key: durations[key], reverse=True)
+
+    def assign_shards(self, count: int, default_duration: float) -> dict[str, int]:
+        """将商店插件确定性地分配到各个分片
+
+        按预计耗时从长到短依次分配给当前总耗时最少的分片，
+        耗时相同的插件按标识符的哈希值排序，保证每个分片得到相同的结果
+
+        Args:
+            count (int): 分片总数
+            default_duration (float): 没有历史耗时时使用的估计值（秒）
+
+        Returns:
+            dict[str, int]: 插件标识符对应的分片序号（从 1 开始）
+        """
+        keys = sorted(
+            self._store_plugins,
+            key=lambda key: (
+                -self.estimate_duration(key, default_duration),
+                hashlib.sha256(key.encode()).hexdigest(),
+            ),
+        )
+        loads = [(0.0, index) for index in range(1, count + 1)]
+        shards: dict[str, int] = {}
+        for key in keys:
+            load, index = heapq.heappop(loads)
+            shards[key] = index
+            heapq.heappush(
+                loads, (load + self.estimate_duration(key, default_duration), index)
+            )
+        return shards
+
+    def get_shard_keys(
+        self, shard: tuple[int, int], default_duration: float
+    ) -> set[str]:
+        """获取分配到指定分片的插件
+
+        Args:
+            shard (tuple[int, int]): 分片序号（从 1 开始）与分片总数
+            default_duration (float): 没有历史耗时时使用的估计值（秒）
+        """
+        index, count = shard
+        return {
+            key
+            for key, value in self.assign_shards(count, default_duration).items()
+            if value == index
+        }
+
+    async def _test_in_pool(
+        self,
+        candidates: Iterator[str],
+        limit: int,
+        jobs: int,
+        deadline: float | None = None,
+        default_duration: float = 0,
+    ) -> tuple[dict[str, StoreTestResult], dict[str, RegistryPlugin]]:
+        """同时测试多个插件
+
+        Args:
+            candidates (Iterator[str]): 按顺序需要测试的插件
+            limit (int): 至多有效测试插件数量
+            jobs (int): 同时测试的插件数量
+            deadline (float | None): 截止时间（`time.monotonic`），预计无法在此之前
+                完成的插件不再开始测试
+            default_duration (float): 没有历史耗时时使用的估计值（秒）
+        """
+        new_results: dict[str, StoreTestResult] = {}
+        new_plugins: dict[str, RegistryPlugin] = {}
+        running: dict[asyncio.Task[tuple[StoreTestResult, RegistryPlugin]], str] = {}
+        order: dict[str, int] = {}
+        tested = 0
+
+        def schedule():
+            """在并行数量与测试上限内启动新的测试"""
+            while len(running) < jobs and tested + len(running) < limit:
+                key = next(candidates, None)
+                if key is None:
+                    return
+                if deadline is not None and (
+                    time.monotonic() + self.estimate_duration(key, default_duration)
+                    > deadline
+                ):
+                    logger.info(f"剩余时间不足以测试插件 {key}，已跳过")
+                    continue
+                logger.info(
+                    f"{tested + len(running) + 1}/{limit} 正在测试插件 {key} ..."
+                )
+                order[key] = len(order)
+                running[asyncio.create_task(self.test_plugin(key))] = key
+
+        schedule()
+        while running:
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                key = running.pop(task)
+                try:
+                    new_result, new_plugin = task.result()
+                except Exception as err:
+                    # 测试出错的插件不计入测试数量，由后续插件补上
+                    logger.error(f"{err}")
+                    metrics.inc("plugins_errored_total", "测试出错的插件数量")
+                    continue
+                self.record_result_metrics(new_result)
+                new_results[key] = new_result
+                new_plugins[key] = new_plugin
+                self.save_checkpoint(key, new_result, new_plugin)
+                tested += 1
+            schedule()
+
+        if tested >= limit:
+            logger.info(f"已达到测试上限 {limit}，测试停止")
+
+        # 并行测试完成的顺序不固定，按开始测试的顺序整理结果
+        new_results = dict(sorted(new_results.items(), key=lambda x: order[x[0]]))
+        new_plugins = dict(sorted(new_plugins.items(), key=lambda x: order[x[0]]))
+        return new_results, new_plugins
+
+    @staticmethod
+    def record_result_metrics(result: StoreTestResult) -> None:
+        """记录插件测试结果相关的指标"""
+        metrics.inc(
+            "plugins_tested_total",
+            "完成测试的插件数量",
+            result=result.outcome
+            or ("passed" if all(result.results.values()) else "failed"),
+        )
+        if result.timings and "container" in result.timings:
+            metrics.observe(
+                "container_duration_seconds",
+                "测试容器运行耗时（秒）",
+                result.timings["container"],
+            )
+
     async def test_plugins(
-        self, limit: int, offset: int, force: bool, recent: bool = False
+        self,
+        limit: int,
+        offset: int,
+        force: bool,
+        recent: bool = False,
+        jobs: int = 1,
+        incremental: bool = False,
+        time_budget: float | None = None,
+        default_duration: float = 300,
+        priority: bool = False,
+        shard: tuple[int, int] | None = None,
+        resume: bool = False,
+        target_env: dict[str, str] | None = None,
     ):
         """批量测试插件
 
         Args:
-            limit (int): 至多有效测试插件数量
+            limit (int): 至多有效测试插件数量，设置时间预算时不生效
             offset (int): 测试插件偏移量
             force (bool): 是否强制测试
             recent (bool): 是否按测试时间倒序排列，优先测试最近测试的插件，默认为 False
+            jobs (int): 同时测试的插件数量，默认为 1
+            incremental (bool): 是否只检查 PyPI 上有变化的插件，默认为 False
+            time_budget (float | None): 时间预算（秒），设置后根据历史耗时挑选插件
+            default_duration (float): 没有历史耗时时估计的测试耗时（秒），默认为 300
+            priority (bool): 是否按优先级测试，优先测试新插件与有新版本的插件，默认为 False
+            shard (tuple[int, int] | None): 分片序号（从 1 开始）与分片总数，
+                设置后只测试分配到该分片的插件
+            resume (bool): 是否继续上次中断的测试，跳过进度中已测试的插件，默认为 False
+            target_env (dict[str, str] | None): 目标测试环境，如 {"nonebot2": "2.4.1"}，
+                上次测试环境与之不同的插件将重新测试
         """
-        new_results: dict[str, StoreTestResult] = {}
-        new_plugins: dict[str, RegistryPlugin] = {}
-        i = 1
+        # 强制测试时无需比较版本号
+        should_check = not force and (limit > 0 or time_budget is not None)
+
+        if resume:
+            resumed_results, resumed_plugins = self.load_checkpoint()
+        else:
+            resumed_results, resumed_plugins = {}, {}
+            self.clear_checkpoint()
 
-        # 根据 recent 参数决定插件测试顺序
-        if recent:
-            test_plugins = self.get_plugins_sorted_by_test_time()[offset:]
+        if shard is None:
+            shard_keys = set(self._store_plugins)
         else:
-            test_plugins = list(self._store_plugins.keys())[offset:]
+            shard_keys = self.get_shard_keys(shard, default_duration)
+            logger.info(f"分片 {shard[0]}/{shard[1]} 共分配到 {len(shard_keys)} 个插件")
 
-        for key in test_plugins:
-            if i > limit:
-                logger.info(f"已达到测试上限 {limit}，测试停止")
-                break
+        test_plugins: Iterable[str]
+        if priority:
+            # 按优先级排序需要知道所有插件是否有新版本
+            if incremental:
+                await self.load_pypi_changes()
+            await self.prefetch_versions(
+                [key for key in self._store_plugins if key in shard_keys]
+            )
+            test_plugins = islice(
+                (key for key in self.iter_plugins_by_priority() if key in shard_keys),
+                offset,
+                None,
+            )
+        else:
+            # 根据 recent 参数决定插件测试顺序
+            if recent:
+                test_plugins = self.get_plugins_sorted_by_test_time()
+            else:
+                test_plugins = list(self._store_plugins.keys())
+            test_plugins = [key for key in test_plugins if key in shard_keys][offset:]
 
-            # 是否需要跳过测试
-            if self.should_skip(key, force):
-                continue
+            if should_check:
+                if incremental:
+                    await self.load_pypi_changes()
+                await self.prefetch_versions(test_plugins)
 
-            async def worker():
-                new_result, new_plugin = await self.test_plugin(key)
-                new_results[key] = new_result
-                new_plugins[key] = new_plugin
+        # 验证插件时需要作者名字，提前批量获取
+        await prefetch_author_names(
+            plugin.author_id
+            for key, plugin in self._store_plugins.items()
+            if key in shard_keys
+        )
 
-            try:
-                logger.info(f"{i}/{limit} 正在测试插件 {key} ...")
-                await worker()  # TODO: 修改为并行
-                i += 1
-            except Exception as err:
-                logger.error(f"{err}")
-                continue
+        def should_test(key: str) -> bool:
+            return key not in resumed_results and not self.should_skip(
+                key, force, target_env
+            )
 
-        summary = self.generate_github_summary(new_results)
+        if time_budget is None:
+            # 按顺序惰性判断是否跳过，保证与串行测试选出的插件一致
+            # 恢复的测试结果计入测试数量
+            candidates = (key for key in test_plugins if should_test(key))
+            new_results, new_plugins = await self._test_in_pool(
+                candidates, max(limit - len(resumed_results), 0), jobs
+            )
+        else:
+            planned = self.plan_time_budget(
+                [key for key in test_plugins if should_test(key)],
+                time_budget,
+                jobs,
+                default_duration,
+            )
+            new_results, new_plugins = await self._test_in_pool(
+                iter(planned),
+                len(planned),
+                jobs,
+                deadline=time.monotonic() + time_budget,
+                default_duration=default_duration,
+            )
+        new_results = resumed_results | new_results
+        new_plugins = resumed_plugins | new_plugins
+
+        stale = self.stale_count if should_check else None
+        summary = self.generate_github_summary(new_results, stale)
         add_step_summary(summary)
         return new_results, new_plugins
 
@@ -281,34 +1008,201 @@ class StoreTest:
         self._previous_results = results
         self._previous_plugins = plugins
 
-    def dump_data(self):
-        """储存数据到仓库中"""
+    def dump_data(self) -> list[str]:
+        """储存数据到仓库中
+
+        只写入内容有变化的文件
+
+        Returns:
+            list[str]: 内容有变化的文件名
+        """
+        if not TEST_DIR.exists():
+            TEST_DIR.mkdir()
+
+        # 测试结果先追加到历史记录中，再由历史记录生成
+        with ResultHistory(HISTORY_PATH) as history:
+            history.extend(self._previous_results)
+            results = history.latest(self._previous_results)
+
+        files: list[tuple[Path, Any, bool]] = [
+            (ADAPTERS_PATH, list(self._previous_adapters.values()), True),
+            (BOTS_PATH, list(self._previous_bots.values()), True),
+            (DRIVERS_PATH, list(self._previous_drivers.values()), True),
+            (PLUGINS_PATH, list(self._previous_plugins.values()), True),
+            (RESULTS_PATH, results, True),
+            # 插件配置不需要压缩
+            (PLUGIN_CONFIG_PATH, self._plugin_configs, False),
+        ]
+        # 增量检测时记录 PyPI 变更序号，供下次使用
+        if self._pypi_serial is not None:
+            pending = (
+                self.get_pending_keys()
+                if self._pending_keys is None
+                else self._pending_keys
+            )
+            files.append(
+                (
+                    PYPI_SERIAL_PATH,
+                    {"serial": self._pypi_serial, "pending": pending},
+                    True,
+                )
+            )
+
+        changed = []
+        for path, data, minify in files:
+            is_changed = dump_json(path, data, minify)
+            if is_changed:
+                changed.append(path.name)
+            metrics.set(
+                "registry_file_bytes",
+                "商店数据文件大小（字节）",
+                path.stat().st_size,
+                file=path.name,
+            )
+            metrics.set(
+                "registry_file_changed",
+                "商店数据文件内容是否有变化",
+                int(is_changed),
+                file=path.name,
+            )
+        if changed:
+            logger.info(f"以下文件内容有变化：{', '.join(changed)}")
+        else:
+            logger.info("所有文件内容均无变化")
+        return changed
+
+    def dump_bundle(
+        self,
+        new_results: dict[str, StoreTestResult],
+        new_plugins: dict[str, RegistryPlugin],
+        shard: tuple[int, int],
+        default_duration: float = 300,
+    ) -> "Path":
+        """储存分片测试结果
+
+        只包含该分片测试过的插件
+
+        Args:
+            new_results (dict[str, StoreTestResult]): 新的插件测试结果
+            new_plugins (dict[str, RegistryPlugin]): 新的插件数据
+            shard (tuple[int, int]): 分片序号（从 1 开始）与分片总数
+            default_duration (float): 分配分片时使用的估计耗时（秒），需与测试时一致
+
+        Returns:
+            Path: 分片测试结果的保存路径
+        """
+        index, count = shard
+        shard_keys = self.get_shard_keys(shard, default_duration)
+        pending = []
+        if self._pypi_serial is not None:
+            # 分片测试时不会合并数据，需要使用本次的测试结果判断
+            pending = [
+                key
+                for key in self.get_pending_keys(self._previous_results | new_results)
+                if key in shard_keys
+            ]
+
+        bundle = StoreTestBundle(
+            shard=shard,
+            results=new_results,
+            plugins=new_plugins,
+            # 测试时会为没有配置的插件设置默认配置
+            configs={
+                key: value
+                for key, value in self._plugin_configs.items()
+                if key in shard_keys
+            },
+            pypi_serial=self._pypi_serial,
+            pending=pending,
+        )
         if not TEST_DIR.exists():
             TEST_DIR.mkdir()
+        path = TEST_DIR / SHARD_BUNDLE_NAME.format(index=index, count=count)
+        dump_json(path, bundle)
+        logger.info(f"分片 {index}/{count} 的测试结果已保存到 {path}")
+        return path
 
-        dump_json(ADAPTERS_PATH, list(self._previous_adapters.values()))
-        dump_json(BOTS_PATH, list(self._previous_bots.values()))
-        dump_json(DRIVERS_PATH, list(self._previous_drivers.values()))
-        dump_json(PLUGINS_PATH, list(self._previous_plugins.values()))
-        dump_json(RESULTS_PATH, self._previous_results)
-        # 插件配置不需要压缩
-        dump_json(PLUGIN_CONFIG_PATH, self._plugin_configs, False)
+    async def merge_bundles(self, bundles: list[StoreTestBundle]):
+        """合并分片测试结果并储存到仓库中
+
+        只有所有分片都记录了 PyPI 变更序号时才会更新序号，取其中最小的一个
+        """
+        new_results: dict[str, StoreTestResult] = {}
+        new_plugins: dict[str, RegistryPlugin] = {}
+        for bundle in bundles:
+            new_results.update(bundle.results)
+            new_plugins.update(bundle.plugins)
+            for key, config in bundle.configs.items():
+                self._plugin_configs.setdefault(key, config)
+        logger.info(
+            f"共合并 {len(bundles)} 个分片，{len(new_results)} 个插件的测试结果"
+        )
+
+        serials = [bundle.pypi_serial for bundle in bundles]
+        if bundles and None not in serials:
+            self._pypi_serial = min(serial for serial in serials if serial is not None)
+            self._pending_keys = [key for bundle in bundles for key in bundle.pending]
+
+        self.merge_plugin_data(new_results, new_plugins)
+        await self.sync_store()
+        self.dump_data()
 
     async def run(
-        self, limit: int, offset: int = 0, force: bool = False, recent: bool = False
+        self,
+        limit: int,
+        offset: int = 0,
+        force: bool = False,
+        recent: bool = False,
+        jobs: int = 1,
+        incremental: bool = False,
+        time_budget: float | None = None,
+        default_duration: float = 300,
+        priority: bool = False,
+        shard: tuple[int, int] | None = None,
+        resume: bool = False,
+        target_env: dict[str, str] | None = None,
     ):
         """运行商店测试
 
         Args:
-            limit (int): 至多有效测试插件数量
+            limit (int): 至多有效测试插件数量，设置时间预算时不生效
             offset (int): 测试插件偏移量
             force (bool): 是否强制测试，默认为 False
             recent (bool): 是否按测试时间倒序排列，优先测试最近测试的插件，默认为 False
+            jobs (int): 同时测试的插件数量，默认为 1
+            incremental (bool): 是否只检查 PyPI 上有变化的插件，默认为 False
+            time_budget (float | None): 时间预算（秒），设置后根据历史耗时挑选插件
+            default_duration (float): 没有历史耗时时估计的测试耗时（秒），默认为 300
+            priority (bool): 是否按优先级测试，优先测试新插件与有新版本的插件，默认为 False
+            shard (tuple[int, int] | None): 分片序号（从 1 开始）与分片总数，
+                设置后只保存该分片的测试结果，之后通过 `merge_bundles` 合并
+            resume (bool): 是否继续上次中断的测试，跳过进度中已测试的插件，默认为 False
+            target_env (dict[str, str] | None): 目标测试环境，如 {"nonebot2": "2.4.1"}，
+                上次测试环境与之不同的插件将重新测试
         """
-        new_results, new_plugins = await self.test_plugins(limit, offset, force, recent)
-        self.merge_plugin_data(new_results, new_plugins)
-        await self.sync_store()
-        self.dump_data()
+        new_results, new_plugins = await self.test_plugins(
+            limit,
+            offset,
+            force,
+            recent,
+            jobs,
+            incremental,
+            time_budget,
+            default_duration,
+            priority,
+            shard,
+            resume,
+            target_env,
+        )
+        if shard is not None:
+            self.dump_bundle(new_results, new_plugins, shard, default_duration)
+        else:
+            self.merge_plugin_data(new_results, new_plugins)
+            await self.sync_store()
+            self.dump_data()
+        # 测试结果已经保存，不再需要进度
+        self.clear_checkpoint()
+        metrics.dump(METRICS_JSON_PATH, METRICS_PROMETHEUS_PATH)
 
     async def run_single_plugin(self, key: str, force: bool = False):
         """
@@ -358,29 +1252,45 @@ class StoreTest:
         self.dump_data()
 
     @staticmethod
-    def _sync_registry_data(
+    async def _sync_registry_data(
         previous_data: dict[str, RegistryModelT],
         store_data: dict[str, StoreModelT],
         data_type: str,
         update_registry: Callable[[RegistryModelT, StoreModelT], RegistryModelT],
         create_registry: Callable[[StoreModelT], RegistryModelT],
+        semaphore: asyncio.Semaphore,
     ) -> dict[str, RegistryModelT]:
-        """以 nonebot2 仓库商店数据为准同步 registry 数据。"""
+        """以 nonebot2 仓库商店数据为准同步 registry 数据。
+
+        更新与创建数据需要请求网络，在线程中并发执行，同时执行的数量由 semaphore 限制
+        """
+
+        async def sync_item(key: str, store_item: StoreModelT) -> RegistryModelT:
+            async with semaphore:
+                if key in previous_data:
+                    return await asyncio.to_thread(
+                        update_registry, previous_data[key], store_item
+                    )
+                return await asyncio.to_thread(create_registry, store_item)
+
+        outcomes = await asyncio.gather(
+            *(sync_item(key, store_item) for key, store_item in store_data.items()),
+            return_exceptions=True,
+        )
+
         synced_data: dict[str, RegistryModelT] = {}
         # 只遍历当前 store 中存在的 key，未写入 synced_data 的旧 key 会被清理。
-        for key, store_item in store_data.items():
-            try:
-                if key in previous_data:
-                    synced_item = update_registry(previous_data[key], store_item)
-                else:
-                    synced_item = create_registry(store_item)
-            except Exception as e:
-                logger.error(f"{data_type} {key} 同步商店数据失败：{e}")
+        # 按商店顺序处理结果，保证数据顺序与日志顺序和逐个同步时一致。
+        for key, outcome in zip(store_data, outcomes, strict=True):
+            if isinstance(outcome, Exception):
+                logger.error(f"{data_type} {key} 同步商店数据失败：{outcome}")
                 if key in previous_data:
                     synced_data[key] = previous_data[key]
                 continue
+            if isinstance(outcome, BaseException):
+                raise outcome
 
-            synced_data[key] = synced_item
+            synced_data[key] = outcome
 
         return synced_data
 
@@ -393,34 +1303,59 @@ class StoreTest:
         """同步商店数据
 
         以商店数据为准，更新商店数据到仓库中，如果仓库中不存在则获取用户名后存储
+        四类数据同时同步，共用同一个并发上限
         """
-        self._previous_adapters = self._sync_registry_data(
-            self._previous_adapters,
-            self._store_adapters,
-            "适配器",
-            RegistryAdapter.update,
-            StoreAdapter.to_registry,
+        # 新增的数据与所有插件都需要作者名字，提前批量获取
+        await prefetch_author_names(
+            item.author_id
+            for store_data in (
+                self._store_adapters,
+                self._store_bots,
+                self._store_drivers,
+                self._store_plugins,
+            )
+            for item in store_data.values()
         )
-        self._previous_bots = self._sync_registry_data(
+
+        semaphore = asyncio.Semaphore(SYNC_CONCURRENCY)
+        (
+            self._previous_adapters,
             self._previous_bots,
-            self._store_bots,
-            "机器人",
-            RegistryBot.update,
-            StoreBot.to_registry,
-        )
-        self._previous_drivers = self._sync_registry_data(
             self._previous_drivers,
-            self._store_drivers,
-            "驱动器",
-            RegistryDriver.update,
-            StoreDriver.to_registry,
-        )
-        self._previous_plugins = self._sync_registry_data(
             self._previous_plugins,
-            self._store_plugins,
-            "插件",
-            RegistryPlugin.update,
-            self._create_plugin_registry,
+        ) = await asyncio.gather(
+            self._sync_registry_data(
+                self._previous_adapters,
+                self._store_adapters,
+                "适配器",
+                RegistryAdapter.update,
+                StoreAdapter.to_registry,
+                semaphore,
+            ),
+            self._sync_registry_data(
+                self._previous_bots,
+                self._store_bots,
+                "机器人",
+                RegistryBot.update,
+                StoreBot.to_registry,
+                semaphore,
+            ),
+            self._sync_registry_data(
+                self._previous_drivers,
+                self._store_drivers,
+                "驱动器",
+                RegistryDriver.update,
+                StoreDriver.to_registry,
+                semaphore,
+            ),
+            self._sync_registry_data(
+                self._previous_plugins,
+                self._store_plugins,
+                "插件",
+                RegistryPlugin.update,
+                self._create_plugin_registry,
+                semaphore,
+            ),
         )
 
         store_plugin_keys = set(self._store_plugins)
@@ -438,8 +1373,15 @@ class StoreTest:
             if key in store_plugin_keys
         }
 
-    def generate_github_summary(self, results: dict[str, StoreTestResult]):
-        """生成 GitHub 摘要"""
+    def generate_github_summary(
+        self, results: dict[str, StoreTestResult], stale: int | None = None
+    ):
+        """生成 GitHub 摘要
+
+        Args:
+            results (dict[str, StoreTestResult]): 本次测试结果
+            stale (int | None): 有新版本的插件数量，为 None 时不显示
+        """
         valid_plugins = [
             plugin_name
             for plugin_name, result in results.items()
@@ -450,10 +1392,17 @@ class StoreTest:
             for plugin_name, _ in results.items()
             if plugin_name not in valid_plugins
         ]
+        stale_line = "" if stale is None else f"> 🆕 有新版本：{stale} 个\n"
+        image_line = (
+            ""
+            if self._image is None
+            else f"> 🐳 测试镜像：{self._image.digest or self._image.name}"
+            f"（拉取耗时 {self._image.pull_duration} 秒）\n"
+        )
         summary = f"""# 📃 商店测试结果
 
 > 📅 {datetime.now(TIME_ZONE).strftime("%Y-%m-%d %H:%M:%S %Z")}
-> ♻️ 共测试 {len(results)} 个插件
+{image_line}{stale_line}> ♻️ 共测试 {len(results)} 个插件
 > ✅ 更新成功：{len(valid_plugins)} 个
 > ❌ 更新失败：{len(invalid_plugins)} 个
 
@@ -465,4 +1414,46 @@ class StoreTest:
 
 {"\n".join([f"- {name}" for name in invalid_plugins])}
 """
+        timing_table = self.generate_timing_table(results)
+        if timing_table:
+            summary += f"\n## 测试耗时\n\n{timing_table}\n"
         return summary
+
+    @staticmethod
+    def generate_timing_table(results: dict[str, StoreTestResult]) -> str:
+        """生成各插件各阶段耗时的表格，耗时最长的插件排在最前
+
+        没有记录耗时的插件不会出现在表格中
+        """
+        timed = {name: result for name, result in results.items() if result.timings}
+        if not timed:
+            return ""
+
+        def total(result: StoreTestResult) -> float:
+            if result.duration is not None:
+                return result.duration
+            # 容器运行耗时已经包含了容器内各阶段的耗时
+            timings = result.timings or {}
+            return timings.get("container", sum(timings.values()))
+
+        phases = [
+            phase
+            for phase in TIMING_PHASES
+            if any(phase in (result.timings or {}) for result in timed.values())
+        ]
+        lines = [
+            "| 插件 | 总耗时 | " + " | ".join(TIMING_PHASES[p] for p in phases) + " |",
+            "| --- | ---: |" + " ---: |" * len(phases),
+        ]
+        for name, result in sorted(
+            timed.items(), key=lambda x: total(x[1]), reverse=True
+        ):
+            timings = result.timings or {}
+            cells = [
+                f"{timings[phase]:.1f}s" if phase in timings else "-"
+                for phase in phases
+            ]
+            lines.append(
+                f"| {name} | {total(result):.1f}s | " + " | ".join(cells) + " |"
+            )
+        return "\n".join(lines)
@@ -1,7 +1,9 @@
 """测试并验证插件"""
 
+from datetime import datetime
 from typing import Any
 
+from src.providers.constants import DOCKER_TIMEOUT, TIME_ZONE
 from src.providers.docker_test import DockerPluginTest
 from src.providers.logger import logger
 from src.providers.models import RegistryPlugin, StorePlugin, StoreTestResult
@@ -18,15 +20,19 @@ async def validate_plugin(
     store_plugin: StorePlugin,
     config: str,
     previous_plugin: RegistryPlugin | None = None,
+    timeout: float = DOCKER_TIMEOUT,  # noqa: ASYNC109
 ):
     """验证插件
 
     如果 previous_plugin 为 None，说明是首次验证插件
+    timeout 为等待测试容器的最长时间（秒）
 
     返回测试结果与验证后的插件数据
 
     如果插件验证失败，返回的插件数据为 None
     """
+    start_time = datetime.now(TIME_ZONE)
+
     # 需要从商店插件数据中获取的信息
     project_link = store_plugin.project_link
     module_name = store_plugin.module_name
@@ -36,7 +42,7 @@ async def validate_plugin(
 
     # 测试插件
     plugin_test_result = await DockerPluginTest(project_link, module_name, config).run(
-        "3.12"
+        "3.12", timeout
     )
 
     plugin_test_load = plugin_test_result.load
@@ -129,6 +135,11 @@ async def validate_plugin(
             "metadata": plugin_metadata,
         },
         test_env={plugin_test_env: True},
+        deps=plugin_test_result.deps,
+        image=plugin_test_result.image,
+        outcome=plugin_test_result.outcome,
+        timings=plugin_test_result.timings or None,
+        duration=round((datetime.now(TIME_ZONE) - start_time).total_seconds(), 1),
     )
 
     return test_result, new_plugin
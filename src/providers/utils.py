@@ -1,80 +1,266 @@
+import asyncio
+import base64
 import json
 import os
-from functools import cache
-from pathlib import Path
+import re
+import time
+import xmlrpc.client
+from collections.abc import Iterable, Iterator
+from functools import lru_cache
+from pathlib import Path, PurePosixPath
 from typing import Any
+from urllib.parse import urlsplit
+from xml.parsers.expat import ExpatError
 
 import httpx
 import pyjson5
-from pydantic_core import to_jsonable_python
+from pydantic_core import from_json, to_json, to_jsonable_python
 
+from src.providers.author_cache import get_author_cache
+from src.providers.constants import GITHUB_GRAPHQL_URL, GITHUB_TOKEN, PYPI_XMLRPC_URL
+from src.providers.http_cache import cached_get, cached_get_async
 from src.providers.logger import logger
+from src.providers.metrics import metrics
+
+
+def parse_json(content: str | bytes, source: str = "") -> Any:
+    """解析 JSON5
+
+    注册表数据等大文件为严格的 JSON，先使用更快的 JSON 解析器，失败后再按 JSON5 解析
+    扩展名为 .json5 的文件直接按 JSON5 解析，传入来源时解析耗时按来源记录到运行指标中
+
+    Args:
+        content (str | bytes): 文件内容
+        source (str): 数据来源，如文件名或网址
+    """
+    name = PurePosixPath(urlsplit(source).path).name
+    start = time.perf_counter()
+    parser = "json5"
+    if name.endswith(".json5"):
+        data = _decode_json5(content)
+    else:
+        try:
+            data = from_json(content)
+            parser = "json"
+        except (ValueError, TypeError):
+            # 包含单独代理项的字符串无法编码为 UTF-8，快速解析器会抛出 TypeError
+            data = _decode_json5(content)
+    if source:
+        elapsed = time.perf_counter() - start
+        metrics.observe(
+            "json_parse_seconds",
+            "JSON 解析耗时（秒）",
+            elapsed,
+            source=name,
+            parser=parser,
+        )
+        logger.debug(f"解析 {source} 耗时 {elapsed:.3f} 秒（{parser}）")
+    return data
+
+
+def _decode_json5(content: str | bytes) -> Any:
+    if isinstance(content, bytes):
+        content = content.decode("utf-8")
+    return pyjson5.decode(content)
 
 
 def load_json_from_file(file_path: str | Path):
     """从文件加载 JSON5 文件"""
-    with open(file_path, encoding="utf-8") as file:
-        return pyjson5.decode_io(file)  # type: ignore
+    return parse_json(Path(file_path).read_bytes(), str(file_path))
 
 
-def load_json_from_web(url: str):
+def load_json_from_web(url: str, headers: dict[str, str] | None = None):
     """从网络加载 JSON5 文件"""
-    r = httpx.get(url)
+    r = cached_get(url, headers)
     if r.status_code != 200:
         raise ValueError(f"下载文件失败：{r.text}")
-    return pyjson5.decode(r.text)
+    return parse_json(r.content, url)
+
+
+async def load_json_from_web_async(
+    client: httpx.AsyncClient,
+    url: str,
+    timeout: float = 30,  # noqa: ASYNC109
+    retries: int = 2,
+):
+    """异步从网络加载 JSON5 文件
+
+    网络错误或服务器错误时按指数退避重试
+
+    Args:
+        client (httpx.AsyncClient): 共享连接池的客户端
+        url (str): 文件地址
+        timeout (float, optional): 单次请求超时时间（秒）. Defaults to 30.
+        retries (int, optional): 失败后的重试次数. Defaults to 2.
+    """
+    for attempt in range(retries + 1):
+        try:
+            r = await cached_get_async(client, url, timeout=timeout)
+        except httpx.TransportError as e:
+            if attempt == retries:
+                raise ValueError(f"下载文件失败：{e}") from e
+        else:
+            if r.status_code == 200:
+                return parse_json(r.content, url)
+            # 客户端错误重试也无济于事
+            if r.status_code < 500 or attempt == retries:
+                raise ValueError(f"下载文件失败：{r.text}")
+        logger.warning(f"下载 {url} 失败，第 {attempt + 1} 次重试")
+        await asyncio.sleep(0.5 * 2**attempt)
 
 
 def load_json(text: str):
     """从文本加载 JSON5"""
-    return pyjson5.decode(text)
+    return parse_json(text)
 
 
-def dumps_json(data: Any, minify: bool = True) -> str:
-    """格式化对象"""
+# pydantic-core 与 json 标准库对科学计数法浮点数的格式不同（1e16 与 1e+16），
+# 出现可能不同的数字时改用标准库序列化，保证输出一致
+_FLOAT_MISMATCH = re.compile(rb"(?:^|[:\[,])\s*-?(?:\d+(?:\.\d+)?e|0\.0000)")
+
+_INDENT = 2
+
+
+def _to_json(data: Any, minify: bool) -> bytes:
+    """序列化单个对象，格式与 json 标准库一致"""
+    indent = None if minify else _INDENT
+    content = to_json(data, indent=indent, inf_nan_mode="constants")
+    if _FLOAT_MISMATCH.search(content):
+        separators = (",", ":") if minify else None
+        content = json.dumps(
+            to_jsonable_python(data),
+            ensure_ascii=False,
+            indent=indent,
+            separators=separators,
+        ).encode("utf-8")
+    return content
+
+
+def iter_json(data: Any, minify: bool = True) -> Iterator[bytes]:
+    """逐项序列化 JSON
+
+    最外层为列表或字典时逐项输出，不会一次性在内存中生成整个文件
+    输出与 `json.dumps(..., ensure_ascii=False)` 完全一致
+    """
+    if isinstance(data, dict) and all(isinstance(k, str) for k in data):
+        items = [(to_json(key), value) for key, value in data.items()]
+        brackets = b"{", b"}"
+    elif isinstance(data, list | tuple):
+        items = [(None, value) for value in data]
+        brackets = b"[", b"]"
+    else:
+        yield _to_json(data, minify)
+        return
+
+    if not items:
+        yield brackets[0] + brackets[1]
+        return
+
     if minify:
-        data = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+        start, item_separator, key_separator, end = b"", b",", b":", b""
     else:
-        data = json.dumps(data, ensure_ascii=False, indent=2)
-    return data
+        start, item_separator, key_separator, end = b"\n  ", b",\n  ", b": ", b"\n"
 
+    yield brackets[0] + start
+    for i, (key, value) in enumerate(items):
+        content = _to_json(value, minify)
+        if not minify:
+            # 字符串中的换行符会被转义，所以只需缩进格式化产生的换行
+            content = content.replace(b"\n", b"\n  ")
+        if key is not None:
+            content = key + key_separator + content
+        yield item_separator + content if i else content
+    yield end + brackets[1]
 
-def dump_json(path: str | Path, data: Any, minify: bool = True) -> None:
-    """保存 JSON 文件"""
-    data = to_jsonable_python(data)
 
-    with open(path, "w", encoding="utf-8") as f:
-        if minify:
-            # 为减少文件大小，还需手动设置 separators
-            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
-        else:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+def dumps_json(data: Any, minify: bool = True) -> str:
+    """格式化对象"""
+    return b"".join(iter_json(data, minify)).decode("utf-8")
 
 
-def dump_json5(path: Path, data: Any) -> None:
-    """保存 JSON5 文件
+def write_if_changed(path: str | Path, content: bytes | Iterable[bytes]) -> bool:
+    """仅在内容变化时写入文件
 
-    手动添加末尾的逗号和换行符
-    """
-    data = to_jsonable_python(data)
+    边生成内容边与原文件比较，出现不同时才开始写入临时文件，最后替换原文件
 
-    content = json.dumps(data, ensure_ascii=False, indent=2)
-    # 手动添加末尾的逗号和换行符
-    # 避免合并时出现冲突
-    content = content.replace("}\n]", "},\n]")
-    content += "\n"
+    Returns:
+        bool: 文件内容是否变化
+    """
+    path = Path(path)
+    if isinstance(content, bytes):
+        content = [content]
+    chunks = iter(content)
+
+    # 与原文件相同的部分
+    same = 0
+    if path.exists():
+        with open(path, "rb") as f:
+            for chunk in chunks:
+                if f.read(len(chunk)) != chunk:
+                    break
+                same += len(chunk)
+            else:
+                # 内容全部相同且原文件没有多余内容
+                if not f.read(1):
+                    return False
+                chunk = b""
+    else:
+        chunk = next(chunks, b"")
+
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        if same:
+            with open(path, "rb") as previous:
+                while same > 0:
+                    block = previous.read(min(same, 1024 * 1024))
+                    f.write(block)
+                    same -= len(block)
+        f.write(chunk)
+        for chunk in chunks:
+            f.write(chunk)
+    tmp_path.replace(path)
+    return True
+
+
+def dump_json(path: str | Path, data: Any, minify: bool = True) -> bool:
+    """保存 JSON 文件
+
+    内容未变化时不写入文件
+
+    Returns:
+        bool: 文件内容是否变化
+    """
+    return write_if_changed(path, iter_json(data, minify))
 
-    with open(path, "w", encoding="utf-8") as f:
-        f.write(content)
 
+def dump_json5(path: Path, data: Any) -> None:
+    """保存 JSON5 文件
 
-@cache
+    手动添加末尾的逗号和换行符
+    """
+    with open(path, "wb") as f:
+        # 最后一项与结尾的括号需要一起处理
+        tail: list[bytes] = []
+        for chunk in iter_json(data, minify=False):
+            tail.append(chunk)
+            if len(tail) > 2:
+                f.write(tail.pop(0))
+        # 手动添加末尾的逗号和换行符
+        # 避免合并时出现冲突
+        f.write(b"".join(tail).replace(b"}\n]", b"},\n]"))
+        f.write(b"\n")
+
+
+@lru_cache(maxsize=1024)
 def get_url(url: str) -> httpx.Response:
-    """获取网址"""
+    """获取网址
+
+    进程内只保留最近使用的响应，设置了 HTTP_CACHE_DIR 时还会使用磁盘缓存
+    """
     headers = {
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/83.0.4103.116 Safari/537.36"
     }
-    return httpx.get(url, follow_redirects=True, headers=headers)
+    return cached_get(url, headers)
 
 
 def get_pypi_data(project_link: str) -> dict[str, Any]:
@@ -105,6 +291,82 @@ def get_pypi_version(project_link: str) -> str | None:
     return data["info"]["version"]
 
 
+async def get_pypi_versions(
+    project_links: Iterable[str], concurrency: int = 16
+) -> dict[str, str | None]:
+    """并发获取多个项目的最新版本号
+
+    获取失败的项目版本号为 None
+
+    Args:
+        project_links (Iterable[str]): PyPI 项目名
+        concurrency (int, optional): 同时进行的请求数量. Defaults to 16.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(client: httpx.AsyncClient, project_link: str) -> str | None:
+        async with semaphore:
+            try:
+                data = await load_json_from_web_async(
+                    client, f"https://pypi.org/pypi/{project_link}/json"
+                )
+            except ValueError as e:
+                logger.warning(f"获取 {project_link} 的最新版本失败：{e}")
+                return None
+        return data["info"]["version"]
+
+    project_links = list(dict.fromkeys(project_links))
+    async with httpx.AsyncClient(follow_redirects=True) as client:
+        versions = await asyncio.gather(
+            *(fetch(client, project_link) for project_link in project_links)
+        )
+    return dict(zip(project_links, versions, strict=True))
+
+
+async def call_pypi_xmlrpc(client: httpx.AsyncClient, method: str, *params: Any) -> Any:
+    """调用 PyPI XML-RPC 接口"""
+    start = time.perf_counter()
+    r = await client.post(
+        PYPI_XMLRPC_URL,
+        content=xmlrpc.client.dumps(params, method),
+        headers={"Content-Type": "text/xml"},
+    )
+    metrics.record_http(PYPI_XMLRPC_URL, r.status_code, time.perf_counter() - start)
+    if r.status_code != 200:
+        raise ValueError(f"调用 PyPI 接口 {method} 失败：{r.text}")
+    try:
+        (result,), _ = xmlrpc.client.loads(r.content)
+    except xmlrpc.client.Fault as e:
+        raise ValueError(f"调用 PyPI 接口 {method} 失败：{e.faultString}") from e
+    except ExpatError as e:
+        raise ValueError(f"调用 PyPI 接口 {method} 失败：{e}") from e
+    return result
+
+
+async def get_pypi_changes(serial: int | None) -> tuple[set[str] | None, int]:
+    """获取指定序号之后有变更的 PyPI 项目
+
+    Args:
+        serial (int | None): 上次记录的变更序号，为 None 时只获取最新序号
+
+    Returns:
+        tuple[set[str] | None, int]: 规范化后的项目名（序号为 None 时为 None）与最新序号
+    """
+    async with httpx.AsyncClient(timeout=60) as client:
+        if serial is None:
+            return None, await call_pypi_xmlrpc(client, "changelog_last_serial")
+
+        changed: set[str] = set()
+        # 每次请求返回的记录数量有限，需要一直请求到没有新的记录
+        while events := await call_pypi_xmlrpc(
+            client, "changelog_since_serial", serial
+        ):
+            for name, _version, _timestamp, _action, event_serial in events:
+                changed.add(canonicalize_name(name))
+                serial = max(serial, event_serial)
+    return changed, serial
+
+
 def get_pypi_upload_time(project_link: str) -> str | None:
     """获取插件的上传时间"""
     try:
@@ -125,13 +387,132 @@ def add_step_summary(summary: str):
     logger.debug(f"已添加作业摘要：{summary}")
 
 
+_canonicalize_regex = re.compile(r"[-_.]+")
+
+
+def canonicalize_name(name: str) -> str:
+    """规范化名称
+
+    packaging.utils 中的 canonicalize_name 实现
+    """
+    return _canonicalize_regex.sub("-", name).lower()
+
+
 def pypi_key_to_path(key: str) -> str:
     """将 PyPI 键名转换为路径字符"""
     return key.replace(":", "-").replace(".", "-").replace("_", "-")
 
 
-@cache
 def get_author_name(author_id: int) -> str:
-    """通过作者的ID获取作者名字"""
+    """通过作者的ID获取作者名字
+
+    优先使用缓存，缓存中没有时通过 REST 接口获取，设置了 GitHub Token 时带上 Token
+    用户不存在时记录到缓存中，有效期内不再请求
+
+    Raises:
+        ValueError: 获取失败或用户不存在
+    """
+    author_cache = get_author_cache()
+    login = author_cache.get(author_id)
+    if login is not None:
+        return login
+    if author_cache.is_failed(author_id):
+        raise ValueError(f"作者 {author_id} 不存在")
+
     url = f"https://api.github.com/user/{author_id}"
-    return load_json_from_web(url)["login"]
+    headers = {"Authorization": f"bearer {GITHUB_TOKEN}"} if GITHUB_TOKEN else None
+    r = cached_get(url, headers)
+    if r.status_code == 404:
+        author_cache.set_failed(author_id)
+        author_cache.save()
+    if r.status_code != 200:
+        raise ValueError(f"下载文件失败：{r.text}")
+    login = parse_json(r.content, url)["login"]
+    author_cache.set(author_id, login)
+    author_cache.save()
+    return login
+
+
+def refresh_author_name(author_id: int, default: str) -> str:
+    """获取作者的最新名字，用于更新已有的数据
+
+    没有 GitHub Token 时只使用缓存中的名字，避免每次运行都逐个请求而超出频率限制
+    缓存中没有或获取失败时返回 default
+    """
+    if not GITHUB_TOKEN and get_author_cache().get(author_id) is None:
+        return default
+    try:
+        return get_author_name(author_id)
+    except Exception as e:
+        logger.warning(f"获取作者 {author_id} 的名字失败，继续使用 {default}：{e}")
+        return default
+
+
+AUTHOR_NAMES_QUERY = """
+query($ids: [ID!]!) {
+  nodes(ids: $ids) {
+    ... on User {
+      databaseId
+      login
+    }
+  }
+}
+"""
+
+
+def get_user_node_id(author_id: int) -> str:
+    """获取用户的 GraphQL 节点 ID"""
+    return base64.b64encode(f"04:User{author_id}".encode()).decode()
+
+
+async def prefetch_author_names(
+    author_ids: Iterable[int], batch_size: int = 100
+) -> None:
+    """通过 GraphQL 接口批量获取作者名字并存入缓存
+
+    需要设置 GitHub Token，没有 Token 或获取失败的作者之后通过 `get_author_name` 逐个获取
+    无法解析的作者（如已注销的账号）记录为获取失败，有效期内不再逐个获取
+
+    Args:
+        author_ids (Iterable[int]): 作者的ID
+        batch_size (int): 每次请求获取的作者数量，GitHub 最多支持 100 个
+    """
+    author_cache = get_author_cache()
+    missing = author_cache.missing(author_ids)
+    if not missing or not GITHUB_TOKEN:
+        return
+
+    fetched = 0
+    async with httpx.AsyncClient(
+        headers={"Authorization": f"bearer {GITHUB_TOKEN}"}
+    ) as client:
+        for i in range(0, len(missing), batch_size):
+            batch = missing[i : i + batch_size]
+            try:
+                start = time.perf_counter()
+                r = await client.post(
+                    GITHUB_GRAPHQL_URL,
+                    json={
+                        "query": AUTHOR_NAMES_QUERY,
+                        "variables": {"ids": [get_user_node_id(x) for x in batch]},
+                    },
+                )
+                metrics.record_http(
+                    GITHUB_GRAPHQL_URL, r.status_code, time.perf_counter() - start
+                )
+                r.raise_for_status()
+                # 不存在的用户对应 null，其余用户仍正常返回
+                nodes = r.json()["data"]["nodes"]
+            except (httpx.HTTPError, KeyError, TypeError, ValueError) as e:
+                logger.warning(f"批量获取作者名字失败：{e}")
+                break
+            # 返回的节点与请求的 ID 顺序一致
+            for author_id, node in zip(batch, nodes, strict=False):
+                if node and node.get("login"):
+                    author_cache.set(author_id, node["login"])
+                    fetched += 1
+                else:
+                    # 无法解析的用户，如已注销的账号，有效期内不再逐个请求
+                    author_cache.set_failed(author_id)
+    logger.info(f"已批量获取 {fetched}/{len(missing)} 个作者的名字")
+    author_cache.save()
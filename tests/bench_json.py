@@ -0,0 +1,50 @@
+# ruff: noqa: T201
+"""JSON 解析微基准
+
+比较直接使用 pyjson5 与 parse_json 解析 tests/store 中数据的耗时，
+同时将注册表数据放大到与线上数据相近的规模后再比较一次
+
+    python -m tests.bench_json
+"""
+
+import json
+import timeit
+from pathlib import Path
+
+import pyjson5
+
+from src.providers.utils import parse_json
+
+STORE_DIR = Path(__file__).parent / "store"
+SCALE = 1000
+
+
+def scale(data):
+    """将列表或字典重复多次"""
+    if isinstance(data, list):
+        return data * SCALE
+    return {f"{key}-{i}": value for i in range(SCALE) for key, value in data.items()}
+
+
+def bench(name: str, content: bytes, number: int) -> None:
+    text = content.decode("utf-8")
+    baseline = timeit.timeit(lambda: pyjson5.decode(text), number=number) / number
+    fast = timeit.timeit(lambda: parse_json(content, name), number=number) / number
+    print(
+        f"{name:<32} {len(content):>10} {baseline * 1e3:>10.3f} {fast * 1e3:>10.3f}"
+        f" {baseline / fast:>8.2f}x"
+    )
+
+
+def main() -> None:
+    print(f"{'file':<32} {'bytes':>10} {'pyjson5':>10} {'parse':>10} {'speedup':>9}")
+    for path in sorted(STORE_DIR.iterdir()):
+        bench(path.name, path.read_bytes(), 1000)
+    for path in sorted(STORE_DIR.glob("registry_*.json")):
+        data = scale(json.loads(path.read_bytes()))
+        content = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        bench(f"{path.stem}x{SCALE}.json", content, 10)
+
+
+if __name__ == "__main__":
+    main()
@@ -101,9 +101,19 @@ async def app(
 @pytest.fixture(autouse=True)
 def _clear_cache(app: App):
     """每次运行前都清除 cache"""
+    from src.providers.author_cache import get_author_cache
+    from src.providers.docker_test import _pull_image, get_docker_client, host_id
+    from src.providers.docker_test.scheduler import get_scheduler
+    from src.providers.metrics import metrics
     from src.providers.utils import get_url
 
     get_url.cache_clear()
+    get_author_cache.cache_clear()
+    get_docker_client.cache_clear()
+    _pull_image.cache_clear()
+    get_scheduler.cache_clear()
+    host_id.cache_clear()
+    metrics.reset()
 
 
 class PyPIProject(TypedDict):
@@ -0,0 +1,39 @@
+import pytest
+from pytest_mock import MockerFixture
+
+
+@pytest.fixture(autouse=True)
+def mocked_pull_image(mocker: MockerFixture):
+    """测试镜像已在本地，无需拉取"""
+    from src.providers.constants import DOCKER_IMAGES
+    from src.providers.docker_test import DockerImage
+
+    return mocker.patch(
+        "src.providers.docker_test.pull_image",
+        return_value=DockerImage(DOCKER_IMAGES, None, 0),
+    )
+
+
+@pytest.fixture(autouse=True)
+def mocked_host_id(mocker: MockerFixture):
+    """固定宿主机的主机名与启动 ID"""
+    return mocker.patch(
+        "src.providers.docker_test.host_id", return_value=("host", "boot")
+    )
+
+
+@pytest.fixture
+def mocked_container(mocker: MockerFixture):
+    """已正常退出的测试容器
+
+    实时读取的输出通过 stream 设置，容器结束后获取的输出通过 logs.return_value 设置
+    """
+    from unittest.mock import DEFAULT
+
+    container = mocker.Mock(status="exited", attrs={"State": {"ExitCode": 0}})
+    container.stream = []
+    container.logs.return_value = b""
+    container.logs.side_effect = lambda stream=False, **kwargs: (
+        iter(container.stream) if stream else DEFAULT
+    )
+    return container
@@ -1,6 +1,8 @@
 import json
+import os
 from pathlib import Path
 
+import pytest
 from inline_snapshot import snapshot
 from pytest_mock import MockerFixture
 from respx import MockRouter
@@ -10,6 +12,7 @@ async def test_docker_plugin_test_from_file(
     mocked_api: MockRouter,
     mocker: MockerFixture,
     tmp_path: Path,
+    mocked_container,
 ):
     from src.providers.constants import DOCKER_BIND_RESULT_PATH
     from src.providers.docker_test import DockerPluginTest, DockerTestResult
@@ -32,8 +35,7 @@ async def test_docker_plugin_test_from_file(
     with open(test_result_path, "w", encoding="utf-8") as f:
         f.write(data)
 
-    mocked_run = mocker.Mock()
-    mocked_run.return_value = b""
+    mocked_run = mocker.Mock(return_value=mocked_container)
     mocked_client = mocker.Mock()
     mocked_client.containers.run = mocked_run
     mocked_docker = mocker.patch("docker.DockerClient")
@@ -44,7 +46,12 @@ async def test_docker_plugin_test_from_file(
 
     assert result == snapshot(
         DockerTestResult(
-            run=True, load=True, output="test", version="0.0.1", test_env="python==3.12"
+            run=True,
+            load=True,
+            output="test",
+            version="0.0.1",
+            test_env="python==3.12",
+            timings={"container": 0.0, "parse": 0.0},
         )
     )
 
@@ -59,8 +66,15 @@ async def test_docker_plugin_test_from_file(
                 "PYTHON_VERSION": "3.12",
             }
         ),
-        detach=False,
-        remove=True,
+        detach=True,
+        labels={
+            "noneflow.plugin-test.host": "host",
+            "noneflow.plugin-test.boot": "boot",
+            "noneflow.plugin-test.pid": str(os.getpid()),
+            "noneflow.plugin-test.result": test_result_path.resolve(
+                strict=False
+            ).as_posix(),
+        },
         volumes={
             test_result_path.resolve(strict=False).as_posix(): {
                 "bind": DOCKER_BIND_RESULT_PATH,
@@ -74,6 +88,7 @@ async def test_docker_plugin_test_from_file_invalid_output(
     mocked_api: MockRouter,
     mocker: MockerFixture,
     tmp_path: Path,
+    mocked_container,
 ):
     """测试结果文件内容不是合法的 UTF-8 编码
 
@@ -100,9 +115,9 @@ async def test_docker_plugin_test_from_file_invalid_output(
     with open(test_result_path, "w", encoding="utf-8") as f:
         f.write(data)
 
-    mocked_run = mocker.Mock()
     # 非法 UTF-8 编码
-    mocked_run.return_value = b"\xff\xfe\xfd"
+    mocked_container.logs.return_value = b"\xff\xfe\xfd"
+    mocked_run = mocker.Mock(return_value=mocked_container)
     mocked_client = mocker.Mock()
     mocked_client.containers.run = mocked_run
     mocked_docker = mocker.patch("docker.DockerClient")
@@ -113,7 +128,12 @@ async def test_docker_plugin_test_from_file_invalid_output(
 
     assert result == snapshot(
         DockerTestResult(
-            run=True, load=True, output="test", version="0.0.1", test_env="python==3.12"
+            run=True,
+            load=True,
+            output="test",
+            version="0.0.1",
+            test_env="python==3.12",
+            timings={"container": 0.0, "parse": 0.0},
         )
     )
 
@@ -128,8 +148,15 @@ async def test_docker_plugin_test_from_file_invalid_output(
                 "PYTHON_VERSION": "3.12",
             }
         ),
-        detach=False,
-        remove=True,
+        detach=True,
+        labels={
+            "noneflow.plugin-test.host": "host",
+            "noneflow.plugin-test.boot": "boot",
+            "noneflow.plugin-test.pid": str(os.getpid()),
+            "noneflow.plugin-test.result": test_result_path.resolve(
+                strict=False
+            ).as_posix(),
+        },
         volumes={
             test_result_path.resolve(strict=False).as_posix(): {
                 "bind": DOCKER_BIND_RESULT_PATH,
@@ -143,6 +170,7 @@ async def test_docker_plugin_test_from_output(
     mocked_api: MockRouter,
     mocker: MockerFixture,
     tmp_path: Path,
+    mocked_container,
 ):
     from src.providers.constants import DOCKER_BIND_RESULT_PATH
     from src.providers.docker_test import DockerPluginTest, DockerTestResult
@@ -150,8 +178,7 @@ async def test_docker_plugin_test_from_output(
     mocker.patch("src.providers.docker_test.PLUGIN_TEST_DIR", tmp_path)
     test_result_path = tmp_path / "project-link-module-name.json"
 
-    mocked_run = mocker.Mock()
-    mocked_run.return_value = json.dumps(
+    mocked_container.logs.return_value = json.dumps(
         {
             "metadata": None,
             "output": "test",
@@ -162,6 +189,7 @@ async def test_docker_plugin_test_from_output(
             "test_env": "python==3.12",
         }
     ).encode(encoding="utf-8")
+    mocked_run = mocker.Mock(return_value=mocked_container)
     mocked_client = mocker.Mock()
     mocked_client.containers.run = mocked_run
     mocked_docker = mocker.patch("docker.DockerClient")
@@ -172,7 +200,12 @@ async def test_docker_plugin_test_from_output(
 
     assert result == snapshot(
         DockerTestResult(
-            load=True, output="test", run=True, version="0.0.1", test_env="python==3.12"
+            load=True,
+            output="test",
+            run=True,
+            version="0.0.1",
+            test_env="python==3.12",
+            timings={"container": 0.0, "parse": 0.0},
         )
     )
 
@@ -187,8 +220,15 @@ async def test_docker_plugin_test_from_output(
                 "PYTHON_VERSION": "3.12",
             }
         ),
-        detach=False,
-        remove=True,
+        detach=True,
+        labels={
+            "noneflow.plugin-test.host": "host",
+            "noneflow.plugin-test.boot": "boot",
+            "noneflow.plugin-test.pid": str(os.getpid()),
+            "noneflow.plugin-test.result": test_result_path.resolve(
+                strict=False
+            ).as_posix(),
+        },
         volumes={
             test_result_path.resolve(strict=False).as_posix(): {
                 "bind": DOCKER_BIND_RESULT_PATH,
@@ -233,8 +273,15 @@ async def test_docker_plugin_test_exception(
                 "PYTHON_VERSION": "3.12",
             }
         ),
-        detach=False,
-        remove=True,
+        detach=True,
+        labels={
+            "noneflow.plugin-test.host": "host",
+            "noneflow.plugin-test.boot": "boot",
+            "noneflow.plugin-test.pid": str(os.getpid()),
+            "noneflow.plugin-test.result": test_result_path.resolve(
+                strict=False
+            ).as_posix(),
+        },
         volumes={
             test_result_path.resolve(strict=False).as_posix(): {
                 "bind": DOCKER_BIND_RESULT_PATH,
@@ -248,6 +295,7 @@ async def test_docker_plugin_test_metadata_some_fields_empty(
     mocked_api: MockRouter,
     mocker: MockerFixture,
     tmp_path: Path,
+    mocked_container,
 ):
     """测试 metadata 的部分字段为空"""
     from src.providers.constants import DOCKER_BIND_RESULT_PATH
@@ -256,8 +304,7 @@ async def test_docker_plugin_test_metadata_some_fields_empty(
     mocker.patch("src.providers.docker_test.PLUGIN_TEST_DIR", tmp_path)
     test_result_path = tmp_path / "project-link-module-name.json"
 
-    mocked_run = mocker.Mock()
-    mocked_run.return_value = json.dumps(
+    mocked_container.logs.return_value = json.dumps(
         {
             "metadata": {
                 "name": "name",
@@ -274,6 +321,7 @@ async def test_docker_plugin_test_metadata_some_fields_empty(
             "test_env": "python==3.12",
         }
     ).encode()
+    mocked_run = mocker.Mock(return_value=mocked_container)
     mocked_client = mocker.Mock()
     mocked_client.containers.run = mocked_run
     mocked_docker = mocker.patch("docker.DockerClient")
@@ -296,6 +344,7 @@ async def test_docker_plugin_test_metadata_some_fields_empty(
                 "type": None,
                 "supported_adapters": None,
             },
+            timings={"container": 0.0, "parse": 0.0},
         )
     )
 
@@ -310,8 +359,15 @@ async def test_docker_plugin_test_metadata_some_fields_empty(
                 "PYTHON_VERSION": "3.12",
             }
         ),
-        detach=False,
-        remove=True,
+        detach=True,
+        labels={
+            "noneflow.plugin-test.host": "host",
+            "noneflow.plugin-test.boot": "boot",
+            "noneflow.plugin-test.pid": str(os.getpid()),
+            "noneflow.plugin-test.result": test_result_path.resolve(
+                strict=False
+            ).as_posix(),
+        },
         volumes={
             test_result_path.resolve(strict=False).as_posix(): {
                 "bind": DOCKER_BIND_RESULT_PATH,
@@ -325,6 +381,7 @@ async def test_docker_plugin_test_metadata_some_fields_invalid(
     mocked_api: MockRouter,
     mocker: MockerFixture,
     tmp_path: Path,
+    mocked_container,
 ):
     """测试 metadata 的部分字段不符合规范"""
     from src.providers.constants import DOCKER_BIND_RESULT_PATH
@@ -333,8 +390,7 @@ async def test_docker_plugin_test_metadata_some_fields_invalid(
     mocker.patch("src.providers.docker_test.PLUGIN_TEST_DIR", tmp_path)
     test_result_path = tmp_path / "project-link-module-name.json"
 
-    mocked_run = mocker.Mock()
-    mocked_run.return_value = b""
+    mocked_run = mocker.Mock(return_value=mocked_container)
     mocked_client = mocker.Mock()
     mocked_client.containers.run = mocked_run
     mocked_docker = mocker.patch("docker.DockerClient")
@@ -377,6 +433,7 @@ async def test_docker_plugin_test_metadata_some_fields_invalid(
                 "type": True,
                 "supported_adapters": {},
             },
+            timings={"container": 0.0, "parse": 0.0},
         )
     )
 
@@ -389,8 +446,15 @@ async def test_docker_plugin_test_metadata_some_fields_invalid(
             "PLUGIN_CONFIG": "",
             "PYTHON_VERSION": "3.12",
         },
-        detach=False,
-        remove=True,
+        detach=True,
+        labels={
+            "noneflow.plugin-test.host": "host",
+            "noneflow.plugin-test.boot": "boot",
+            "noneflow.plugin-test.pid": str(os.getpid()),
+            "noneflow.plugin-test.result": test_result_path.resolve(
+                strict=False
+            ).as_posix(),
+        },
         volumes={
             test_result_path.resolve(strict=False).as_posix(): {
                 "bind": DOCKER_BIND_RESULT_PATH,
@@ -404,6 +468,7 @@ async def test_docker_plugin_test_file_invalid_and_output_invalid(
     mocked_api: MockRouter,
     mocker: MockerFixture,
     tmp_path: Path,
+    mocked_container,
 ):
     """测试结果文件解析失败且容器输出也无法解析为 JSON"""
     from src.providers.constants import DOCKER_BIND_RESULT_PATH
@@ -416,9 +481,9 @@ async def test_docker_plugin_test_file_invalid_and_output_invalid(
     with open(test_result_path, "w", encoding="utf-8") as f:
         f.write("invalid json {")
 
-    mocked_run = mocker.Mock()
     # 容器输出也是无效的 JSON
-    mocked_run.return_value = b"not a valid json output"
+    mocked_container.logs.return_value = b"not a valid json output"
+    mocked_run = mocker.Mock(return_value=mocked_container)
     mocked_client = mocker.Mock()
     mocked_client.containers.run = mocked_run
     mocked_docker = mocker.patch("docker.DockerClient")
@@ -439,6 +504,7 @@ async def test_docker_plugin_test_file_invalid_and_output_invalid(
                         输出内容：b'not a valid json output'
                         \
 """,
+            timings={"container": 0.0, "parse": 0.0},
         )
     )
 
@@ -451,8 +517,15 @@ async def test_docker_plugin_test_file_invalid_and_output_invalid(
             "PLUGIN_CONFIG": "",
             "PYTHON_VERSION": "3.12",
         },
-        detach=False,
-        remove=True,
+        detach=True,
+        labels={
+            "noneflow.plugin-test.host": "host",
+            "noneflow.plugin-test.boot": "boot",
+            "noneflow.plugin-test.pid": str(os.getpid()),
+            "noneflow.plugin-test.result": test_result_path.resolve(
+                strict=False
+            ).as_posix(),
+        },
         volumes={
             test_result_path.resolve(strict=False).as_posix(): {
                 "bind": DOCKER_BIND_RESULT_PATH,
@@ -460,3 +533,447 @@ async def test_docker_plugin_test_file_invalid_and_output_invalid(
             }
         },
     )
+
+
+async def test_docker_plugin_test_wait(
+    mocked_api: MockRouter,
+    mocker: MockerFixture,
+    tmp_path: Path,
+    mocked_container,
+):
+    """后台运行容器，异步等待容器结束后删除容器"""
+    from src.providers.docker_test import DockerPluginTest
+
+    mocker.patch("src.providers.docker_test.PLUGIN_TEST_DIR", tmp_path)
+    mocked_sleep = mocker.patch("asyncio.sleep")
+
+    mocked_container.status = "running"
+    statuses = iter(["running", "running", "exited"])
+
+    def reload():
+        mocked_container.status = next(statuses)
+
+    mocked_container.reload.side_effect = reload
+    mocked_container.logs.return_value = json.dumps(
+        {"run": True, "load": True, "output": "test"}
+    ).encode()
+    mocked_client = mocker.Mock()
+    mocked_client.containers.run.return_value = mocked_container
+    mocker.patch("docker.DockerClient", return_value=mocked_client)
+
+    result = await DockerPluginTest("project_link", "module_name").run("3.12")
+
+    assert result.load
+    assert mocked_container.reload.call_count == 3
+    assert mocked_sleep.call_count == 2
+    mocked_container.logs.assert_called_with(stdout=True, stderr=False)
+    mocked_container.remove.assert_called_once_with(force=True)
+
+
+async def test_docker_plugin_test_exit_code(
+    mocked_api: MockRouter,
+    mocker: MockerFixture,
+    tmp_path: Path,
+    mocked_container,
+):
+    """容器退出码不为 0 时视为未运行测试，并删除容器"""
+    from src.providers.docker_test import DockerPluginTest
+
+    mocker.patch("src.providers.docker_test.PLUGIN_TEST_DIR", tmp_path)
+
+    mocked_container.attrs = {"State": {"ExitCode": 1}}
+    mocked_container.logs.return_value = b"error"
+    mocked_client = mocker.Mock()
+    mocked_client.containers.run.return_value = mocked_container
+    mocker.patch("docker.DockerClient", return_value=mocked_client)
+
+    result = await DockerPluginTest("project_link", "module_name").run("3.12")
+
+    assert not result.run
+    assert "returned non-zero exit status 1" in result.output
+    mocked_container.logs.assert_called_with(stdout=False, stderr=True)
+    mocked_container.remove.assert_called_once_with(force=True)
+
+
+async def test_docker_plugin_test_image_digest(
+    mocked_api: MockRouter,
+    mocker: MockerFixture,
+    mocked_pull_image,
+    tmp_path: Path,
+    mocked_container,
+):
+    """使用校验过摘要的镜像运行测试，并共用同一个 Docker 客户端"""
+    from src.providers.constants import DOCKER_IMAGES
+    from src.providers.docker_test import DockerImage, DockerPluginTest
+
+    mocker.patch("src.providers.docker_test.PLUGIN_TEST_DIR", tmp_path)
+    digest = "ghcr.io/nonebot/nonetest@sha256:abc"
+    mocked_pull_image.return_value = DockerImage(DOCKER_IMAGES, digest, 10)
+
+    mocked_container.logs.return_value = json.dumps(
+        {"run": True, "load": True, "output": "test"}
+    ).encode()
+    mocked_client = mocker.Mock()
+    mocked_client.containers.run.return_value = mocked_container
+    mocked_docker = mocker.patch("docker.DockerClient", return_value=mocked_client)
+
+    for _ in range(2):
+        result = await DockerPluginTest("project_link", "module_name").run("3.12")
+        assert result.image == digest
+        # 拉取镜像的耗时不计入测试耗时
+        assert result.timings["container"] == 0
+
+    assert mocked_client.containers.run.call_args.args == (digest,)
+    mocked_docker.assert_called_once()
+
+
+def test_pull_image(mocker: MockerFixture):
+    """只拉取一次镜像，并记录摘要与拉取耗时"""
+    from src.providers.docker_test import _pull_image
+    from src.providers.metrics import metrics
+
+    mocked_client = mocker.Mock()
+    mocked_client.images.pull.return_value = mocker.Mock(
+        attrs={"RepoDigests": ["ghcr.io/nonebot/nonetest@sha256:abc"]}
+    )
+    mocker.patch("docker.DockerClient", return_value=mocked_client)
+    mocker.patch("src.providers.docker_test.DOCKER_IMAGES_DIGEST", "sha256:abc")
+
+    image = _pull_image()
+    assert image.digest == "ghcr.io/nonebot/nonetest@sha256:abc"
+    assert _pull_image() is image
+    mocked_client.images.pull.assert_called_once_with("ghcr.io/nonebot/nonetest:latest")
+    assert "docker_image_pull_seconds" in metrics.to_json()
+
+
+def test_pull_image_digest_mismatch(mocker: MockerFixture):
+    """镜像摘要不一致时报错"""
+    from docker.errors import APIError
+
+    from src.providers.docker_test import _pull_image
+
+    mocked_client = mocker.Mock()
+    # 无法拉取时使用本地镜像
+    mocked_client.images.pull.side_effect = APIError("offline")
+    mocked_client.images.get.return_value = mocker.Mock(
+        attrs={"RepoDigests": ["ghcr.io/nonebot/nonetest@sha256:abc"]}
+    )
+    mocker.patch("docker.DockerClient", return_value=mocked_client)
+    mocker.patch("src.providers.docker_test.DOCKER_IMAGES_DIGEST", "sha256:def")
+
+    with pytest.raises(ValueError, match="不一致"):
+        _pull_image()
+    mocked_client.images.get.assert_called_once_with("ghcr.io/nonebot/nonetest:latest")
+
+
+async def test_docker_plugin_test_timeout(
+    mocked_api: MockRouter,
+    mocker: MockerFixture,
+    tmp_path: Path,
+    mocked_container,
+):
+    """超过等待时间时强制停止容器，记录最后的输出并删除容器"""
+    from src.providers.docker_test import DockerPluginTest
+
+    mocker.patch("src.providers.docker_test.PLUGIN_TEST_DIR", tmp_path)
+    mocker.patch("asyncio.sleep")
+    mocked_time = mocker.patch("src.providers.docker_test.time")
+    mocked_time.monotonic.side_effect = [0, 5, 11]
+
+    mocked_container.status = "running"
+    mocked_container.stream = [b"install", b"ing...\n"]
+    mocked_client = mocker.Mock()
+    mocked_client.containers.run.return_value = mocked_container
+    mocker.patch("docker.DockerClient", return_value=mocked_client)
+
+    result = await DockerPluginTest("project_link", "module_name").run(
+        "3.12", timeout=10
+    )
+
+    assert result.run
+    assert not result.load
+    assert result.outcome == "timeout"
+    assert result.output == snapshot(
+        "容器运行超过 10 秒，已强制停止。最后的输出：\ninstalling..."
+    )
+    mocked_container.kill.assert_called_once_with()
+    mocked_container.logs.assert_called_once_with(
+        stdout=True, stderr=True, stream=True, follow=True
+    )
+    mocked_container.remove.assert_called_once_with(force=True)
+    assert not (tmp_path / "project-link-module-name.json").exists()
+
+
+async def test_cleanup_containers(mocker: MockerFixture, tmp_path: Path):
+    """只清理当前宿主机上启动进程已退出的容器"""
+    from src.providers.docker_test import cleanup_containers
+
+    orphan_result = tmp_path / "orphan.json"
+    orphan_result.touch()
+    running_result = tmp_path / "running.json"
+    running_result.touch()
+    rebooted_result = tmp_path / "rebooted.json"
+    rebooted_result.touch()
+
+    orphan = mocker.Mock(
+        labels={
+            "noneflow.plugin-test.host": "host",
+            "noneflow.plugin-test.boot": "boot",
+            "noneflow.plugin-test.pid": "1000001",
+            "noneflow.plugin-test.result": orphan_result.as_posix(),
+        }
+    )
+    running = mocker.Mock(
+        labels={
+            "noneflow.plugin-test.host": "host",
+            "noneflow.plugin-test.boot": "boot",
+            "noneflow.plugin-test.pid": "1000002",
+            "noneflow.plugin-test.result": running_result.as_posix(),
+        }
+    )
+    # 重启前启动的容器，进程号已被其他进程复用
+    rebooted = mocker.Mock(
+        labels={
+            "noneflow.plugin-test.host": "host",
+            "noneflow.plugin-test.boot": "old-boot",
+            "noneflow.plugin-test.pid": "1000002",
+            "noneflow.plugin-test.result": rebooted_result.as_posix(),
+        }
+    )
+    mocked_client = mocker.Mock()
+    mocked_client.containers.list.return_value = [orphan, running, rebooted]
+    mocker.patch("docker.DockerClient", return_value=mocked_client)
+    mocker.patch(
+        "src.providers.docker_test._is_running",
+        side_effect=lambda pid: pid == 1000002,
+    )
+
+    assert cleanup_containers() == 2
+
+    # 只列出当前宿主机启动的容器，其他宿主机的容器由守护进程过滤
+    mocked_client.containers.list.assert_called_once_with(
+        all=True, filters={"label": "noneflow.plugin-test.host=host"}
+    )
+    orphan.remove.assert_called_once_with(force=True)
+    running.remove.assert_not_called()
+    rebooted.remove.assert_called_once_with(force=True)
+    assert not orphan_result.exists()
+    assert running_result.exists()
+    assert not rebooted_result.exists()
+
+
+def test_host_id(mocker: MockerFixture, tmp_path: Path):
+    """读取主机名与启动 ID，无法读取启动 ID 时为空字符串"""
+    # 恢复被固定的 host_id
+    mocker.stopall()
+    from src.providers.docker_test import host_id
+
+    mocker.patch("socket.gethostname", return_value="runner")
+
+    boot_id = tmp_path / "boot_id"
+    boot_id.write_text("0a1b2c\n", encoding="utf-8")
+    mocker.patch("src.providers.docker_test.BOOT_ID_PATH", boot_id)
+    assert host_id() == ("runner", "0a1b2c")
+
+    mocker.patch("src.providers.docker_test.BOOT_ID_PATH", tmp_path / "missing")
+    host_id.cache_clear()
+    assert host_id() == ("runner", "")
+
+
+async def test_docker_plugin_test_fatal(
+    mocked_api: MockRouter,
+    mocked_container,
+    mocker: MockerFixture,
+    tmp_path: Path,
+):
+    """输出中出现无法恢复的错误后，超过宽限时间仍未结束则停止容器，并从输出中获取插件版本号"""
+    from src.providers.docker_test import DockerPluginTest
+
+    mocker.patch("src.providers.docker_test.PLUGIN_TEST_DIR", tmp_path)
+    mocker.patch("src.providers.docker_test.DOCKER_FATAL_GRACE", 0)
+    mocker.patch("asyncio.sleep")
+
+    mocked_container.status = "running"
+    mocked_container.stream = [
+        b"Using version ^0.1.0 for nonebot-plugin-test\n",
+        b"Because nonebot-plugin-test depends on nonebot2 (^9.0.0)\n",
+        b"which doesn't match any versions, version solving failed.\n",
+        "中文输出".encode()[:4],
+        "中文输出\n".encode()[4:],
+    ]
+    mocked_client = mocker.Mock()
+    mocked_client.containers.run.return_value = mocked_container
+    mocker.patch("docker.DockerClient", return_value=mocked_client)
+
+    result = await DockerPluginTest("nonebot-plugin-test", "nonebot_plugin_test").run(
+        "3.12"
+    )
+
+    assert result.run
+    assert not result.load
+    assert result.outcome == "fatal"
+    assert result.version == "0.1.0"
+    assert result.output == snapshot("""\
+容器输出中出现无法恢复的错误：which doesn't match any versions, version solving failed.，已强制停止。最后的输出：
+Using version ^0.1.0 for nonebot-plugin-test
+Because nonebot-plugin-test depends on nonebot2 (^9.0.0)
+which doesn't match any versions, version solving failed.
+中文输出\
+""")
+    mocked_container.kill.assert_called_once_with()
+    mocked_container.remove.assert_called_once_with(force=True)
+
+
+async def test_docker_plugin_test_fatal_exited(
+    mocked_api: MockRouter,
+    mocked_container,
+    mocker: MockerFixture,
+    tmp_path: Path,
+):
+    """输出中出现无法恢复的错误后，容器在宽限时间内自行结束时使用测试结果文件"""
+    from src.providers.docker_test import DockerPluginTest
+
+    mocker.patch("src.providers.docker_test.PLUGIN_TEST_DIR", tmp_path)
+    mocker.patch("asyncio.sleep")
+
+    test_result_path = tmp_path / "project-link-module-name.json"
+    reloads = 0
+
+    def reload():
+        nonlocal reloads
+        reloads += 1
+        # 跳过之后的步骤，写入测试结果后结束
+        if reloads == 3:
+            test_result_path.write_text(
+                json.dumps(
+                    {
+                        "run": False,
+                        "load": False,
+                        "output": "version solving failed.",
+                        "version": "0.1.0",
+                        "test_env": "python==3.12.7",
+                    }
+                ),
+                encoding="utf-8",
+            )
+            mocked_container.status = "exited"
+
+    mocked_container.status = "running"
+    mocked_container.reload.side_effect = reload
+    mocked_container.stream = [b"version solving failed.\n"]
+    mocked_client = mocker.Mock()
+    mocked_client.containers.run.return_value = mocked_container
+    mocker.patch("docker.DockerClient", return_value=mocked_client)
+
+    result = await DockerPluginTest("project_link", "module_name").run("3.12")
+
+    assert not result.run
+    assert result.outcome is None
+    assert result.version == "0.1.0"
+    assert result.test_env == "python==3.12.7"
+    assert result.output == "version solving failed."
+    mocked_container.kill.assert_not_called()
+    mocked_container.remove.assert_called_once_with(force=True)
+
+
+async def test_docker_plugin_test_fatal_with_result(
+    mocked_api: MockRouter,
+    mocked_container,
+    mocker: MockerFixture,
+    tmp_path: Path,
+):
+    """容器被提前停止时，优先使用已写入的测试结果文件"""
+    from src.providers.docker_test import DockerPluginTest
+
+    mocker.patch("src.providers.docker_test.PLUGIN_TEST_DIR", tmp_path)
+    mocker.patch("src.providers.docker_test.DOCKER_FATAL_GRACE", 0)
+    mocker.patch("asyncio.sleep")
+
+    (tmp_path / "project-link-module-name.json").write_text(
+        json.dumps(
+            {
+                "run": False,
+                "load": False,
+                "output": "version solving failed.",
+                "version": "0.1.0",
+                "test_env": "python==3.12.7",
+            }
+        ),
+        encoding="utf-8",
+    )
+    mocked_container.status = "running"
+    mocked_container.stream = [b"version solving failed.\n"]
+    mocked_client = mocker.Mock()
+    mocked_client.containers.run.return_value = mocked_container
+    mocker.patch("docker.DockerClient", return_value=mocked_client)
+
+    result = await DockerPluginTest("project_link", "module_name").run("3.12")
+
+    assert result.outcome == "fatal"
+    assert result.version == "0.1.0"
+    assert result.test_env == "python==3.12.7"
+    assert result.output == "version solving failed."
+    mocked_container.kill.assert_called_once_with()
+    assert not (tmp_path / "project-link-module-name.json").exists()
+
+
+async def test_docker_plugin_test_oom(
+    mocked_api: MockRouter,
+    mocked_container,
+    mocker: MockerFixture,
+    tmp_path: Path,
+):
+    """容器内存超过限制时记录为单独的结果"""
+    from src.providers.docker_test import DockerPluginTest
+
+    mocker.patch("src.providers.docker_test.PLUGIN_TEST_DIR", tmp_path)
+
+    mocked_container.attrs = {"State": {"ExitCode": 137, "OOMKilled": True}}
+    mocked_container.stream = [b"Building wheel for numpy\n"]
+    mocked_client = mocker.Mock()
+    mocked_client.containers.run.return_value = mocked_container
+    mocker.patch("docker.DockerClient", return_value=mocked_client)
+
+    result = await DockerPluginTest(
+        "project_link", "module_name", cpus=1, memory=512
+    ).run("3.12")
+
+    assert result.run
+    assert not result.load
+    assert result.outcome == "oom"
+    assert result.output == snapshot(
+        "容器内存超过限制，已强制停止。最后的输出：\nBuilding wheel for numpy"
+    )
+    run_kwargs = mocked_client.containers.run.call_args.kwargs
+    assert run_kwargs["nano_cpus"] == 1000000000
+    assert run_kwargs["mem_limit"] == "512m"
+    assert run_kwargs["memswap_limit"] == "512m"
+    mocked_container.remove.assert_called_once_with(force=True)
+
+
+async def test_docker_plugin_test_without_limits(
+    mocked_api: MockRouter,
+    mocked_container,
+    mocker: MockerFixture,
+    tmp_path: Path,
+):
+    """限制设置为 0 时不限制容器资源"""
+    from src.providers.docker_test import DockerPluginTest
+
+    mocker.patch("src.providers.docker_test.PLUGIN_TEST_DIR", tmp_path)
+
+    mocked_container.logs.return_value = json.dumps(
+        {"run": True, "load": True, "output": "test"}
+    ).encode()
+    mocked_client = mocker.Mock()
+    mocked_client.containers.run.return_value = mocked_container
+    mocker.patch("docker.DockerClient", return_value=mocked_client)
+
+    result = await DockerPluginTest(
+        "project_link", "module_name", cpus=0, memory=0
+    ).run("3.12")
+
+    assert result.load
+    run_kwargs = mocked_client.containers.run.call_args.kwargs
+    assert "nano_cpus" not in run_kwargs
+    assert "mem_limit" not in run_kwargs
@@ -1,6 +1,7 @@
 import json
 from pathlib import Path
 
+import pytest
 from inline_snapshot import snapshot
 from pytest_mock import MockerFixture
 
@@ -178,6 +179,8 @@ pydantic==2.10.0 ; python_version >= "3.9" and python_version < "4.0"
             "version": "0.5.0",
             "config": "test=123",
             "test_env": "python==3.12.7 nonebot2==2.4.0 pydantic==2.10.0",
+            "deps": {},
+            "timings": {"create": 0.0, "show": 0.0, "export": 0.0, "load": 0.0},
         }
     )
 
@@ -592,3 +595,60 @@ async def test_get_plugin_list(mocker: MockerFixture):
     }
 
     mock_get.assert_called_once()
+
+
+async def test_plugin_test_get_dep_versions(mocker: MockerFixture):
+    """记录依赖的商店插件及其版本，不包括插件自己"""
+    from src.providers.docker_test.plugin_test import PluginTest
+
+    mocker.patch(
+        "src.providers.docker_test.plugin_test.get_plugin_list",
+        return_value={
+            "nonebot-plugin-treehelp": "nonebot_plugin_treehelp",
+            "nonebot-plugin-localstore": "nonebot_plugin_localstore",
+        },
+    )
+
+    test = PluginTest("3.12", "nonebot-plugin-treehelp", "nonebot_plugin_treehelp")
+    requirements = {
+        "nonebot-plugin-treehelp": "0.5.0",
+        "nonebot-plugin-localstore": "0.7.0",
+        "nonebot2": "2.4.0",
+    }
+
+    assert test._get_dep_versions(requirements) == {
+        "nonebot-plugin-localstore": "0.7.0"
+    }
+    assert test._get_deps(requirements) == ["nonebot_plugin_localstore"]
+
+
+async def test_plugin_test_command_stream(
+    capsys: pytest.CaptureFixture[str], tmp_path: Path
+):
+    """命令输出在运行时写入标准错误流，标准输出流只用于输出测试结果"""
+    from src.providers.docker_test.plugin_test import PluginTest
+
+    test = PluginTest("3.12", "project_link", "module_name")
+    test._test_dir = tmp_path
+
+    code, stdout, stderr = await test.command("echo out; echo err >&2")
+
+    assert code
+    assert stdout == "out\n"
+    assert stderr == "err\n"
+    captured = capsys.readouterr()
+    assert captured.out == ""
+    assert sorted(captured.err.splitlines()) == ["err", "out"]
+
+
+async def test_plugin_test_command_timeout(tmp_path: Path):
+    """命令超时后仍返回已有的输出"""
+    from src.providers.docker_test.plugin_test import PluginTest
+
+    test = PluginTest("3.12", "project_link", "module_name")
+    test._test_dir = tmp_path
+
+    code, stdout, _ = await test.command("echo start; exec sleep 10", timeout=0.5)  # type: ignore
+
+    assert not code
+    assert stdout == "执行命令超时\nstart\n"
@@ -0,0 +1,90 @@
+import asyncio
+from pathlib import Path
+
+from pytest_mock import MockerFixture
+
+
+async def test_scheduler_wait_for_resources(mocker: MockerFixture):
+    """预留的资源总和不超过可用资源，其他容器结束后再启动"""
+    from src.providers.docker_test.scheduler import ResourceScheduler
+
+    mocker.patch(
+        "src.providers.docker_test.scheduler.available_memory", return_value=None
+    )
+    scheduler = ResourceScheduler(cpus=4, memory=4096)
+    started: list[str] = []
+    release = asyncio.Event()
+
+    async def run(name: str, cpus: float, memory: int):
+        async with scheduler.reserve(cpus, memory):
+            started.append(name)
+            await release.wait()
+
+    tasks = [
+        asyncio.create_task(run("a", 2, 2048)),
+        asyncio.create_task(run("b", 2, 1024)),
+        asyncio.create_task(run("c", 1, 512)),
+    ]
+    await asyncio.sleep(0.01)
+
+    assert started == ["a", "b"]
+    assert scheduler.running == 2
+    assert scheduler.reserved_cpus == 4
+    assert scheduler.reserved_memory == 3072
+
+    release.set()
+    await asyncio.gather(*tasks)
+
+    assert started == ["a", "b", "c"]
+    assert scheduler.running == 0
+    assert scheduler.reserved_cpus == 0
+    assert scheduler.reserved_memory == 0
+
+
+async def test_scheduler_exceed_host():
+    """没有容器运行时，即使限制超过可用资源也允许启动"""
+    from src.providers.docker_test.scheduler import ResourceScheduler
+
+    scheduler = ResourceScheduler(cpus=1, memory=1024)
+
+    async with scheduler.reserve(2, 4096):
+        assert scheduler.running == 1
+        assert not scheduler.fits(0, 0)
+
+
+async def test_scheduler_available_memory(mocker: MockerFixture):
+    """宿主机当前可用内存不足时，等待内存释放后再启动"""
+    from src.providers.docker_test.scheduler import ResourceScheduler
+
+    mocker.patch("src.providers.docker_test.scheduler.DOCKER_POLL_INTERVAL", 0.01)
+    mocked_available_memory = mocker.patch(
+        "src.providers.docker_test.scheduler.available_memory", return_value=512
+    )
+    scheduler = ResourceScheduler(cpus=4, memory=4096)
+
+    async with scheduler.reserve(1, 1024):
+        task = asyncio.create_task(scheduler.reserve(1, 1024).__aenter__())
+        await asyncio.sleep(0.05)
+        assert not task.done()
+
+        mocked_available_memory.return_value = 2048
+        await asyncio.wait_for(task, 1)
+        assert scheduler.running == 2
+
+
+def test_available_memory(mocker: MockerFixture, tmp_path: Path):
+    from src.providers.docker_test.scheduler import available_memory
+
+    meminfo = tmp_path / "meminfo"
+    meminfo.write_text(
+        "MemTotal:       16384000 kB\nMemFree:         1024000 kB\n"
+        "MemAvailable:    8192000 kB\n",
+        encoding="utf-8",
+    )
+    mocker.patch("src.providers.docker_test.scheduler.MEMINFO_PATH", meminfo)
+    assert available_memory() == 8000
+
+    mocker.patch(
+        "src.providers.docker_test.scheduler.MEMINFO_PATH", tmp_path / "missing"
+    )
+    assert available_memory() is None
@@ -1,5 +1,7 @@
+import xmlrpc.client
 from pathlib import Path
 
+import httpx
 import pytest
 from pytest_mock import MockerFixture
 from respx import MockRouter
@@ -21,6 +23,11 @@ def mocked_store_data(
         "plugins": plugin_test_path / "plugins.json",
         "results": plugin_test_path / "results.json",
         "plugin_configs": plugin_test_path / "plugin_configs.json",
+        "pypi_serial": plugin_test_path / "pypi_serial.json",
+        "checkpoint": plugin_test_path / "checkpoint.jsonl",
+        "history": plugin_test_path / "history.db",
+        "metrics_json": plugin_test_path / "metrics.json",
+        "metrics_prometheus": plugin_test_path / "metrics.prom",
     }
 
     mocker.patch.object(store, "RESULTS_PATH", paths["results"])
@@ -29,5 +36,84 @@ def mocked_store_data(
     mocker.patch.object(store, "DRIVERS_PATH", paths["drivers"])
     mocker.patch.object(store, "PLUGINS_PATH", paths["plugins"])
     mocker.patch.object(store, "PLUGIN_CONFIG_PATH", paths["plugin_configs"])
+    mocker.patch.object(store, "PYPI_SERIAL_PATH", paths["pypi_serial"])
+    mocker.patch.object(store, "CHECKPOINT_PATH", paths["checkpoint"])
+    mocker.patch.object(store, "HISTORY_PATH", paths["history"])
+    mocker.patch.object(store, "METRICS_JSON_PATH", paths["metrics_json"])
+    mocker.patch.object(store, "METRICS_PROMETHEUS_PATH", paths["metrics_prometheus"])
 
     return paths
+
+
+@pytest.fixture
+def mocked_pypi_changelog(
+    respx_mock: MockRouter,
+) -> list[tuple[str, str, int, str, int]]:
+    """模拟 PyPI 的 XML-RPC 变更记录接口
+
+    返回的列表即为变更记录，可在测试中修改
+    """
+    from src.providers.constants import PYPI_XMLRPC_URL
+
+    events: list[tuple[str, str, int, str, int]] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        params, method = xmlrpc.client.loads(request.content)
+        match method:
+            case "changelog_last_serial":
+                result = max((event[4] for event in events), default=0)
+            case "changelog_since_serial":
+                result = [event for event in events if event[4] > params[0]]
+            case _:
+                return httpx.Response(
+                    200,
+                    content=xmlrpc.client.dumps(
+                        xmlrpc.client.Fault(1, f"unknown method {method}"),
+                        methodresponse=True,
+                    ),
+                )
+        return httpx.Response(
+            200, content=xmlrpc.client.dumps((result,), methodresponse=True)
+        )
+
+    respx_mock.post(PYPI_XMLRPC_URL, name="pypi_xmlrpc").mock(side_effect=handler)
+    return events
+
+
+@pytest.fixture
+def fake_validate_plugin():
+    """模拟 validate_plugin，所有插件都测试通过，版本号为 1.0.0"""
+    from src.providers.models import RegistryPlugin, StorePlugin, StoreTestResult
+
+    async def validate_plugin(
+        store_plugin: StorePlugin,
+        config: str,
+        previous_plugin: RegistryPlugin | None = None,
+        **kwargs,
+    ) -> tuple[StoreTestResult, RegistryPlugin]:
+        return (
+            StoreTestResult(
+                time="2023-08-28T00:00:00.000000+08:00",
+                version="1.0.0",
+                results={"validation": True, "load": True, "metadata": True},
+                outputs={"validation": None, "load": "", "metadata": None},
+            ),
+            RegistryPlugin(
+                name=store_plugin.module_name,
+                module_name=store_plugin.module_name,
+                author="he0119",
+                version="1.0.0",
+                desc="desc",
+                homepage="https://nonebot.dev/",
+                project_link=store_plugin.project_link,
+                tags=[],
+                supported_adapters=None,
+                type="application",
+                time="2023-08-28T00:00:00.000000+08:00",
+                is_official=False,
+                valid=True,
+                skip_test=False,
+            ),
+        )
+
+    return validate_plugin
@@ -0,0 +1,97 @@
+from pathlib import Path
+
+from inline_snapshot import snapshot
+
+
+def make_result(time: str, load: bool = True, version: str = "1.0.0"):
+    from src.providers.models import StoreTestResult
+
+    return StoreTestResult(
+        time=time,
+        version=version,
+        results={"validation": True, "load": load, "metadata": True},
+        outputs={"validation": None, "load": "", "metadata": None},
+        duration=10,
+    )
+
+
+def test_history_extend_and_query(tmp_path: Path):
+    """重复追加同一次测试不会产生新记录，可以按条件查询"""
+    from src.providers.store_test.history import ResultHistory
+
+    with ResultHistory(tmp_path / "history.db") as history:
+        assert (
+            history.extend(
+                {
+                    "a": make_result("2024-01-01T08:00:00+08:00"),
+                    "b": make_result("2024-01-02T00:00:00Z", load=False),
+                }
+            )
+            == 2
+        )
+        assert history.extend({"a": make_result("2024-01-01T08:00:00+08:00")}) == 0
+        assert (
+            history.extend(
+                {"a": make_result("2024-01-03T00:00:00Z", load=False, version="1.1.0")}
+            )
+            == 1
+        )
+
+        assert [(r.key, r.result.version) for r in history.query(key="a")] == snapshot(
+            [("a", "1.0.0"), ("a", "1.1.0")]
+        )
+        assert [r.key for r in history.query(outcome="failed")] == snapshot(["b", "a"])
+        # 不同时区的时间统一比较
+        assert [
+            r.result.time
+            for r in history.query(
+                since="2024-01-01T00:00:00Z", until="2024-01-02T08:00:00+08:00"
+            )
+        ] == snapshot(["2024-01-01T08:00:00+08:00"])
+
+        latest = history.latest(["b", "a", "c"])
+        assert list(latest) == ["b", "a"]
+        assert latest["a"].version == "1.1.0"
+
+
+def test_history_compact(tmp_path: Path):
+    """压缩时每个插件只保留最近的记录"""
+    from src.providers.store_test.history import ResultHistory
+
+    with ResultHistory(tmp_path / "history.db") as history:
+        for day in range(1, 4):
+            history.extend(
+                {
+                    "a": make_result(f"2024-01-0{day}T00:00:00Z"),
+                    "b": make_result(f"2024-01-0{day}T00:00:00Z"),
+                }
+            )
+
+        assert history.compact(2) == 2
+        assert [(r.key, r.result.time) for r in history.query()] == snapshot(
+            [
+                ("a", "2024-01-02T00:00:00Z"),
+                ("b", "2024-01-02T00:00:00Z"),
+                ("a", "2024-01-03T00:00:00Z"),
+                ("b", "2024-01-03T00:00:00Z"),
+            ]
+        )
+        assert history.compact(2) == 0
+
+
+def test_history_out_of_order(tmp_path: Path):
+    """追加顺序与测试时间不一致时，按测试时间选取最近的记录"""
+    from src.providers.store_test.history import ResultHistory
+
+    with ResultHistory(tmp_path / "history.db") as history:
+        history.extend({"a": make_result("2024-01-03T00:00:00Z", version="1.2.0")})
+        history.extend({"a": make_result("2024-01-01T00:00:00Z", version="1.0.0")})
+        history.extend({"a": make_result("2024-01-02T00:00:00Z", version="1.1.0")})
+
+        assert history.latest(["a"])["a"].version == "1.2.0"
+
+        # 删除测试时间最早的记录，查询结果仍按追加顺序
+        assert history.compact(2) == 1
+        assert [r.result.version for r in history.query(key="a")] == snapshot(
+            ["1.2.0", "1.1.0"]
+        )
@@ -54,7 +54,7 @@ async def test_step_summary(
         ),
     }
 
-    store = StoreTest()
+    store = await StoreTest.create()
     assert snapshot(
         """\
 # 📃 商店测试结果
@@ -73,3 +73,89 @@ async def test_step_summary(
 - NOT_AC
 """
     ) == store.generate_github_summary(results=store_test)
+
+
+async def test_step_summary_stale(
+    mocked_store_data: dict[str, Path], mocked_api: MockRouter
+) -> None:
+    """显示有新版本的插件数量"""
+    from src.providers.store_test.store import StoreTest
+
+    store = await StoreTest.create()
+    assert snapshot(
+        """\
+# 📃 商店测试结果
+
+> 📅 2023-08-23 09:22:14 CST
+> 🆕 有新版本：3 个
+> ♻️ 共测试 0 个插件
+> ✅ 更新成功：0 个
+> ❌ 更新失败：0 个
+
+## 通过测试插件列表
+
+
+
+## 未通过测试插件列表
+
+
+"""
+    ) == store.generate_github_summary(results={}, stale=3)
+
+
+async def test_step_summary_timings(
+    mocked_store_data: dict[str, Path], mocked_api: MockRouter
+) -> None:
+    """记录了耗时的插件按总耗时从长到短显示在表格中"""
+    from src.providers.models import StoreTestResult
+    from src.providers.store_test.store import StoreTest
+
+    def result(
+        duration: float | None, timings: dict[str, float] | None
+    ) -> StoreTestResult:
+        return StoreTestResult(
+            outputs={"validation": None, "load": "", "metadata": None},
+            results={"validation": True, "load": True, "metadata": True},
+            version="0.1.0",
+            duration=duration,
+            timings=timings,
+        )
+
+    results = {
+        "FAST": result(30, {"container": 28, "create": 20, "load": 5, "parse": 0.01}),
+        "SLOW": result(
+            None, {"container": 300, "create": 200, "export": 3, "load": 90}
+        ),
+        "NO_TIMINGS": result(10, None),
+    }
+
+    store = await StoreTest.create()
+    assert store.generate_timing_table(results) == snapshot(
+        """\
+| 插件 | 总耗时 | 容器 | 创建项目 | 获取依赖 | 加载插件 | 解析结果 |
+| --- | ---: | ---: | ---: | ---: | ---: | ---: |
+| SLOW | 300.0s | 300.0s | 200.0s | 3.0s | 90.0s | - |
+| FAST | 30.0s | 28.0s | 20.0s | - | 5.0s | 0.0s |\
+"""
+    )
+    assert "## 测试耗时" in store.generate_github_summary(results)
+    assert store.generate_timing_table({"NO_TIMINGS": results["NO_TIMINGS"]}) == ""
+
+
+async def test_step_summary_image(
+    mocked_store_data: dict[str, Path], mocked_api: MockRouter
+) -> None:
+    """显示测试镜像与拉取耗时"""
+    from src.providers.docker_test import DockerImage
+    from src.providers.store_test.store import StoreTest
+
+    store = await StoreTest.create()
+    store._image = DockerImage(
+        "ghcr.io/nonebot/nonetest:latest",
+        "ghcr.io/nonebot/nonetest@sha256:abc",
+        12.5,
+    )
+    assert (
+        "> 🐳 测试镜像：ghcr.io/nonebot/nonetest@sha256:abc（拉取耗时 12.5 秒）\n"
+        in store.generate_github_summary(results={})
+    )
@@ -19,7 +19,7 @@ async def test_registry_update_adapter(
     )
     from src.providers.store_test.store import StoreTest
 
-    test = StoreTest()
+    test = await StoreTest.create()
 
     # 创建一个新的适配器数据
     new_adapter = RegistryAdapter(
@@ -73,7 +73,7 @@ async def test_registry_update_bot(
     )
     from src.providers.store_test.store import StoreTest
 
-    test = StoreTest()
+    test = await StoreTest.create()
 
     # 创建一个新的机器人数据
     new_bot = RegistryBot(
@@ -121,7 +121,7 @@ async def test_registry_update_driver(
     )
     from src.providers.store_test.store import StoreTest
 
-    test = StoreTest()
+    test = await StoreTest.create()
 
     # 创建一个新的驱动器数据
     new_driver = RegistryDriver(
@@ -176,7 +176,7 @@ async def test_registry_update_plugin_with_result(
     )
     from src.providers.store_test.store import StoreTest
 
-    test = StoreTest()
+    test = await StoreTest.create()
 
     # 创建一个新的插件数据
     new_plugin = RegistryPlugin(
@@ -256,7 +256,7 @@ async def test_registry_update_existing_key_not_updated(
     )
     from src.providers.store_test.store import StoreTest
 
-    test = StoreTest()
+    test = await StoreTest.create()
 
     # 获取一个已存在的插件 key
     existing_key = next(iter(test._previous_plugins.keys()))
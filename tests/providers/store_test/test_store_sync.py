@@ -23,7 +23,7 @@ async def test_store_sync(
     from src.providers.store_test.store import StoreTest
     from src.providers.utils import get_url
 
-    test = StoreTest()
+    test = await StoreTest.create()
     await test.run(0, 0, False)
 
     assert load_json(mocked_store_data["adapters"]) == snapshot(
@@ -232,7 +232,7 @@ async def test_store_sync(
     # 缓存了 PyPI 数据，需要清除缓存
     get_url.cache_clear()
 
-    test = StoreTest()
+    test = await StoreTest.create()
     await test.run(0, 0, False)
 
     assert load_json(mocked_store_data["adapters"]) == snapshot(
@@ -420,7 +420,7 @@ async def test_store_sync_removes_stale_registry_data(
     from src.providers.constants import BOT_KEY_TEMPLATE, PYPI_KEY_TEMPLATE
     from src.providers.store_test.store import StoreTest
 
-    test = StoreTest()
+    test = await StoreTest.create()
 
     adapter_key = PYPI_KEY_TEMPLATE.format(
         project_link="nonebot-adapter-onebot",
@@ -547,7 +547,7 @@ async def test_store_sync_validation_failed(
         "https://github.com/cscs181/QQ-GitHub-Bot", name="homepage_qq_github_bot"
     ).respond(404)
 
-    test = StoreTest()
+    test = await StoreTest.create()
     await test.run(0, 0, False)
 
     assert load_json(mocked_store_data["adapters"]) == snapshot(
@@ -694,3 +694,130 @@ async def test_store_sync_validation_failed(
             },
         }
     )
+
+
+async def test_sync_registry_data_concurrently() -> None:
+    """并发同步数据
+
+    同时同步的数量不超过上限，结果顺序与出错处理和逐个同步时一致
+    """
+    import asyncio
+    import threading
+    import time
+
+    from src.providers.store_test.store import StoreTest
+
+    lock = threading.Lock()
+    running = 0
+    max_running = 0
+
+    def track(value: str) -> str:
+        nonlocal running, max_running
+        with lock:
+            running += 1
+            max_running = max(max_running, running)
+        time.sleep(0.02)
+        with lock:
+            running -= 1
+        if value.startswith("bad"):
+            raise ValueError(f"{value} 无效")
+        return value.upper()
+
+    store_data = {f"key{i}": "bad" if i in (1, 4) else f"v{i}" for i in range(6)}
+    previous_data = {"key0": "old0", "key1": "old1", "stale": "stale"}
+
+    synced = await StoreTest._sync_registry_data(
+        previous_data,
+        store_data,
+        "测试",
+        lambda previous, store: track(store),
+        track,
+        asyncio.Semaphore(3),
+    )
+
+    assert synced == snapshot(
+        {"key0": "V0", "key1": "old1", "key2": "V2", "key3": "V3", "key5": "V5"}
+    )
+    assert list(synced) == ["key0", "key1", "key2", "key3", "key5"]
+    assert 1 < max_running <= 3
+
+
+async def test_registry_plugin_update_author(
+    mocked_api: MockRouter, mocker: MockerFixture
+) -> None:
+    """商店中的 author_id 变化后，更新注册表中的作者名字
+
+    没有 Token 且缓存中没有时不请求，保留原来的作者名字
+    """
+    from src.providers.models import RegistryPlugin, StorePlugin
+
+    plugin = RegistryPlugin(
+        module_name="nonebot_plugin_treehelp",
+        project_link="nonebot-plugin-treehelp",
+        name="帮助",
+        desc="获取插件帮助信息",
+        author="he0119",
+        homepage="https://github.com/he0119/nonebot-plugin-treehelp",
+        tags=[],
+        is_official=False,
+        type="application",
+        supported_adapters=None,
+        valid=True,
+        time="2024-07-13T04:41:40.905441Z",
+        version="0.5.0",
+        skip_test=False,
+    )
+    store = StorePlugin(
+        module_name="nonebot_plugin_treehelp",
+        project_link="nonebot-plugin-treehelp",
+        author_id=2,
+        tags=[],
+        is_official=False,
+    )
+
+    assert plugin.update(store).author == "he0119"
+    assert not mocked_api["github_username_2"].called
+
+    mocker.patch("src.providers.utils.GITHUB_TOKEN", "token")
+    assert plugin.update(store).author == "BigOrangeQWQ"
+    assert mocked_api["github_username_2"].calls.last.request.headers[
+        "Authorization"
+    ] == ("bearer token")
+
+
+async def test_registry_plugin_update_author_failed(
+    mocked_api: MockRouter, mocker: MockerFixture
+) -> None:
+    """获取作者名字失败时保留原来的作者名字，其他数据仍然更新"""
+    from src.providers.models import RegistryPlugin, StorePlugin
+
+    mocker.patch("src.providers.utils.GITHUB_TOKEN", "token")
+    mocked_api.get("https://api.github.com/user/3").respond(403)
+
+    plugin = RegistryPlugin(
+        module_name="nonebot_plugin_treehelp",
+        project_link="nonebot-plugin-treehelp",
+        name="帮助",
+        desc="获取插件帮助信息",
+        author="he0119",
+        homepage="https://github.com/he0119/nonebot-plugin-treehelp",
+        tags=[],
+        is_official=False,
+        type="application",
+        supported_adapters=None,
+        valid=True,
+        time="2024-07-13T04:41:40.905441Z",
+        version="0.5.0",
+        skip_test=False,
+    )
+    store = StorePlugin(
+        module_name="nonebot_plugin_treehelp",
+        project_link="nonebot-plugin-treehelp",
+        author_id=3,
+        tags=[],
+        is_official=True,
+    )
+
+    updated = plugin.update(store)
+    assert updated.author == "he0119"
+    assert updated.is_official
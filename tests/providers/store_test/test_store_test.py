@@ -1,3 +1,4 @@
+import json
 from pathlib import Path
 
 import httpx
@@ -6,6 +7,18 @@ from pytest_mock import MockerFixture
 from respx import MockRouter
 
 
+def store_data_files(paths: dict[str, Path]) -> dict[str, Path]:
+    """测试输出的数据文件
+
+    运行指标与历史记录与测试过程有关，不需要一致，所以不包括在内
+    """
+    return {
+        name: path
+        for name, path in paths.items()
+        if path.exists() and not name.startswith("metrics") and name != "history"
+    }
+
+
 async def test_store_test(
     mocked_store_data: dict[str, Path], mocked_api: MockRouter, mocker: MockerFixture
 ) -> None:
@@ -15,6 +28,7 @@ async def test_store_test(
     第二插件验证通过
     因为 limit=1 所以只测试了一个插件，第三个插件未测试
     """
+    from src.providers.author_cache import get_author_cache
     from src.providers.store_test.store import (
         RegistryPlugin,
         StorePlugin,
@@ -22,6 +36,9 @@ async def test_store_test(
         StoreTestResult,
     )
 
+    # 作者名字已在之前的运行中缓存，同步商店数据时会更新注册表中的作者名字
+    get_author_cache().set(1, "he0119")
+
     mocked_validate_plugin = mocker.patch(
         "src.providers.store_test.store.validate_plugin"
     )
@@ -62,7 +79,7 @@ async def test_store_test(
         ),
     )
 
-    test = StoreTest()
+    test = await StoreTest.create()
     await test.run(1, 0, False)
 
     mocked_validate_plugin.assert_called_once_with(
@@ -90,6 +107,7 @@ async def test_store_test(
             skip_test=False,
         ),
         config="TEST_CONFIG=true",
+        timeout=1260,
     )
     assert mocked_api["pypi_nonebot-plugin-treehelp"].called
     assert mocked_api["pypi_nonebot-plugin-datastore"].called
@@ -104,7 +122,7 @@ async def test_store_test(
         '[{"module_name":"~none","project_link":"","name":"None","desc":"None 驱动器","author":"yanyongyu","homepage":"/docs/advanced/driver","tags":[{"label":"sync","color":"#ffffff"}],"is_official":true,"time":"2024-10-31T13:47:14.152851Z","version":"2.4.0"},{"module_name":"~fastapi","project_link":"nonebot2[fastapi]","name":"FastAPI","desc":"FastAPI 驱动器","author":"yanyongyu","homepage":"/docs/advanced/driver","tags":[],"is_official":true,"time":"2024-10-31T13:47:14.152851Z","version":"2.4.0"},{"module_name":"~quart","project_link":"nonebot2[quart]","name":"Quart","desc":"Quart 驱动器","author":"he0119","homepage":"/docs/advanced/driver","tags":[],"is_official":true,"time":"2024-10-31T13:47:14.152851Z","version":"2.4.0"}]'
     )
     assert mocked_store_data["plugins"].read_text(encoding="utf-8") == snapshot(
-        '[{"module_name":"nonebot_plugin_datastore","project_link":"nonebot-plugin-datastore","name":"数据存储","desc":"NoneBot 数据存储插件","author":"he0119","homepage":"https://github.com/he0119/nonebot-plugin-datastore","tags":[{"label":"sync","color":"#ffffff"}],"is_official":false,"type":"library","supported_adapters":null,"valid":true,"time":"2024-06-20T07:53:23.524486Z","version":"1.3.0","skip_test":false},{"module_name":"nonebot_plugin_treehelp","project_link":"nonebot-plugin-treehelp","name":"帮助","desc":"获取插件帮助信息","author":"author","homepage":"https://nonebot.dev/","tags":[],"is_official":false,"type":"application","supported_adapters":null,"valid":true,"time":"2023-08-28T00:00:00.000000+08:00","version":"0.3.0","skip_test":false}]'
+        '[{"module_name":"nonebot_plugin_datastore","project_link":"nonebot-plugin-datastore","name":"数据存储","desc":"NoneBot 数据存储插件","author":"he0119","homepage":"https://github.com/he0119/nonebot-plugin-datastore","tags":[{"label":"sync","color":"#ffffff"}],"is_official":false,"type":"library","supported_adapters":null,"valid":true,"time":"2024-06-20T07:53:23.524486Z","version":"1.3.0","skip_test":false},{"module_name":"nonebot_plugin_treehelp","project_link":"nonebot-plugin-treehelp","name":"帮助","desc":"获取插件帮助信息","author":"he0119","homepage":"https://nonebot.dev/","tags":[],"is_official":false,"type":"application","supported_adapters":null,"valid":true,"time":"2023-08-28T00:00:00.000000+08:00","version":"0.3.0","skip_test":false}]'
     )
     assert mocked_store_data["results"].read_text(encoding="utf-8") == snapshot(
         '{"nonebot-plugin-datastore:nonebot_plugin_datastore":{"time":"2023-06-26T22:08:18.945584+08:00","config":"","version":"1.3.0","test_env":null,"results":{"validation":true,"load":true,"metadata":true},"outputs":{"validation":null,"load":"datastore","metadata":{"name":"数据存储","description":"NoneBot 数据存储插件","usage":"请参考文档","type":"library","homepage":"https://github.com/he0119/nonebot-plugin-datastore","supported_adapters":null}}},"nonebot-plugin-treehelp:nonebot_plugin_treehelp":{"time":"2023-08-28T00:00:00.000000+08:00","config":"","version":"1.0.0","test_env":null,"results":{"load":true,"metadata":true,"validation":true},"outputs":{"load":"output","metadata":{"name":"帮助","description":"获取插件帮助信息","usage":"获取插件列表\\n/help\\n获取插件树\\n/help -t\\n/help --tree\\n获取某个插件的帮助\\n/help 插件名\\n获取某个插件的树\\n/help --tree 插件名\\n","type":"application","homepage":"https://nonebot.dev/","supported_adapters":null},"validation":null}}}'
@@ -120,17 +138,20 @@ async def test_store_test(
 
 
 async def test_store_test_with_key(
-    mocked_store_data: dict[str, Path], mocked_api: MockRouter, mocker: MockerFixture
+    mocked_store_data: dict[str, Path],
+    mocked_api: MockRouter,
+    mocker: MockerFixture,
+    fake_validate_plugin,
 ) -> None:
     """测试指定插件，因为版本更新正常测试"""
     from src.providers.store_test.store import RegistryPlugin, StorePlugin, StoreTest
 
     mocked_validate_plugin = mocker.patch(
-        "src.providers.store_test.store.validate_plugin"
+        "src.providers.store_test.store.validate_plugin",
+        side_effect=fake_validate_plugin,
     )
-    mocked_validate_plugin.return_value = ({}, {})
 
-    test = StoreTest()
+    test = await StoreTest.create()
     await test.run_single_plugin(key="nonebot-plugin-treehelp:nonebot_plugin_treehelp")
 
     mocked_validate_plugin.assert_called_once_with(
@@ -158,11 +179,19 @@ async def test_store_test_with_key(
             skip_test=False,
         ),
         config="TEST_CONFIG=true",
+        timeout=1260,
     )
 
     assert mocked_api["pypi_nonebot-plugin-treehelp"].called
     assert not mocked_api["pypi_nonebot-plugin-datastore"].called
 
+    results = json.loads(mocked_store_data["results"].read_text(encoding="utf-8"))
+    assert results["nonebot-plugin-treehelp:nonebot_plugin_treehelp"]["version"] == (
+        "1.0.0"
+    )
+    plugins = json.loads(mocked_store_data["plugins"].read_text(encoding="utf-8"))
+    assert [plugin["version"] for plugin in plugins] == snapshot(["1.3.0", "1.0.0"])
+
 
 async def test_store_test_with_key_skip(
     mocked_store_data: dict[str, Path], mocked_api: MockRouter, mocker: MockerFixture
@@ -174,7 +203,7 @@ async def test_store_test_with_key_skip(
         "src.providers.store_test.store.validate_plugin"
     )
 
-    test = StoreTest()
+    test = await StoreTest.create()
     await test.run_single_plugin(
         key="nonebot-plugin-datastore:nonebot_plugin_datastore"
     )
@@ -210,7 +239,7 @@ async def test_store_test_raise(
     )
     mocked_validate_plugin.side_effect = Exception
 
-    test = StoreTest()
+    test = await StoreTest.create()
     await test.run(limit=1)
 
     mocked_validate_plugin.assert_has_calls(
@@ -225,6 +254,7 @@ async def test_store_test_raise(
                 ),
                 previous_plugin=None,
                 config="",
+                timeout=1260,
             ),  # type: ignore
         ]
     )
@@ -304,7 +334,7 @@ async def test_store_test_with_recent_parameter(
     )
 
     # Mock get_plugins_sorted_by_test_time 方法来验证调用
-    test = StoreTest()
+    test = await StoreTest.create()
     mocked_get_sorted = mocker.patch.object(test, "get_plugins_sorted_by_test_time")
 
     # 设置预期的排序结果（按测试时间倒序）
@@ -349,6 +379,7 @@ async def test_store_test_with_recent_parameter(
             skip_test=False,
         ),
         config="TEST_CONFIG=true",
+        timeout=1260,
     )
 
 
@@ -358,7 +389,7 @@ async def test_get_plugins_sorted_by_test_time(
     """测试 get_plugins_sorted_by_test_time 方法的排序逻辑"""
     from src.providers.store_test.store import StoreTest
 
-    test = StoreTest()
+    test = await StoreTest.create()
     sorted_plugins = test.get_plugins_sorted_by_test_time()
 
     # 验证插件是否按测试时间倒序排列
@@ -385,7 +416,7 @@ async def test_store_test_with_key_raise(
     )
     mocked_validate_plugin.side_effect = Exception
 
-    test = StoreTest()
+    test = await StoreTest.create()
     await test.run_single_plugin(
         key="nonebot-plugin-wordcloud:nonebot_plugin_wordcloud"
     )
@@ -400,6 +431,7 @@ async def test_store_test_with_key_raise(
         ),
         previous_plugin=None,
         config="",
+        timeout=1260,
     )
 
     # 数据没有更新，只是被压缩
@@ -418,3 +450,916 @@ async def test_store_test_with_key_raise(
     assert mocked_store_data["results"].read_text(encoding="utf-8") == snapshot(
         '{"nonebot-plugin-datastore:nonebot_plugin_datastore":{"time":"2023-06-26T22:08:18.945584+08:00","config":"","version":"1.3.0","test_env":null,"results":{"validation":true,"load":true,"metadata":true},"outputs":{"validation":null,"load":"datastore","metadata":{"name":"数据存储","description":"NoneBot 数据存储插件","usage":"请参考文档","type":"library","homepage":"https://github.com/he0119/nonebot-plugin-datastore","supported_adapters":null}}},"nonebot-plugin-treehelp:nonebot_plugin_treehelp":{"time":"2023-06-26T22:20:41.833311+08:00","config":"","version":"0.3.0","test_env":null,"results":{"validation":true,"load":true,"metadata":true},"outputs":{"validation":null,"load":"treehelp","metadata":{"name":"帮助","description":"获取插件帮助信息","usage":"获取插件列表\\n/help\\n获取插件树\\n/help -t\\n/help --tree\\n获取某个插件的帮助\\n/help 插件名\\n获取某个插件的树\\n/help --tree 插件名\\n","type":"application","homepage":"https://github.com/he0119/nonebot-plugin-treehelp","supported_adapters":null}}}}'
     )
+
+
+async def test_store_test_with_jobs(
+    mocked_store_data: dict[str, Path],
+    mocked_api: MockRouter,
+    mocker: MockerFixture,
+    fake_validate_plugin,
+) -> None:
+    """并行测试插件
+
+    第一个插件因为版本号无变化跳过，后两个插件同时测试
+    测试完成顺序与插件顺序不同，但结果仍按插件顺序保存
+    """
+    import asyncio
+
+    from src.providers.store_test.store import StoreTest
+
+    running = 0
+    max_running = 0
+
+    async def validate_plugin(store_plugin, config, previous_plugin, **kwargs):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        # 让第一个插件最后完成
+        delay = 0.05 if store_plugin.module_name == "nonebot_plugin_treehelp" else 0
+        await asyncio.sleep(delay)
+        running -= 1
+        return await fake_validate_plugin(
+            store_plugin, config, previous_plugin, **kwargs
+        )
+
+    mocker.patch(
+        "src.providers.store_test.store.validate_plugin", side_effect=validate_plugin
+    )
+
+    test = await StoreTest.create()
+    new_results, new_plugins = await test.test_plugins(
+        limit=2, offset=0, force=False, jobs=2
+    )
+
+    assert max_running == 2
+    assert list(new_results) == snapshot(
+        [
+            "nonebot-plugin-treehelp:nonebot_plugin_treehelp",
+            "nonebot-plugin-wordcloud:nonebot_plugin_wordcloud",
+        ]
+    )
+    assert list(new_plugins) == list(new_results)
+
+
+async def test_store_test_with_jobs_raise(
+    mocked_store_data: dict[str, Path], mocked_api: MockRouter, mocker: MockerFixture
+) -> None:
+    """并行测试时插件测试报错，报错的插件不计入测试数量"""
+    from src.providers.store_test.store import StoreTest
+
+    mocked_validate_plugin = mocker.patch(
+        "src.providers.store_test.store.validate_plugin"
+    )
+    mocked_validate_plugin.side_effect = Exception
+
+    test = await StoreTest.create()
+    new_results, new_plugins = await test.test_plugins(
+        limit=1, offset=0, force=True, jobs=4
+    )
+
+    assert new_results == {}
+    assert new_plugins == {}
+    # 限制为 1 时只会同时启动一个测试，报错后继续测试下一个插件
+    assert mocked_validate_plugin.call_count == 3
+
+
+async def test_prefetch_versions(
+    mocked_store_data: dict[str, Path], mocked_api: MockRouter
+) -> None:
+    """预先获取插件最新版本号
+
+    没有上次测试结果的插件无需获取版本号
+    """
+    from src.providers.store_test.store import StoreTest
+
+    test = await StoreTest.create()
+    await test.prefetch_versions(list(test._store_plugins))
+
+    assert test._latest_versions == snapshot(
+        {
+            "nonebot-plugin-datastore:nonebot_plugin_datastore": "1.3.0",
+            "nonebot-plugin-treehelp:nonebot_plugin_treehelp": "0.5.0",
+        }
+    )
+    assert test.stale_count == 1
+    assert not mocked_api["pypi_nonebot-plugin-wordcloud"].called
+
+    # 获取版本号失败的插件不计入有新版本的插件
+    treehelp = test._latest_versions["nonebot-plugin-treehelp:nonebot_plugin_treehelp"]
+    test._latest_versions["nonebot-plugin-treehelp:nonebot_plugin_treehelp"] = None
+    assert test.stale_count == 0
+    test._latest_versions["nonebot-plugin-treehelp:nonebot_plugin_treehelp"] = treehelp
+
+    # 跳过判断直接使用预先获取的版本号
+    mocked_api.reset()
+    assert test.should_skip("nonebot-plugin-datastore:nonebot_plugin_datastore")
+    assert not test.should_skip("nonebot-plugin-treehelp:nonebot_plugin_treehelp")
+    assert not mocked_api["pypi_nonebot-plugin-datastore"].called
+    assert not mocked_api["pypi_nonebot-plugin-treehelp"].called
+
+
+async def test_plan_time_budget(
+    mocked_store_data: dict[str, Path], mocked_api: MockRouter
+) -> None:
+    """按时间预算挑选插件
+
+    有历史耗时的插件使用历史耗时，超出单个预算的插件直接跳过，
+    最后按预计耗时从长到短排列
+    """
+    from src.providers.store_test.store import StoreTest
+
+    test = await StoreTest.create()
+    test._previous_results[
+        "nonebot-plugin-datastore:nonebot_plugin_datastore"
+    ].duration = 100
+    test._previous_results[
+        "nonebot-plugin-treehelp:nonebot_plugin_treehelp"
+    ].duration = 700
+
+    keys = list(test._store_plugins)
+    assert test.plan_time_budget(keys, 600, 1, 300) == snapshot(
+        [
+            "nonebot-plugin-wordcloud:nonebot_plugin_wordcloud",
+            "nonebot-plugin-datastore:nonebot_plugin_datastore",
+        ]
+    )
+    assert test.plan_time_budget(keys, 200, 2, 150) == snapshot(
+        [
+            "nonebot-plugin-wordcloud:nonebot_plugin_wordcloud",
+            "nonebot-plugin-datastore:nonebot_plugin_datastore",
+        ]
+    )
+    assert test.plan_time_budget(keys, 50, 4, 300) == []
+
+
+async def test_estimate_duration(
+    mocked_store_data: dict[str, Path], mocked_api: MockRouter
+) -> None:
+    """优先使用容器运行耗时估计，不计入等待宿主机资源的时间"""
+    from src.providers.store_test.store import StoreTest
+
+    datastore = "nonebot-plugin-datastore:nonebot_plugin_datastore"
+
+    test = await StoreTest.create()
+    result = test._previous_results[datastore]
+    result.duration = None
+    assert test.estimate_duration(datastore, 300) == 300
+    assert test.estimate_duration("unknown", 300) == 300
+
+    result.duration = 500
+    assert test.estimate_duration(datastore, 300) == 500
+
+    result.timings = {"container": 120, "create": 80}
+    assert test.estimate_duration(datastore, 300) == 120
+
+
+async def test_store_test_with_time_budget(
+    mocked_store_data: dict[str, Path], mocked_api: MockRouter, mocker: MockerFixture
+) -> None:
+    """设置时间预算时忽略测试数量上限"""
+    from src.providers.store_test.store import StoreTest
+
+    mocked_validate_plugin = mocker.patch(
+        "src.providers.store_test.store.validate_plugin"
+    )
+    mocked_validate_plugin.side_effect = (
+        lambda store_plugin, config, previous_plugin, **kwargs: (
+            mocker.MagicMock(),
+            mocker.MagicMock(),
+        )
+    )
+    mocker.patch("src.providers.store_test.store.add_step_summary")
+    mocker.patch.object(StoreTest, "generate_github_summary", return_value="")
+    mocker.patch.object(StoreTest, "save_checkpoint")
+
+    test = await StoreTest.create()
+    new_results, _ = await test.test_plugins(
+        limit=0, offset=0, force=True, time_budget=600, default_duration=300
+    )
+
+    assert list(new_results) == snapshot(
+        [
+            "nonebot-plugin-datastore:nonebot_plugin_datastore",
+            "nonebot-plugin-treehelp:nonebot_plugin_treehelp",
+        ]
+    )
+    assert mocked_validate_plugin.call_count == 2
+
+
+async def test_iter_plugins_by_priority(
+    mocked_store_data: dict[str, Path], mocked_api: MockRouter
+) -> None:
+    """按优先级排序插件
+
+    新插件最先测试，其次是有新版本的插件
+    """
+    from src.providers.store_test.store import StoreTest
+
+    test = await StoreTest.create()
+    await test.prefetch_versions(list(test._store_plugins))
+
+    assert list(test.iter_plugins_by_priority()) == snapshot(
+        [
+            "nonebot-plugin-wordcloud:nonebot_plugin_wordcloud",
+            "nonebot-plugin-treehelp:nonebot_plugin_treehelp",
+            "nonebot-plugin-datastore:nonebot_plugin_datastore",
+        ]
+    )
+    # 可以自定义优先级
+    assert list(test.iter_plugins_by_priority(lambda key: 0)) == list(
+        test._store_plugins
+    )
+
+
+async def test_store_test_with_priority(
+    mocked_store_data: dict[str, Path], mocked_api: MockRouter, mocker: MockerFixture
+) -> None:
+    """按优先级测试插件，跳过无需测试的插件"""
+    from src.providers.store_test.store import StoreTest
+
+    mocked_validate_plugin = mocker.patch(
+        "src.providers.store_test.store.validate_plugin"
+    )
+    mocked_validate_plugin.side_effect = (
+        lambda store_plugin, config, previous_plugin, **kwargs: (
+            mocker.MagicMock(),
+            mocker.MagicMock(),
+        )
+    )
+    mocker.patch("src.providers.store_test.store.add_step_summary")
+    mocker.patch.object(StoreTest, "generate_github_summary", return_value="")
+    mocker.patch.object(StoreTest, "save_checkpoint")
+
+    test = await StoreTest.create()
+    new_results, _ = await test.test_plugins(
+        limit=3, offset=0, force=False, priority=True
+    )
+
+    assert list(new_results) == snapshot(
+        [
+            "nonebot-plugin-wordcloud:nonebot_plugin_wordcloud",
+            "nonebot-plugin-treehelp:nonebot_plugin_treehelp",
+        ]
+    )
+
+
+async def test_assign_shards(
+    mocked_store_data: dict[str, Path], mocked_api: MockRouter
+) -> None:
+    """按历史耗时将插件均衡地分配到各个分片"""
+    from src.providers.store_test.store import StoreTest
+
+    test = await StoreTest.create()
+    test._previous_results[
+        "nonebot-plugin-treehelp:nonebot_plugin_treehelp"
+    ].duration = 500
+    test._previous_results[
+        "nonebot-plugin-datastore:nonebot_plugin_datastore"
+    ].duration = 100
+
+    shards = test.assign_shards(2, 300)
+    assert shards == snapshot(
+        {
+            "nonebot-plugin-treehelp:nonebot_plugin_treehelp": 1,
+            "nonebot-plugin-wordcloud:nonebot_plugin_wordcloud": 2,
+            "nonebot-plugin-datastore:nonebot_plugin_datastore": 2,
+        }
+    )
+    # 分配结果与顺序无关
+    test._store_plugins = dict(reversed(test._store_plugins.items()))
+    assert test.assign_shards(2, 300) == shards
+    assert test.get_shard_keys((1, 2), 300) == {
+        "nonebot-plugin-treehelp:nonebot_plugin_treehelp"
+    }
+
+
+async def test_store_test_with_shard(
+    tmp_path: Path,
+    mocked_store_data: dict[str, Path],
+    mocked_api: MockRouter,
+    mocker: MockerFixture,
+    fake_validate_plugin,
+) -> None:
+    """分片测试后合并的结果与一次测试所有插件相同"""
+    from src.providers.models import StoreTestBundle
+    from src.providers.store_test import store
+    from src.providers.store_test.store import StoreTest
+
+    mocker.patch.object(store, "validate_plugin", side_effect=fake_validate_plugin)
+    mocker.patch.object(store, "TEST_DIR", tmp_path / "plugin_test")
+
+    test = await StoreTest.create()
+    await test.run(10, force=True)
+    expected = {
+        name: path.read_text(encoding="utf-8")
+        for name, path in store_data_files(mocked_store_data).items()
+    }
+    for path in mocked_store_data.values():
+        path.unlink(missing_ok=True)
+
+    bundles: list[StoreTestBundle] = []
+    for index in (1, 2):
+        test = await StoreTest.create()
+        await test.run(10, force=True, shard=(index, 2))
+        bundle = StoreTestBundle.model_validate_json(
+            (tmp_path / "plugin_test" / f"shard-{index}-of-2.json").read_bytes()
+        )
+        assert bundle.shard == (index, 2)
+        bundles.append(bundle)
+
+    # 分片测试不会写入注册表数据
+    assert not mocked_store_data["results"].exists()
+    assert sorted(key for bundle in bundles for key in bundle.results) == snapshot(
+        [
+            "nonebot-plugin-datastore:nonebot_plugin_datastore",
+            "nonebot-plugin-treehelp:nonebot_plugin_treehelp",
+            "nonebot-plugin-wordcloud:nonebot_plugin_wordcloud",
+        ]
+    )
+
+    test = await StoreTest.create()
+    await test.merge_bundles(bundles)
+    assert {
+        name: path.read_text(encoding="utf-8")
+        for name, path in store_data_files(mocked_store_data).items()
+    } == expected
+
+
+async def test_store_test_resume(
+    mocked_store_data: dict[str, Path],
+    mocked_api: MockRouter,
+    mocker: MockerFixture,
+    fake_validate_plugin,
+) -> None:
+    """继续上次中断的测试
+
+    已保存进度的插件不再测试，并计入测试数量
+    无法解析的记录会被忽略，测试完成后删除进度文件
+    """
+    from src.providers.store_test import store
+    from src.providers.store_test.store import StoreTest
+
+    mocked_validate_plugin = mocker.patch.object(
+        store, "validate_plugin", side_effect=fake_validate_plugin
+    )
+
+    # 测试了一个插件后中断
+    test = await StoreTest.create()
+    await test.test_plugins(limit=1, offset=0, force=True)
+    checkpoint = mocked_store_data["checkpoint"]
+    with checkpoint.open("a", encoding="utf-8") as f:
+        f.write('{"key": "nonebot-plugin-treehelp:nonebot_')
+    assert mocked_validate_plugin.call_count == 1
+
+    test = await StoreTest.create()
+    await test.run(2, force=True, resume=True)
+
+    assert mocked_validate_plugin.call_count == 2
+    assert (
+        mocked_validate_plugin.call_args.kwargs["store_plugin"].module_name
+        == "nonebot_plugin_treehelp"
+    )
+    assert not checkpoint.exists()
+    assert [
+        plugin["version"]
+        for plugin in json.loads(mocked_store_data["plugins"].read_text())
+    ] == snapshot(["1.0.0", "1.0.0"])
+
+
+async def test_store_test_resume_outdated(
+    mocked_store_data: dict[str, Path],
+    mocked_api: MockRouter,
+    fake_validate_plugin,
+) -> None:
+    """进度中不比已保存的测试结果新的记录已经过时，不会被恢复"""
+    from src.providers.models import StorePlugin, StoreTestCheckpoint
+    from src.providers.store_test.store import StoreTest
+
+    test = await StoreTest.create()
+    datastore = "nonebot-plugin-datastore:nonebot_plugin_datastore"
+    treehelp = "nonebot-plugin-treehelp:nonebot_plugin_treehelp"
+    previous = test._previous_results[datastore]
+
+    lines: list[str] = []
+    for key, time in [
+        # 与已保存的测试结果为同一次测试
+        (datastore, previous.time),
+        (treehelp, "2099-01-01T00:00:00+08:00"),
+    ]:
+        store_plugin = test._store_plugins[key]
+        assert isinstance(store_plugin, StorePlugin)
+        result, plugin = await fake_validate_plugin(store_plugin, "")
+        result.time = time
+        lines.append(
+            StoreTestCheckpoint(key=key, result=result, plugin=plugin).model_dump_json()
+        )
+    mocked_store_data["checkpoint"].write_text("\n".join(lines) + "\n")
+
+    results, plugins = test.load_checkpoint()
+
+    assert list(results) == [treehelp]
+    assert list(plugins) == [treehelp]
+
+
+async def test_store_test_without_resume(
+    mocked_store_data: dict[str, Path], mocked_api: MockRouter, mocker: MockerFixture
+) -> None:
+    """不继续测试时清除之前的进度"""
+    from src.providers.store_test.store import StoreTest
+
+    checkpoint = mocked_store_data["checkpoint"]
+    checkpoint.write_text("{}\n", encoding="utf-8")
+
+    test = await StoreTest.create()
+    await test.test_plugins(limit=0, offset=0, force=False)
+
+    assert not checkpoint.exists()
+
+
+async def test_should_skip_with_outdated_dependency(
+    mocked_store_data: dict[str, Path], mocked_api: MockRouter
+) -> None:
+    """依赖的插件发布新版本后，即使插件本身为最新版本也需要重新测试"""
+    from src.providers.store_test.store import StoreTest
+
+    datastore = "nonebot-plugin-datastore:nonebot_plugin_datastore"
+    treehelp = "nonebot-plugin-treehelp:nonebot_plugin_treehelp"
+
+    test = await StoreTest.create()
+    test._previous_results[datastore].deps = {"nonebot-plugin-treehelp": "0.4.0"}
+    test._dependents = test.build_dependents()
+    assert test._dependents == {treehelp: {datastore}}
+
+    # 获取插件版本号时同时获取依赖的版本号
+    await test.prefetch_versions([datastore])
+    assert test._latest_versions == snapshot(
+        {
+            "nonebot-plugin-datastore:nonebot_plugin_datastore": "1.3.0",
+            "nonebot-plugin-treehelp:nonebot_plugin_treehelp": "0.5.0",
+        }
+    )
+
+    assert test.get_outdated_dependencies(datastore) == [treehelp]
+    assert not test.should_skip(datastore)
+    # 只为判断依赖而获取版本号的插件不计入有新版本的插件
+    assert test.stale_count == 0
+    assert datastore in test.get_pending_keys()
+
+    # 依赖为测试时的版本，则跳过测试
+    test._previous_results[datastore].deps = {"nonebot-plugin-treehelp": "0.5.0"}
+    assert test.get_outdated_dependencies(datastore) == []
+    assert test.should_skip(datastore)
+
+
+async def test_should_skip_with_pinned_dependency(
+    mocked_store_data: dict[str, Path], mocked_api: MockRouter
+) -> None:
+    """插件限制了依赖的版本时，只在依赖于上次测试后发布新版本时重新测试"""
+    from src.providers.store_test.store import StoreTest
+
+    datastore = "nonebot-plugin-datastore:nonebot_plugin_datastore"
+    treehelp = "nonebot-plugin-treehelp:nonebot_plugin_treehelp"
+
+    test = await StoreTest.create()
+    test._previous_results[datastore].deps = {"nonebot-plugin-treehelp": "0.4.0"}
+    await test.prefetch_versions([datastore])
+    assert test._latest_versions[treehelp] == "0.5.0"
+
+    # 依赖的最新版本在插件上次测试前已经测试过，安装旧版本是因为插件限制了版本
+    treehelp_result = test._previous_results[treehelp]
+    treehelp_result.version = "0.5.0"
+    treehelp_result.time = "2023-06-26T00:00:00+08:00"
+    assert test.get_outdated_dependencies(datastore) == []
+    assert test.should_skip(datastore)
+    assert datastore not in test.get_pending_keys()
+
+    # 依赖的最新版本在插件上次测试后才测试，可能发布于上次测试后
+    treehelp_result.time = "2023-06-27T00:00:00+08:00"
+    assert test.get_outdated_dependencies(datastore) == [treehelp]
+    assert not test.should_skip(datastore)
+    assert datastore in test.get_pending_keys()
+
+
+async def test_store_test_incremental_dependents(
+    mocked_store_data: dict[str, Path],
+    mocked_api: MockRouter,
+    mocked_pypi_changelog: list[tuple[str, str, int, str, int]],
+    mocker: MockerFixture,
+) -> None:
+    """增量检测时，依赖有变化的插件也需要检查"""
+    from src.providers.constants import REGISTRY_PYPI_SERIAL_URL
+    from src.providers.store_test.store import StoreTest
+
+    datastore = "nonebot-plugin-datastore:nonebot_plugin_datastore"
+    treehelp = "nonebot-plugin-treehelp:nonebot_plugin_treehelp"
+
+    mocked_api.get(REGISTRY_PYPI_SERIAL_URL).respond(
+        json={"serial": 100, "pending": []}
+    )
+    mocked_pypi_changelog.append(
+        ("nonebot-plugin-treehelp", "0.5.0", 0, "new release", 101)
+    )
+
+    test = await StoreTest.create()
+    test._previous_results[datastore].deps = {"nonebot-plugin-treehelp": "0.4.0"}
+    test._dependents = test.build_dependents()
+    await test.load_pypi_changes()
+
+    assert test._changed_keys == {treehelp, datastore}
+
+
+async def test_should_skip_with_target_env(
+    mocked_store_data: dict[str, Path], mocked_api: MockRouter, mocker: MockerFixture
+) -> None:
+    """上次通过测试的环境与目标环境不同时重新测试"""
+    from src.providers.docker_test import DockerTestResult
+    from src.providers.store_test.store import StoreTest
+    from src.providers.store_test.validation import validate_plugin
+
+    datastore = "nonebot-plugin-datastore:nonebot_plugin_datastore"
+    target_env = {"nonebot2": "2.4.1"}
+
+    mocked_api.get("https://github.com/he0119/nonebot-plugin-datastore").respond()
+
+    test = await StoreTest.create()
+
+    async def tested_in(test_env: str, load: bool):
+        """在指定环境中测试插件，使用 validate_plugin 生成的测试结果"""
+        mocker.patch(
+            "src.providers.store_test.validation.DockerPluginTest.run",
+            return_value=DockerTestResult(
+                run=True,
+                load=load,
+                output="",
+                version="1.3.0",
+                test_env=test_env,
+                metadata={
+                    "name": "数据存储",
+                    "desc": "NoneBot 数据存储插件",
+                    "homepage": "https://github.com/he0119/nonebot-plugin-datastore",
+                    "type": "library",
+                    "supported_adapters": None,
+                },
+            ),
+        )
+        result, _ = await validate_plugin(
+            test._store_plugins[datastore], "", test._previous_plugins[datastore]
+        )
+        test._previous_results[datastore] = result
+
+    # 没有记录测试环境
+    test._previous_results[datastore].test_env = None
+    assert test.get_env_drift(datastore, target_env) == {"nonebot2": ""}
+    assert not test.should_skip(datastore, target_env=target_env)
+
+    # 上次在旧版本中通过测试
+    await tested_in("python==3.12.7 nonebot2==2.4.0 pydantic==2.10.0", load=True)
+    assert test.get_env_drift(datastore, target_env) == {"nonebot2": "2.4.0"}
+    assert not test.should_skip(datastore, target_env=target_env)
+
+    # 上次在目标版本中通过测试，插件为最新版本，环境也没有变化
+    await tested_in("python==3.12.7 nonebot2==2.4.1 pydantic==2.10.0", load=True)
+    assert test.get_env_drift(datastore, target_env) == {}
+    assert test.should_skip(datastore, target_env=target_env)
+
+    # 上次测试未通过，没有通过测试的环境，不因为环境不同而重新测试
+    await tested_in("python==3.12.7 nonebot2==2.4.0 pydantic==2.10.0", load=False)
+    assert test.get_env_drift(datastore, target_env) == {}
+
+
+async def test_store_test_incremental(
+    mocked_store_data: dict[str, Path],
+    mocked_api: MockRouter,
+    mocked_pypi_changelog: list,
+    mocker: MockerFixture,
+) -> None:
+    """增量检测
+
+    只有 treehelp 在上次记录的序号后有变化，datastore 无需请求 PyPI 即跳过
+    """
+    import json
+
+    from src.providers.constants import REGISTRY_PYPI_SERIAL_URL
+    from src.providers.store_test.store import StoreTest, StoreTestResult
+
+    mocked_api.get(REGISTRY_PYPI_SERIAL_URL).respond(
+        json={"serial": 100, "pending": []}
+    )
+    mocked_pypi_changelog.extend(
+        [
+            ("nonebot-plugin-datastore", "1.3.0", 0, "new release", 99),
+            ("Nonebot_Plugin_TreeHelp", "0.5.0", 0, "new release", 101),
+            ("other-project", "1.0.0", 0, "new release", 102),
+        ]
+    )
+
+    mocked_validate_plugin = mocker.patch(
+        "src.providers.store_test.store.validate_plugin"
+    )
+    test = await StoreTest.create()
+    mocked_validate_plugin.return_value = (
+        StoreTestResult(
+            version="0.5.0",
+            results={"validation": True, "load": True, "metadata": True},
+            outputs={"validation": None, "load": "", "metadata": None},
+        ),
+        test._previous_plugins["nonebot-plugin-treehelp:nonebot_plugin_treehelp"],
+    )
+
+    await test.run(1, incremental=True)
+
+    assert mocked_validate_plugin.call_count == 1
+    assert not mocked_api["pypi_nonebot-plugin-datastore"].called
+    assert mocked_api["pypi_nonebot-plugin-treehelp"].called
+    assert json.loads(mocked_store_data["pypi_serial"].read_text()) == snapshot(
+        {"serial": 102, "pending": []}
+    )
+
+
+async def test_store_test_incremental_without_serial(
+    mocked_store_data: dict[str, Path],
+    mocked_api: MockRouter,
+    mocked_pypi_changelog: list,
+    mocker: MockerFixture,
+) -> None:
+    """没有上次记录的序号时检查所有插件
+
+    测试失败的插件留到下次继续检查
+    """
+    import json
+
+    from src.providers.constants import REGISTRY_PYPI_SERIAL_URL
+    from src.providers.store_test.store import StoreTest
+
+    mocked_api.get(REGISTRY_PYPI_SERIAL_URL).respond(404)
+    mocked_pypi_changelog.append(("nonebot2", "2.4.0", 0, "new release", 200))
+
+    mocked_validate_plugin = mocker.patch(
+        "src.providers.store_test.store.validate_plugin"
+    )
+    mocked_validate_plugin.side_effect = Exception
+
+    test = await StoreTest.create()
+    await test.run(1, incremental=True)
+
+    assert mocked_api["pypi_nonebot-plugin-datastore"].called
+    assert json.loads(mocked_store_data["pypi_serial"].read_text()) == snapshot(
+        {"serial": 200, "pending": ["nonebot-plugin-treehelp:nonebot_plugin_treehelp"]}
+    )
+
+
+async def test_store_test_incremental_shard(
+    tmp_path: Path,
+    mocked_store_data: dict[str, Path],
+    mocked_api: MockRouter,
+    mocked_pypi_changelog: list,
+    mocker: MockerFixture,
+) -> None:
+    """分片增量检测时，本次已测试为最新版本的插件无需继续检查"""
+    from src.providers.constants import REGISTRY_PYPI_SERIAL_URL
+    from src.providers.models import StoreTestBundle
+    from src.providers.store_test import store
+    from src.providers.store_test.store import StoreTest, StoreTestResult
+
+    mocker.patch.object(store, "TEST_DIR", tmp_path)
+    mocked_api.get(REGISTRY_PYPI_SERIAL_URL).respond(
+        json={"serial": 100, "pending": []}
+    )
+    mocked_pypi_changelog.append(("nonebot-plugin-treehelp", "0.5.0", 0, "", 101))
+
+    mocked_validate_plugin = mocker.patch.object(store, "validate_plugin")
+    test = await StoreTest.create()
+    mocked_validate_plugin.return_value = (
+        StoreTestResult(
+            version="0.5.0",
+            results={"validation": True, "load": True, "metadata": True},
+            outputs={"validation": None, "load": "", "metadata": None},
+        ),
+        test._previous_plugins["nonebot-plugin-treehelp:nonebot_plugin_treehelp"],
+    )
+
+    await test.run(1, incremental=True, shard=(1, 1))
+
+    assert mocked_validate_plugin.call_count == 1
+    bundle = StoreTestBundle.model_validate_json(
+        (tmp_path / "shard-1-of-1.json").read_text(encoding="utf-8")
+    )
+    assert bundle.pypi_serial == 101
+    assert bundle.pending == []
+
+
+async def test_store_test_incremental_xmlrpc_error(
+    mocked_store_data: dict[str, Path], mocked_api: MockRouter
+) -> None:
+    """无法获取 PyPI 变更记录时检查所有插件，不记录序号"""
+    from src.providers.constants import PYPI_XMLRPC_URL, REGISTRY_PYPI_SERIAL_URL
+    from src.providers.store_test.store import StoreTest
+
+    mocked_api.get(REGISTRY_PYPI_SERIAL_URL).respond(
+        json={"serial": 100, "pending": []}
+    )
+    route = mocked_api.post(PYPI_XMLRPC_URL)
+
+    test = await StoreTest.create()
+    for response in [httpx.Response(503), httpx.ConnectError("error")]:
+        route.mock(side_effect=[response])
+        await test.load_pypi_changes()
+
+        assert test._changed_keys is None
+        assert test._pypi_serial is None
+
+
+async def test_dump_data_only_changed(
+    mocked_store_data: dict[str, Path], mocked_api: MockRouter
+) -> None:
+    """只写入内容有变化的文件"""
+    from src.providers.store_test.store import StoreTest
+
+    test = await StoreTest.create()
+    assert test.dump_data() == snapshot(
+        [
+            "adapters.json",
+            "bots.json",
+            "drivers.json",
+            "plugins.json",
+            "results.json",
+            "plugin_configs.json",
+        ]
+    )
+
+    mtimes = {
+        name: path.stat().st_mtime_ns
+        for name, path in store_data_files(mocked_store_data).items()
+    }
+    assert test.dump_data() == []
+    assert mtimes == {
+        name: path.stat().st_mtime_ns
+        for name, path in store_data_files(mocked_store_data).items()
+    }
+
+    test._plugin_configs["nonebot-plugin-datastore:nonebot_plugin_datastore"] = "A=1"
+    assert test.dump_data() == snapshot(["plugin_configs.json"])
+
+
+async def test_store_test_metrics(
+    mocked_store_data: dict[str, Path], mocked_api: MockRouter, mocker: MockerFixture
+) -> None:
+    """运行结束后导出运行指标"""
+    from src.providers.store_test.store import (
+        RegistryPlugin,
+        StoreTest,
+        StoreTestResult,
+    )
+
+    mocked_validate_plugin = mocker.patch(
+        "src.providers.store_test.store.validate_plugin"
+    )
+    mocked_validate_plugin.return_value = (
+        StoreTestResult(
+            time="2023-08-28T00:00:00.000000+08:00",
+            version="1.0.0",
+            config="",
+            results={"load": False, "metadata": True, "validation": True},
+            outputs={"load": "output", "metadata": None, "validation": None},
+            timings={"container": 12.5},
+        ),
+        RegistryPlugin(
+            name="帮助",
+            module_name="module_name",
+            author="author",
+            version="0.3.0",
+            desc="获取插件帮助信息",
+            homepage="https://nonebot.dev/",
+            project_link="project_link",
+            tags=[],
+            supported_adapters=None,
+            type="application",
+            time="2023-08-28T00:00:00.000000+08:00",
+            is_official=True,
+            valid=True,
+            skip_test=False,
+        ),
+    )
+
+    test = await StoreTest.create()
+    await test.run(1, 0, False)
+
+    data = json.loads(mocked_store_data["metrics_json"].read_text(encoding="utf-8"))
+    assert {
+        name: data[name]
+        for name in (
+            "plugins_considered_total",
+            "plugins_skipped_total",
+            "plugins_tested_total",
+            "container_duration_seconds",
+        )
+    } == snapshot(
+        {
+            "plugins_considered_total": [{"labels": {}, "value": 2}],
+            "plugins_skipped_total": [{"labels": {"reason": "latest"}, "value": 1}],
+            "plugins_tested_total": [{"labels": {"result": "failed"}, "value": 1}],
+            "container_duration_seconds": [
+                {"labels": {}, "count": 1, "sum": 12.5, "max": 12.5}
+            ],
+        }
+    )
+    assert {x["labels"]["host"] for x in data["http_requests_total"]} == snapshot(
+        {
+            "api.github.com",
+            "github.com",
+            "onebot.adapters.nonebot.dev",
+            "pypi.org",
+            "raw.githubusercontent.com",
+        }
+    )
+    assert {x["labels"]["file"] for x in data["registry_file_bytes"]} == snapshot(
+        {
+            "adapters.json",
+            "bots.json",
+            "drivers.json",
+            "plugin_configs.json",
+            "plugins.json",
+            "results.json",
+        }
+    )
+
+    prometheus = mocked_store_data["metrics_prometheus"].read_text(encoding="utf-8")
+    assert 'noneflow_plugins_tested_total{result="failed"} 1' in prometheus
+    assert "# TYPE noneflow_container_duration_seconds summary" in prometheus
+
+
+async def test_store_test_share_tags(
+    mocked_store_data: dict[str, Path], mocked_api: MockRouter
+) -> None:
+    """相同的标签共享同一个实例，输出的数据不变"""
+    from src.providers.store_test.store import StoreTest
+
+    test = await StoreTest.create()
+
+    adapter_tag = test._store_adapters[
+        "nonebot-adapter-onebot:nonebot.adapters.onebot.v11"
+    ].tags[0]
+    bot_tag = test._store_bots["CoolQBot:https://github.com/he0119/CoolQBot"].tags[0]
+    assert adapter_tag is bot_tag
+    assert adapter_tag.model_dump() == snapshot({"label": "sync", "color": "#ffffff"})
+
+
+async def test_store_test_container_timeout(
+    mocked_store_data: dict[str, Path], mocked_api: MockRouter
+) -> None:
+    """根据上次测试的容器耗时设置等待时间"""
+    from src.providers.store_test.store import StoreTest
+
+    test = await StoreTest.create()
+    key = "nonebot-plugin-treehelp:nonebot_plugin_treehelp"
+    previous = test._previous_results[key]
+
+    test._previous_results[key] = previous.model_copy(
+        update={"timings": {"container": 200}}
+    )
+    assert test.get_container_timeout(key) == 600
+
+    test._previous_results[key] = previous.model_copy(
+        update={"timings": {"container": 10}}
+    )
+    assert test.get_container_timeout(key) == 300
+
+    test._previous_results[key] = previous.model_copy(
+        update={"timings": {"container": 1000}}
+    )
+    assert test.get_container_timeout(key) == 1260
+
+    test._previous_results[key] = previous.model_copy(
+        update={"timings": {"container": 10}, "outcome": "timeout"}
+    )
+    assert test.get_container_timeout(key) == 1260
+
+    test._previous_results[key] = previous.model_copy(
+        update={"timings": {"container": 10}, "outcome": "fatal"}
+    )
+    assert test.get_container_timeout(key) == 1260
+
+    assert test.get_container_timeout("unknown:unknown") == 1260
+
+
+async def test_prepare_docker(
+    mocked_store_data: dict[str, Path], mocked_api: MockRouter, mocker: MockerFixture
+) -> None:
+    """拉取测试镜像并记录，无法连接 Docker 时不中断测试"""
+    from docker.errors import DockerException
+
+    from src.providers.docker_test import DockerImage
+    from src.providers.store_test.store import StoreTest
+
+    image = DockerImage("ghcr.io/nonebot/nonetest:latest", None, 1.0)
+    mocked_cleanup = mocker.patch("src.providers.store_test.store.cleanup_containers")
+    mocker.patch("src.providers.store_test.store.pull_image", return_value=image)
+
+    test = await StoreTest.create()
+    test.prepare_docker()
+    assert test._image == image
+
+    mocked_cleanup.side_effect = DockerException("无法连接 Docker")
+    test = await StoreTest.create()
+    test.prepare_docker()
+    assert test._image is None
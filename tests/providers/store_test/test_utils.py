@@ -1,4 +1,5 @@
 import pytest
+from pytest_mock import MockerFixture
 from respx import MockRouter
 
 from src.providers.constants import STORE_ADAPTERS_URL
@@ -20,3 +21,38 @@ async def test_get_pypi_data_failed(mocked_api: MockRouter):
 
     with pytest.raises(ValueError, match="获取 PyPI 数据失败："):
         get_pypi_data("project_link_failed")
+
+
+async def test_load_json_async_retry(mocked_api: MockRouter, mocker: MockerFixture):
+    """服务器错误时重试"""
+    import httpx
+
+    from src.providers.utils import load_json_from_web_async
+
+    mocker.patch("asyncio.sleep")
+    route = mocked_api.get(STORE_ADAPTERS_URL)
+    route.side_effect = [
+        httpx.Response(502),
+        httpx.ConnectError("failed"),
+        httpx.Response(200, text="[{a: 1,},]"),
+    ]
+
+    async with httpx.AsyncClient() as client:
+        assert await load_json_from_web_async(client, STORE_ADAPTERS_URL) == [{"a": 1}]
+    assert route.call_count == 3
+
+
+async def test_load_json_async_failed(mocked_api: MockRouter, mocker: MockerFixture):
+    """客户端错误不重试"""
+    import httpx
+
+    from src.providers.utils import load_json_from_web_async
+
+    mocked_sleep = mocker.patch("asyncio.sleep")
+    route = mocked_api.get(STORE_ADAPTERS_URL).respond(404)
+
+    async with httpx.AsyncClient() as client:
+        with pytest.raises(ValueError, match="下载文件失败："):
+            await load_json_from_web_async(client, STORE_ADAPTERS_URL)
+    assert route.call_count == 1
+    mocked_sleep.assert_not_called()
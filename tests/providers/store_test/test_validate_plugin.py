@@ -64,6 +64,8 @@ async def test_validate_plugin(mocked_api: MockRouter, mocker: MockerFixture) ->
             results={"validation": True, "load": True, "metadata": True},
             test_env={"python==3.12.7": True},
             version="0.2.0",
+            duration=0.0,
+            deps={},
         )
     )
     assert new_plugin == snapshot(
@@ -153,6 +155,8 @@ async def test_validate_plugin_with_previous(
             results={"validation": True, "load": True, "metadata": True},
             test_env={"python==3.12.7": True},
             version="0.2.0",
+            duration=0.0,
+            deps={},
         )
     )
 
@@ -225,6 +229,8 @@ async def test_validate_plugin_skip_test(
             results={"validation": True, "load": True, "metadata": True},
             test_env={"python==3.12.7": True},
             version="0.2.0",
+            duration=0.0,
+            deps={},
         )
     )
     assert new_plugin == snapshot(
@@ -334,6 +340,8 @@ async def test_validate_plugin_skip_test_plugin_test_failed(
             results={"validation": False, "load": False, "metadata": False},
             test_env={"python==3.12.7": True},
             version="0.3.9",
+            duration=0.0,
+            deps={},
         )
     )
     assert new_plugin == snapshot(
@@ -454,6 +462,8 @@ async def test_validate_plugin_failed_with_previous(
             results={"validation": False, "load": False, "metadata": False},
             test_env={"python==3.12.7": True},
             version="0.3.9",
+            duration=0.0,
+            deps={},
         )
     )
 
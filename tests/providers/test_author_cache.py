@@ -0,0 +1,147 @@
+import json
+from pathlib import Path
+
+import httpx
+import pytest
+from inline_snapshot import snapshot
+from pytest_mock import MockerFixture
+from respx import MockRouter
+
+
+async def test_author_cache_persist(
+    mocked_api: MockRouter, mocker: MockerFixture, tmp_path: Path
+) -> None:
+    """获取到的作者名字保存到缓存文件，之后的运行直接使用"""
+    from src.providers.author_cache import get_author_cache
+    from src.providers.utils import get_author_name
+
+    cache_path = tmp_path / "authors.json"
+    mocker.patch("src.providers.author_cache.AUTHOR_CACHE_PATH", str(cache_path))
+
+    assert get_author_name(1) == "he0119"
+    assert get_author_name(1) == "he0119"
+    assert mocked_api["github_username_1"].call_count == 1
+    assert json.loads(cache_path.read_text(encoding="utf-8"))["1"]["login"] == (
+        "he0119"
+    )
+
+    # 模拟新的运行
+    get_author_cache.cache_clear()
+    assert get_author_name(1) == "he0119"
+    assert mocked_api["github_username_1"].call_count == 1
+
+
+async def test_author_cache_expired(mocker: MockerFixture, tmp_path: Path) -> None:
+    """超过有效期的作者名字需要重新获取"""
+    from src.providers.author_cache import AuthorCache
+
+    mocked_time = mocker.patch("src.providers.author_cache.time.time")
+    mocked_time.return_value = 1000
+
+    cache = AuthorCache(tmp_path / "authors.json", ttl=100)
+    cache.set(1, "he0119")
+    cache.save()
+
+    cache = AuthorCache(tmp_path / "authors.json", ttl=100)
+    assert cache.get(1) == "he0119"
+    assert cache.missing([1, 2, 2]) == [2]
+
+    mocked_time.return_value = 1100
+    assert cache.get(1) is None
+    assert cache.missing([1, 2]) == [1, 2]
+
+
+async def test_author_cache_failed(mocker: MockerFixture, tmp_path: Path) -> None:
+    """获取失败的用户在较短的有效期内不再获取"""
+    from src.providers.author_cache import AuthorCache
+
+    mocked_time = mocker.patch("src.providers.author_cache.time.time")
+    mocked_time.return_value = 1000
+
+    cache = AuthorCache(tmp_path / "authors.json", ttl=1000, failure_ttl=100)
+    cache.set_failed(1)
+    cache.save()
+
+    cache = AuthorCache(tmp_path / "authors.json", ttl=1000, failure_ttl=100)
+    assert cache.get(1) is None
+    assert cache.is_failed(1)
+    assert cache.missing([1, 2]) == [2]
+
+    mocked_time.return_value = 1100
+    assert not cache.is_failed(1)
+    assert cache.missing([1, 2]) == [1, 2]
+
+    # 不缓存获取失败的用户
+    cache = AuthorCache(ttl=1000)
+    cache.set_failed(1)
+    assert not cache.is_failed(1)
+    assert cache.missing([1]) == [1]
+
+
+async def test_get_author_name_not_found(mocked_api: MockRouter) -> None:
+    """用户不存在时记录下来，之后不再请求"""
+    from src.providers.utils import get_author_name
+
+    route = mocked_api.get("https://api.github.com/user/3").respond(404)
+
+    with pytest.raises(ValueError, match="下载文件失败"):
+        get_author_name(3)
+    with pytest.raises(ValueError, match="作者 3 不存在"):
+        get_author_name(3)
+    assert route.call_count == 1
+
+
+async def test_prefetch_author_names(mocked_api: MockRouter, mocker: MockerFixture):
+    """有 Token 时通过 GraphQL 批量获取作者名字"""
+    from src.providers.constants import GITHUB_GRAPHQL_URL
+    from src.providers.utils import get_author_name, prefetch_author_names
+
+    mocker.patch("src.providers.utils.GITHUB_TOKEN", "token")
+
+    users = {
+        "MDQ6VXNlcjE=": {"databaseId": 1, "login": "he0119"},
+        "MDQ6VXNlcjI=": {"databaseId": 2, "login": "BigOrangeQWQ"},
+    }
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        ids = json.loads(request.content)["variables"]["ids"]
+        # 不存在的用户返回 null
+        return httpx.Response(
+            200, json={"data": {"nodes": [users.get(node_id) for node_id in ids]}}
+        )
+
+    route = mocked_api.post(GITHUB_GRAPHQL_URL).mock(side_effect=handler)
+
+    await prefetch_author_names([1, 2, 1, 3], batch_size=2)
+
+    assert route.call_count == 2
+    assert route.calls[0].request.headers["Authorization"] == "bearer token"
+    assert [
+        json.loads(call.request.content)["variables"]["ids"] for call in route.calls
+    ] == snapshot([["MDQ6VXNlcjE=", "MDQ6VXNlcjI="], ["MDQ6VXNlcjM="]])
+
+    assert get_author_name(1) == "he0119"
+    assert get_author_name(2) == "BigOrangeQWQ"
+    assert not mocked_api["github_username_1"].called
+    assert not mocked_api["github_username_2"].called
+
+    # 无法解析的用户不再逐个获取
+    route_3 = mocked_api.get("https://api.github.com/user/3").respond(404)
+    with pytest.raises(ValueError, match="作者 3 不存在"):
+        get_author_name(3)
+    assert not route_3.called
+
+
+async def test_prefetch_author_names_without_token(
+    mocked_api: MockRouter, mocker: MockerFixture
+):
+    """没有 Token 时不批量获取"""
+    from src.providers.constants import GITHUB_GRAPHQL_URL
+    from src.providers.utils import prefetch_author_names
+
+    mocker.patch("src.providers.utils.GITHUB_TOKEN", None)
+    route = mocked_api.post(GITHUB_GRAPHQL_URL)
+
+    await prefetch_author_names([1, 2])
+
+    assert not route.called
@@ -0,0 +1,106 @@
+import os
+from pathlib import Path
+
+import httpx
+from pytest_mock import MockerFixture
+from respx import MockRouter
+
+
+async def test_http_cache_revalidate(
+    mocked_api: MockRouter, mocker: MockerFixture, tmp_path: Path
+) -> None:
+    """缓存过期后通过条件请求重新验证，未变化时使用缓存内容"""
+    from src.providers.utils import load_json_from_web
+
+    mocker.patch("src.providers.http_cache.HTTP_CACHE_DIR", str(tmp_path))
+
+    route = mocked_api.get("https://example.com/data.json")
+    route.side_effect = [
+        httpx.Response(
+            200,
+            text='{"a": 1}',
+            headers={"ETag": '"v1"', "Last-Modified": "Wed, 21 Oct 2026 07:28:00 GMT"},
+        ),
+        httpx.Response(304),
+    ]
+
+    assert load_json_from_web("https://example.com/data.json") == {"a": 1}
+    assert load_json_from_web("https://example.com/data.json") == {"a": 1}
+
+    assert route.call_count == 2
+    assert "If-None-Match" not in route.calls[0].request.headers
+    assert route.calls[1].request.headers["If-None-Match"] == '"v1"'
+    assert (
+        route.calls[1].request.headers["If-Modified-Since"]
+        == "Wed, 21 Oct 2026 07:28:00 GMT"
+    )
+
+
+async def test_http_cache_async_changed(
+    mocked_api: MockRouter, mocker: MockerFixture, tmp_path: Path
+) -> None:
+    """内容变化时使用新的内容并更新缓存"""
+    from src.providers.utils import load_json_from_web_async
+
+    mocker.patch("src.providers.http_cache.HTTP_CACHE_DIR", str(tmp_path))
+
+    route = mocked_api.get("https://example.com/data.json")
+    route.side_effect = [
+        httpx.Response(200, text='{"a": 1}', headers={"ETag": '"v1"'}),
+        httpx.Response(200, text='{"a": 2}', headers={"ETag": '"v2"'}),
+        httpx.Response(304),
+    ]
+
+    async with httpx.AsyncClient() as client:
+        for expected in [{"a": 1}, {"a": 2}, {"a": 2}]:
+            data = await load_json_from_web_async(
+                client, "https://example.com/data.json"
+            )
+            assert data == expected
+
+    assert route.calls[2].request.headers["If-None-Match"] == '"v2"'
+
+
+async def test_http_cache_ttl(
+    mocked_api: MockRouter, mocker: MockerFixture, tmp_path: Path
+) -> None:
+    """有效期内不发送请求"""
+    from src.providers.utils import load_json_from_web
+
+    mocker.patch("src.providers.http_cache.HTTP_CACHE_DIR", str(tmp_path))
+    mocker.patch("src.providers.http_cache.HTTP_CACHE_TTL", 60)
+
+    route = mocked_api.get("https://example.com/data.json").respond(text="[1]")
+
+    assert load_json_from_web("https://example.com/data.json") == [1]
+    assert load_json_from_web("https://example.com/data.json") == [1]
+    assert route.call_count == 1
+
+
+async def test_http_cache_evict(tmp_path: Path) -> None:
+    """超出最大占用空间时删除最久未使用的缓存"""
+    from src.providers.http_cache import HttpCache
+
+    cache = HttpCache(tmp_path, max_size=10)
+
+    def response(content: bytes) -> httpx.Response:
+        return httpx.Response(200, content=content, headers={"ETag": '"v"'})
+
+    cache.store("https://example.com/old", response(b"123456"))
+    # 确保访问时间不同
+    old_body = next(tmp_path.glob("*.body"))
+    os.utime(old_body, (0, 0))
+    cache.store("https://example.com/new", response(b"123456"))
+
+    assert cache.get("https://example.com/old") is None
+    assert cache.get("https://example.com/new") is not None
+
+
+async def test_http_cache_skip_without_validators(tmp_path: Path) -> None:
+    """无法重新验证且没有有效期的响应不缓存"""
+    from src.providers.http_cache import HttpCache
+
+    cache = HttpCache(tmp_path)
+    cache.store("https://example.com/", httpx.Response(200, content=b"data"))
+
+    assert cache.get("https://example.com/") is None
@@ -0,0 +1,82 @@
+import json
+from pathlib import Path
+
+import pytest
+from inline_snapshot import snapshot
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        [],
+        {},
+        "text",
+        [{}, [], {"a": []}],
+        {"a": {"b": [1, 2.5, None, True]}, "c": "多行\n文本"},
+        [{"control": "\x00\x1f", "quote": '"\\/'}],
+        [1e16, 1e-07, 5e-05, 0.0001, float("nan"), float("inf"), -0.0],
+    ],
+)
+def test_dumps_json_same_as_json(data) -> None:
+    """输出与 json 标准库一致"""
+    from src.providers.utils import dumps_json
+
+    assert dumps_json(data) == json.dumps(
+        data, ensure_ascii=False, separators=(",", ":")
+    )
+    assert dumps_json(data, False) == json.dumps(data, ensure_ascii=False, indent=2)
+
+
+def test_dump_json_model(tmp_path: Path) -> None:
+    """直接序列化模型"""
+    from src.providers.models import Tag
+    from src.providers.utils import dump_json
+
+    test_file = tmp_path / "test.json"
+    assert dump_json(test_file, {"tag": Tag(label="test", color="red")})  # type: ignore
+    assert test_file.read_text(encoding="utf-8") == (
+        '{"tag":{"label":"test","color":"#ff0000"}}'
+    )
+
+
+def test_write_if_changed(tmp_path: Path) -> None:
+    """逐段比较内容，只在内容变化时写入"""
+    from src.providers.utils import write_if_changed
+
+    test_file = tmp_path / "test.txt"
+    assert write_if_changed(test_file, [b"ab", b"cd"])
+
+    mtime = test_file.stat().st_mtime_ns
+    assert not write_if_changed(test_file, [b"a", b"bcd"])
+    assert test_file.stat().st_mtime_ns == mtime
+
+    assert write_if_changed(test_file, [b"ab", b"c"])
+    assert test_file.read_bytes() == b"abc"
+    assert write_if_changed(test_file, [b"ab", b"cX", b"yz"])
+    assert test_file.read_bytes() == b"abcXyz"
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_parse_json() -> None:
+    """严格的 JSON 使用快速解析器，其余按 JSON5 解析"""
+    from src.providers.metrics import metrics
+    from src.providers.utils import parse_json
+
+    assert parse_json(b'{"a": [1, 2.5]}', "https://example.com/results.json") == {
+        "a": [1, 2.5]
+    }
+    assert parse_json("[{a: 1,},]", "plugins.json") == [{"a": 1}]
+    assert parse_json('["a"]', "plugins.json5") == ["a"]
+    assert parse_json("[1,]") == [1]
+    # 单独的代理项无法编码为 UTF-8，需要交给 JSON5 解析
+    assert parse_json('["\ud800"]') == ["\ud800"]
+
+    assert [
+        (x["labels"], x["count"]) for x in metrics.to_json()["json_parse_seconds"]
+    ] == snapshot(
+        [
+            ({"parser": "json", "source": "results.json"}, 1),
+            ({"parser": "json5", "source": "plugins.json"}, 1),
+            ({"parser": "json5", "source": "plugins.json5"}, 1),
+        ]
+    )
@@ -0,0 +1,52 @@
+from inline_snapshot import snapshot
+
+
+def test_metrics_export():
+    """导出为 JSON 与 Prometheus 文本格式"""
+    from src.providers.metrics import Metrics
+
+    metrics = Metrics()
+    metrics.inc("plugins_skipped_total", "跳过测试的插件数量", reason="latest")
+    metrics.inc("plugins_skipped_total", "跳过测试的插件数量", reason="latest")
+    metrics.inc("plugins_skipped_total", "跳过测试的插件数量", reason="git")
+    metrics.record_http("https://pypi.org/pypi/nonebot2/json", 200, 0.5)
+    metrics.record_http("https://pypi.org/pypi/nonebot2/json", 200, 1.5)
+    metrics.set("registry_file_bytes", "商店数据文件大小（字节）", 1024, file='a"b')
+
+    assert metrics.to_json() == snapshot(
+        {
+            "http_request_duration_seconds": [
+                {"labels": {"host": "pypi.org"}, "count": 2, "sum": 2.0, "max": 1.5}
+            ],
+            "http_requests_total": [
+                {"labels": {"host": "pypi.org", "status": "200"}, "value": 2}
+            ],
+            "plugins_skipped_total": [
+                {"labels": {"reason": "latest"}, "value": 2},
+                {"labels": {"reason": "git"}, "value": 1},
+            ],
+            "registry_file_bytes": [{"labels": {"file": 'a"b'}, "value": 1024}],
+        }
+    )
+    assert metrics.to_prometheus() == snapshot("""\
+# HELP noneflow_http_requests_total HTTP 请求次数
+# TYPE noneflow_http_requests_total counter
+noneflow_http_requests_total{host="pypi.org",status="200"} 2
+# HELP noneflow_plugins_skipped_total 跳过测试的插件数量
+# TYPE noneflow_plugins_skipped_total counter
+noneflow_plugins_skipped_total{reason="latest"} 2
+noneflow_plugins_skipped_total{reason="git"} 1
+# HELP noneflow_http_request_duration_seconds HTTP 请求耗时（秒）
+# TYPE noneflow_http_request_duration_seconds summary
+noneflow_http_request_duration_seconds_count{host="pypi.org"} 2
+noneflow_http_request_duration_seconds_sum{host="pypi.org"} 2
+# TYPE noneflow_http_request_duration_seconds_max gauge
+noneflow_http_request_duration_seconds_max{host="pypi.org"} 1.5
+# HELP noneflow_registry_file_bytes 商店数据文件大小（字节）
+# TYPE noneflow_registry_file_bytes gauge
+noneflow_registry_file_bytes{file="a\\"b"} 1024
+""")
+
+    metrics.reset()
+    assert metrics.to_json() == {}
+    assert metrics.to_prometheus() == "\n"